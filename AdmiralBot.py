@@ -17,9 +17,12 @@ import math
 import gc
 import hlt.entity
 import hlt.collision
+import hlt.navigation
+import hlt.overrides
+import hlt.profiling
 import logging
-import time
 import random
+import sys
 
 # GAME START
 # Here we define the bot's name as Settler and initialize the game, including communication with the Halite engine.
@@ -29,46 +32,17 @@ initialized = False
 first_dock = False
 cos = [math.cos(math.radians(x)) for x in range(360)]
 sin = [math.sin(math.radians(x)) for x in range(360)]
-
-
-def compute_dist(dx, dy):
-    return numpy.sqrt(dx * dx + dy * dy)
+# docking status codes, which compare directly with the int8 docking_status column of the map
+UNDOCKED = hlt.entity.Ship.DockingStatus.UNDOCKED
+DOCKING = hlt.entity.Ship.DockingStatus.DOCKING
+DOCKED = hlt.entity.Ship.DockingStatus.DOCKED
+UNDOCKING = hlt.entity.Ship.DockingStatus.UNDOCKING
 
 
 def compute_square_dist(dx, dy):
     return dx * dx + dy * dy
 
 
-def custom_intersect_segment_circle(start, end, circle, *, fudge=0.5):
-    #    threshold = 2 * hlt.constants.MAX_SPEED + fudge + circle.radius
-    #    if numpy.abs(start.x - circle.x) > threshold or numpy.abs(start.y - circle.y) > threshold:
-    #        return False
-
-    dx = end.x - start.x
-    dy = end.y - start.y
-
-    a = dx ** 2 + dy ** 2
-
-    b = -2 * (start.x ** 2 - start.x * end.x - start.x * circle.x + end.x * circle.x +
-              start.y ** 2 - start.y * end.y - start.y * circle.y + end.y * circle.y)
-    c = (start.x - circle.x) ** 2 + (start.y - circle.y) ** 2
-
-    if a == 0.0:
-        # Start and end are the same point
-        return start.calculate_distance_between(circle) <= circle.radius + fudge
-
-    # Time along segment when closest to the circle (vertex of the quadratic)
-    t = min(-b / (2 * a), 1.0)
-    if t < 0:
-        return False
-
-    closest_x = start.x + dx * t
-    closest_y = start.y + dy * t
-    closest_distance = hlt.entity.Position(closest_x, closest_y).calculate_distance_between(circle)
-
-    return closest_distance <= circle.radius + fudge
-
-
 SKIP_THRESHOLD = (hlt.constants.MAX_SPEED + 1.1) ** 2
 
 
@@ -81,7 +55,7 @@ def exists_obstacles_between(ship, target, all_planets, all_ships, all_my_ships_
         for foreign_entity in all_planets:
             if foreign_entity == ship or foreign_entity == target:
                 continue
-            if custom_intersect_segment_circle(ship, target, foreign_entity, fudge=ship.radius + 0.1):
+            if hlt.collision.intersect_segment_circle(ship, target, foreign_entity, fudge=ship.radius + 0.1):
                 return True
     if not issubclass(hlt.entity.Ship, ignore):
         for foreign_entity in all_ships + all_my_ships_moves:
@@ -89,12 +63,32 @@ def exists_obstacles_between(ship, target, all_planets, all_ships, all_my_ships_
                 continue
             if compute_square_dist(foreign_entity.x - ship.x, foreign_entity.y - ship.y) > SKIP_THRESHOLD:
                 continue
-            if custom_intersect_segment_circle(ship, target, foreign_entity, fudge=ship.radius + 0.1):
+            if hlt.collision.intersect_segment_circle(ship, target, foreign_entity, fudge=ship.radius + 0.1):
                 return True
 
     return False
 
 
+def free_corrections(ship, distance, angle, all_planets, all_ships, all_my_ships_moves, ignore, max_corrections,
+                     angular_step):
+    # the corrections, from 1 up to max_corrections - 1, whose heading lets a move of the given distance pass the
+    # planets, and the ships and planned moves within SKIP_THRESHOLD
+    obstacles = []
+    if not issubclass(hlt.entity.Planet, ignore):
+        obstacles.extend(planet for planet in all_planets if planet != ship)
+    if not issubclass(hlt.entity.Ship, ignore):
+        obstacles.extend(foreign_entity for foreign_entity in all_ships + all_my_ships_moves
+                         if foreign_entity != ship and compute_square_dist(foreign_entity.x - ship.x,
+                                                                           foreign_entity.y - ship.y) <= SKIP_THRESHOLD)
+    blocked = hlt.navigation.BlockedHeadings.around(ship.x, ship.y, distance,
+                                                    [foreign_entity.x for foreign_entity in obstacles],
+                                                    [foreign_entity.y for foreign_entity in obstacles],
+                                                    [foreign_entity.radius + ship.radius + 0.1
+                                                     for foreign_entity in obstacles])
+    corrections = numpy.arange(1, max_corrections)
+    return corrections[blocked.free(numpy.radians(angle + corrections * angular_step))]
+
+
 def custom_navigate(ship, target, game_map, max_speed, min_speed, speed_decay, step, all_planets, all_ships,
                     all_my_ships_moves,
                     avoid_obstacles=True, max_corrections=90, angular_step=1,
@@ -112,17 +106,14 @@ def custom_navigate(ship, target, game_map, max_speed, min_speed, speed_decay, s
         else hlt.entity.Planet if (ignore_planets and not ignore_ships) \
         else hlt.entity.Entity
     if avoid_obstacles and exists_obstacles_between(ship, target, all_planets, all_ships, all_my_ships_moves, ignore):
-        new_angle = angle + angular_step
-        while new_angle >= 360:
-            new_angle -= 360
-        while new_angle < 0:
-            new_angle += 360
-        new_target_dx = cos[int(new_angle)] * distance
-        new_target_dy = sin[int(new_angle)] * distance
-        new_target = hlt.entity.Position(ship.x + new_target_dx, ship.y + new_target_dy)
-        return custom_navigate(ship, new_target, game_map, max_speed, min_speed, speed_decay, step + 1, all_planets,
-                               all_ships, all_my_ships_moves, True, max_corrections - 1, angular_step, ignore_ships,
-                               ignore_planets, suicide)
+        # the corrections, angular_step degrees further each: the first heading the obstacles leave free
+        corrections = free_corrections(ship, distance, angle, all_planets, all_ships, all_my_ships_moves, ignore,
+                                       max_corrections, angular_step)
+        if not len(corrections):
+            return 999999, None, None
+        correction = int(corrections[0])
+        step += correction
+        angle = (angle + correction * angular_step) % 360
     # TODO formulize this better
     speed = max(max_speed - step * speed_decay, min_speed)
     speed = speed if (distance >= speed) else distance - 0.1
@@ -170,6 +161,31 @@ CLOSE_ALLY_DIST = 5.0
 
 DOUBLE_NAVIGATE_SHIP_CNT = 999
 
+# overrides of the parameters above, e.g. from a tuning run (see hlt.overrides)
+hlt.overrides.apply(globals(), hlt.overrides.load())
+
+
+# target kinds of the edges; edges of equal score, ship and target are taken in decreasing order of the kind's name
+EDGE_KINDS = ('dock', 'my_ship', 'opponent_ship', 'planet')
+DOCK_EDGE, MY_SHIP_EDGE, OPPONENT_SHIP_EDGE, PLANET_EDGE = range(len(EDGE_KINDS))
+
+
+# the edges of the given scores, ships, targets and kinds, best first: the order sorted() gives the
+# (score, ship, target, kind) tuples with reverse=True. Only a chunk of the best remaining edges is sorted at a time
+# (all edges scoring as high as the chunk_size-th best), so a walk that stops early does not sort them all
+def edges_in_order(edge_score, edge_ship, edge_target, edge_kind, chunk_size):
+    remaining = numpy.arange(len(edge_score))
+    while len(remaining):
+        if len(remaining) > chunk_size:
+            scores = edge_score[remaining]
+            threshold = -numpy.partition(-scores, chunk_size - 1)[chunk_size - 1]
+            best = scores >= threshold
+            chunk, remaining = remaining[best], remaining[~best]
+        else:
+            chunk, remaining = remaining, remaining[:0]
+        order = numpy.lexsort((-edge_kind[chunk], -edge_target[chunk], -edge_ship[chunk], -edge_score[chunk]))
+        yield from chunk[order].tolist()
+
 
 def planet_nearby_empty_planet_score(dist_matrix, planet_owner, planet_capacity):
     score = numpy.maximum(0.0, PLANET_NEARBY_PLANET_BIAS - dist_matrix * PLANET_NEARBY_PLANET_SLOPE)
@@ -193,13 +209,18 @@ def planet_nearby_empty_planet_score(dist_matrix, planet_owner, planet_capacity)
 # 13. Defend early game rush
 # 14. Create a pivot
 
+# Phases and counters of the turn profile (only if profiling is on, see hlt.profiling)
+hlt.profiling.instrument(sys.modules[__name__], 'custom_navigate')
+hlt.profiling.instrument(sys.modules[__name__], 'exists_obstacles_between')
+
 early_game_all_in = 0
 
 while True:
     # TURN START
-    st = time.time()
-    # Update the map for the new turn and get the latest version
+    # Update the map for the new turn and get the latest version; the turn's budget starts when the map arrives
     game_map = game.update_map()
+    budget = game.budget
+    hlt.profiling.mark('update')
 
     # Here we define the set of commands to be sent to the Halite engine at the end of the turn
     command_queue = []
@@ -219,29 +240,33 @@ while True:
     all_my_ships = game_map.get_me().all_ships()
     num_my_ships = len(all_my_ships)
 
-    all_opponent_ships = []
-    for pid in all_players_ids:
-        if my_id != pid:
-            all_opponent_ships += game_map.get_player(pid).all_ships()
+    all_opponent_ships = list(game_map.enemy_ships())
     num_opponent_ships = len(all_opponent_ships)
     all_ships = all_my_ships + all_opponent_ships
 
     # cache coordinates and misc
-    all_my_ships_x = numpy.array([v.x for v in all_my_ships])
-    all_my_ships_y = numpy.array([v.y for v in all_my_ships])
+    ship_columns = game_map.ship_columns
+    planet_columns = game_map.planet_columns
+    is_my_ship = ship_columns.owner == my_id
+    all_my_ships_x = ship_columns.x[is_my_ship]
+    all_my_ships_y = ship_columns.y[is_my_ship]
     all_my_ships_center_x = numpy.mean(all_my_ships_x)
     all_my_ships_center_y = numpy.mean(all_my_ships_y)
-    all_opponent_ships_x = numpy.array([v.x for v in all_opponent_ships])
-    all_opponent_ships_y = numpy.array([v.y for v in all_opponent_ships])
+    all_opponent_ships_x = ship_columns.x[~is_my_ship]
+    all_opponent_ships_y = ship_columns.y[~is_my_ship]
     all_opponent_ships_center_x = numpy.mean(all_opponent_ships_x)
     all_opponent_ships_center_y = numpy.mean(all_opponent_ships_y)
-    all_planets_x = numpy.array([v.x for v in all_planets])
-    all_planets_y = numpy.array([v.y for v in all_planets])
-    my_ships_status = numpy.array([v.docking_status for v in all_my_ships])
-    num_my_undocked_ships = numpy.sum(my_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKED)
-    opponent_ships_status = numpy.array([v.docking_status for v in all_opponent_ships])
-    num_opponent_undocked_ships = numpy.sum(opponent_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKED)
-    planet_owner = numpy.array([-1 if v.owner is None else v.owner.id for v in all_planets])
+    all_planets_x = planet_columns.x
+    all_planets_y = planet_columns.y
+    # int8 status codes, so the masks below are plain integer comparisons
+    my_ships_status = ship_columns.docking_status[is_my_ship]
+    num_my_undocked_ships = numpy.count_nonzero(my_ships_status == UNDOCKED)
+    opponent_ships_status = ship_columns.docking_status[~is_my_ship]
+    num_opponent_undocked_ships = numpy.count_nonzero(opponent_ships_status == UNDOCKED)
+    my_ships_docked = (my_ships_status == DOCKED) | (my_ships_status == DOCKING)
+    my_ships_undocked = (my_ships_status == UNDOCKED) | (my_ships_status == UNDOCKING)
+    opponent_ships_undocked = opponent_ships_status == UNDOCKED
+    planet_owner = planet_columns.owner
 
 
     def compute_dist_matrix(x1, y1, x2, y2):
@@ -252,40 +277,31 @@ while True:
 
     my_ship_dist_matrix = compute_dist_matrix(all_my_ships_x, all_my_ships_y, all_my_ships_x, all_my_ships_y)
     ship_dist_matrix = compute_dist_matrix(all_my_ships_x, all_my_ships_y, all_opponent_ships_x, all_opponent_ships_y)
-    planet_dist_matrix = compute_dist_matrix(all_my_ships_x, all_my_ships_y, all_planets_x, all_planets_y)
-    planet_planet_dist_matrix = compute_dist_matrix(all_planets_x, all_planets_y, all_planets_x, all_planets_y)
+    # planets never move: their distances come from the game-lifetime planet geometry
+    planet_dist_matrix = game_map.ship_planet_distances()[is_my_ship]
+    planet_planet_dist_matrix = game_map.planet_distances()
     closest_opponent_ship = numpy.min(ship_dist_matrix, axis=1)
     closest_undocked_opponent_ship = numpy.min(
-        ship_dist_matrix + 99999999.0 * (opponent_ships_status != hlt.entity.Ship.DockingStatus.UNDOCKED)[numpy.newaxis,
-                                        :], axis=1)
-    cnt_too_close_to_dock_opponent = numpy.sum((ship_dist_matrix < MIN_OPPONENT_DIST_TO_DOCK) * ((
-                                                                                                             my_ships_status == hlt.entity.Ship.DockingStatus.DOCKED) | (
-                                                                                                             my_ships_status == hlt.entity.Ship.DockingStatus.DOCKING))[
-                                                                                                :, numpy.newaxis],
-                                               axis=0)
-    cnt_too_close_to_dock_ally = numpy.sum((ship_dist_matrix < MIN_OPPONENT_DIST_TO_DOCK) * ((
-                                                                                                         my_ships_status == hlt.entity.Ship.DockingStatus.DOCKED) | (
-                                                                                                         my_ships_status == hlt.entity.Ship.DockingStatus.DOCKING))[
-                                                                                            :, numpy.newaxis], axis=1)
-
-    close_opponent_ship_cnt = numpy.sum(
-        (ship_dist_matrix < CLOSE_OPPONENT_DIST) * (opponent_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKED)[
-                                                   numpy.newaxis, :], axis=1)
-    close_ally_ship_cnt = numpy.sum((my_ship_dist_matrix < CLOSE_ALLY_DIST), axis=1)
+        ship_dist_matrix + 99999999.0 * ~opponent_ships_undocked[numpy.newaxis, :], axis=1)
+    too_close_to_dock = ship_dist_matrix < MIN_OPPONENT_DIST_TO_DOCK
+    cnt_too_close_to_dock_opponent = numpy.count_nonzero(too_close_to_dock & my_ships_docked[:, numpy.newaxis], axis=0)
+    cnt_too_close_to_dock_ally = numpy.count_nonzero(too_close_to_dock & my_ships_docked[:, numpy.newaxis], axis=1)
 
+    close_opponent_ship_cnt = numpy.count_nonzero(
+        (ship_dist_matrix < CLOSE_OPPONENT_DIST) & opponent_ships_undocked[numpy.newaxis, :], axis=1)
+    close_ally_ship_cnt = numpy.count_nonzero(my_ship_dist_matrix < CLOSE_ALLY_DIST, axis=1)
+
+    # every undocked opponent counts against the closest of my docked ships, if it is close enough
     cnt_too_close_to_dock_closest_ally = numpy.zeros(len(all_my_ships), dtype=numpy.int64)
-    for i in range(len(all_opponent_ships)):
-        if opponent_ships_status[i] == hlt.entity.Ship.DockingStatus.UNDOCKED:
-            # TODO optimize this
-            k = numpy.argmin(ship_dist_matrix[:, i] + 99999999.0 * (
-                        (my_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKED) | (
-                            my_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKING)))
-            if ship_dist_matrix[k][i] < MIN_OPPONENT_DIST_TO_DOCK:
-                cnt_too_close_to_dock_closest_ally[k] += 1
-
-    planet_capacity = numpy.array([p.num_docking_spots for p in all_planets])
-    planet_docked_cnt = numpy.array(
-        [len(p._docked_ship_ids) for p in all_planets])  # TODO does this include docking ships?
+    if len(all_my_ships) and numpy.any(opponent_ships_undocked):
+        opponents = numpy.flatnonzero(opponent_ships_undocked)
+        closest_ally = numpy.argmin(
+            ship_dist_matrix[:, opponents] + 99999999.0 * my_ships_undocked[:, numpy.newaxis], axis=0)
+        threatened = ship_dist_matrix[closest_ally, opponents] < MIN_OPPONENT_DIST_TO_DOCK
+        numpy.add.at(cnt_too_close_to_dock_closest_ally, closest_ally[threatened], 1)
+
+    planet_capacity = planet_columns.num_docking_spots
+    planet_docked_cnt = planet_columns.num_docked  # TODO does this include docking ships?
     planet_remaining_cnt = planet_capacity - planet_docked_cnt
 
     # my ship target scores
@@ -298,12 +314,8 @@ while True:
     # opponent ship target scores
     opponent_ship_score = numpy.array([0.0] * len(all_opponent_ships))
     opponent_ship_score += OPPONENT_SHIP_CLOSE_TO_MY_DOCKED_BONUS * cnt_too_close_to_dock_opponent
-    opponent_ship_score += UNDOCKED_BONUS * \
-                           ((opponent_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKED) | (
-                                       opponent_ships_status == hlt.entity.Ship.DockingStatus.UNDOCKING))
-    opponent_ship_score += DOCKED_BONUS * \
-                           ((opponent_ships_status == hlt.entity.Ship.DockingStatus.DOCKED) | (
-                                       opponent_ships_status == hlt.entity.Ship.DockingStatus.DOCKING))
+    opponent_ship_score += UNDOCKED_BONUS * ((opponent_ships_status == UNDOCKED) | (opponent_ships_status == UNDOCKING))
+    opponent_ship_score += DOCKED_BONUS * ((opponent_ships_status == DOCKED) | (opponent_ships_status == DOCKING))
     opponent_ship_max_target_cnt = numpy.array([MAX_OPPONENT_SHIP_TARGET_CNT] * len(all_opponent_ships))
 
     # planet target scores
@@ -316,7 +328,7 @@ while True:
         planet_score += planet_nearby_empty_planet_score(planet_planet_dist_matrix, planet_owner, planet_capacity)
     elif num_players > 2:
         planet_score += numpy.minimum(MAX_PLANET_FAR_FROM_CENTER_BONUS, PLANET_FAR_FROM_CENTER_BONUS * (
-            compute_dist(all_planets_x - width / 2.0, all_planets_y - height / 2.0)))
+            game_map.planet_geometry().center_distances[planet_columns.id]))
     planet_max_target_cnt = planet_remaining_cnt.copy()
 
     my_ship_target_cnt = numpy.array([0] * len(all_my_ships))
@@ -329,88 +341,83 @@ while True:
 
     # Early game exception
     if early_game_all_in == 0:
-        if len(all_my_ships) != 3 or len(all_opponent_ships) != 3 or num_players > 2 or numpy.sum(
-                my_ships_status != hlt.entity.Ship.DockingStatus.UNDOCKED) == 3:
+        if len(all_my_ships) != 3 or len(all_opponent_ships) != 3 or num_players > 2 or numpy.count_nonzero(
+                my_ships_status != UNDOCKED) == 3:
             early_game_all_in = 2
         if numpy.min(ship_dist_matrix) < ALL_IN_DIST:
             early_game_all_in = 1
     if early_game_all_in == 1:
         opponent_ship_score += 1.0e9
 
-    # compute scores of all edges
-    scores = [0.0] * (len(all_my_ships) * (1 + len(all_planets) + len(all_opponent_ships) + len(all_my_ships)))
-    len_scores = 0
-    for k in range(len(all_my_ships)):
-        ed = time.time()
-        if ed - st > 1.7:
-            break
-
-        ship = all_my_ships[k]
-        if ship.docking_status != ship.DockingStatus.UNDOCKED:
-            continue
-
-        if not early_game_all_in == 1:
-            opponent_too_close_to_target_planet = False if closest_undocked_opponent_ship[
-                                                               k] > MIN_OPPONENT_DIST_TO_TARGET_PLANET else True
-            opponent_too_close_to_dock = False if closest_undocked_opponent_ship[
-                                                      k] > MIN_OPPONENT_DIST_TO_DOCK else True
-            for i in range(len(all_planets)):
-                planet = all_planets[i]
-                if planet.owner == None or planet.owner.id == my_id:
-                    dist_score = -(planet_dist_matrix[k][i] - planet.radius)
-                    # TODO move this to planet_score
-                    opponent_score = -99999999.0 if opponent_too_close_to_target_planet else 0.0  # TODO opponent_score # TODO geographical_score
-                    total_score = planet_score[i] + dist_score + opponent_score
-                    scores[len_scores] = (total_score, k, i, 'planet')
-                    len_scores += 1
-                    if ship.can_dock(planet) and not opponent_too_close_to_dock:
-                        total_score = 99999999.0
-                        scores[len_scores] = (total_score, k, i, 'dock')
-                        len_scores += 1
-                else:
-                    # TODO: suicide to opponent planet when I got more ships
-                    pass
-
-        for i in range(len(all_my_ships)):
-            if my_ships_status[i] == hlt.entity.Ship.DockingStatus.UNDOCKED or my_ships_status[
-                i] == hlt.entity.Ship.DockingStatus.UNDOCKING:
-                continue
-            mship = all_my_ships[i]
-            dist_score = -(my_ship_dist_matrix[k][i] - mship.radius)
-            total_score = my_ship_score[i] + dist_score
-            scores[len_scores] = (total_score, k, i, 'my_ship')
-            len_scores += 1
-
-        for i in range(len(all_opponent_ships)):
-            if ship_dist_matrix[k][i] > MAX_DIST_TO_TARGET_OPPONENT_UNDOCKED_SHIP and opponent_ships_status[
-                i] == hlt.entity.Ship.DockingStatus.UNDOCKED and not early_game_all_in == 1:
-                continue
-            oship = all_opponent_ships[i]
-            dist_score = -(ship_dist_matrix[k][i] - oship.radius)
-            # TODO geograpihcal_score
-            total_score = opponent_ship_score[i] + dist_score
-            scores[len_scores] = (total_score, k, i, 'opponent_ship')
-            len_scores += 1
-
-    # choose action in decreasing score order
+    # compute scores of all edges, as one matrix per target kind (rows: my undocked ships)
+    hlt.profiling.mark('scoring')
+    movable = numpy.flatnonzero(my_ships_status == UNDOCKED)
+    edges = []
+
+    if not early_game_all_in == 1:
+        closest_opponent = closest_undocked_opponent_ship[movable]
+        opponent_too_close_to_target_planet = ~(closest_opponent > MIN_OPPONENT_DIST_TO_TARGET_PLANET)
+        opponent_too_close_to_dock = ~(closest_opponent > MIN_OPPONENT_DIST_TO_DOCK)
+        # TODO: suicide to opponent planet when I got more ships
+        targetable = (planet_owner == -1) | (planet_owner == my_id)
+        dist_score = -(planet_dist_matrix[movable] - planet_columns.radius[numpy.newaxis, :])
+        # TODO move this to planet_score # TODO opponent_score # TODO geographical_score
+        opponent_score = numpy.where(opponent_too_close_to_target_planet, -99999999.0, 0.0)
+        total_score = planet_score[numpy.newaxis, :] + dist_score + opponent_score[:, numpy.newaxis]
+        edges.append((total_score, movable, targetable[numpy.newaxis, :], PLANET_EDGE))
+        # the distances only shortlist the ships that may dock; Ship.can_dock has the final say
+        dockable = targetable[numpy.newaxis, :] & ~opponent_too_close_to_dock[:, numpy.newaxis] & (
+            planet_dist_matrix[movable] <= game_map.planet_geometry().dock_rings[planet_columns.id] + 1e-9)
+        for row, i in zip(*numpy.nonzero(dockable)):
+            dockable[row, i] = all_my_ships[movable[row]].can_dock(all_planets[i])
+        edges.append((numpy.full(dockable.shape, 99999999.0), movable, dockable, DOCK_EDGE))
+
+    dist_score = -(my_ship_dist_matrix[movable] - hlt.constants.SHIP_RADIUS)
+    total_score = my_ship_score[numpy.newaxis, :] + dist_score
+    edges.append((total_score, movable, ~my_ships_undocked[numpy.newaxis, :], MY_SHIP_EDGE))
+
+    dist_score = -(ship_dist_matrix[movable] - hlt.constants.SHIP_RADIUS)
+    # TODO geograpihcal_score
+    total_score = opponent_ship_score[numpy.newaxis, :] + dist_score
+    too_far = (ship_dist_matrix[movable] > MAX_DIST_TO_TARGET_OPPONENT_UNDOCKED_SHIP) & \
+        opponent_ships_undocked[numpy.newaxis, :] & (not early_game_all_in == 1)
+    edges.append((total_score, movable, ~too_far, OPPONENT_SHIP_EDGE))
+
+    edge_score, edge_ship, edge_target, edge_kind = [], [], [], []
+    for total_score, rows, allowed, kind in edges:
+        row, target = numpy.nonzero(numpy.broadcast_to(allowed, total_score.shape))
+        edge_score.append(total_score[row, target])
+        edge_ship.append(rows[row])
+        edge_target.append(target)
+        edge_kind.append(numpy.full(len(row), kind))
+    edge_score = numpy.concatenate(edge_score)
+    edge_ship = numpy.concatenate(edge_ship)
+    edge_target = numpy.concatenate(edge_target)
+    edge_kind = numpy.concatenate(edge_kind)
+
+    # choose action in decreasing score order, until every ship with an edge has one
+    hlt.profiling.mark('navigation')
     all_my_ships_moves_from = []
     all_my_ships_moves_to = []
     ship_used = numpy.array([False] * len(all_my_ships))
-    scores = sorted(scores[:len_scores], reverse=True)
-    for i in range(len(scores)):
-        ed = time.time()
-        if ed - st > 1.7:
+    unassigned = len(numpy.unique(edge_ship))
+    for edge in edges_in_order(edge_score, edge_ship, edge_target, edge_kind, max(64, 4 * len(movable))):
+        if budget.expired() or not unassigned:
             break
 
-        ship_idx = scores[i][1]
+        ship_idx = int(edge_ship[edge])
         my_ship = all_my_ships[ship_idx]
-        target_idx = scores[i][2]
-        action = scores[i][3]
+        target_idx = int(edge_target[edge])
+        action = EDGE_KINDS[edge_kind[edge]]
 
         if ship_used[ship_idx]:
             continue
+        # once another navigation does not fit in the turn, only the cheap dock actions are still taken
+        if action != 'dock' and not budget.can_afford('navigate'):
+            continue
 
         command = None
+        navigate_start = budget.elapsed()
         if action == 'dock':
             if not planet_target_available[target_idx]:
                 continue
@@ -451,8 +458,8 @@ while True:
                     end = hlt.entity.Position(ship_move.x - (all_my_ships_moves_to[j].x - all_my_ships_moves_from[j].x),
                                               ship_move.y - (all_my_ships_moves_to[j].y - all_my_ships_moves_from[j].y))
                     end.radius = my_ship.radius
-                    if custom_intersect_segment_circle(my_ship, end, all_my_ships_moves_from[j],
-                                                       fudge=my_ship.radius + 0.1):
+                    if hlt.collision.intersect_segment_circle(my_ship, end, all_my_ships_moves_from[j],
+                                                              fudge=my_ship.radius + 0.1):
                         collide = True
                         break
                 if not collide:
@@ -491,8 +498,8 @@ while True:
                     end = hlt.entity.Position(ship_move.x - (all_my_ships_moves_to[j].x - all_my_ships_moves_from[j].x),
                                               ship_move.y - (all_my_ships_moves_to[j].y - all_my_ships_moves_from[j].y))
                     end.radius = my_ship.radius
-                    if custom_intersect_segment_circle(my_ship, end, all_my_ships_moves_from[j],
-                                                       fudge=my_ship.radius + 0.1):
+                    if hlt.collision.intersect_segment_circle(my_ship, end, all_my_ships_moves_from[j],
+                                                              fudge=my_ship.radius + 0.1):
                         collide = True
                         break
                 if not collide:
@@ -517,7 +524,7 @@ while True:
             if not early_game_all_in == 1:
                 if my_ship.health <= SUICIDE_HEALTH_MULT * hlt.constants.WEAPON_DAMAGE * float(
                         close_opponent_ship_cnt[ship_idx]) / float(close_ally_ship_cnt[ship_idx]) or \
-                        (opponent_ships_status[target_idx] == hlt.entity.Ship.DockingStatus.DOCKED and
+                        (opponent_ships_status[target_idx] == DOCKED and
                          closest_undocked_opponent_ship[ship_idx] < SUICIDE_UNDOCKED_OPPONENT_DIST):
                     suicide = True
                     ignore_ships = True
@@ -549,8 +556,8 @@ while True:
                     end = hlt.entity.Position(ship_move.x - (all_my_ships_moves_to[j].x - all_my_ships_moves_from[j].x),
                                               ship_move.y - (all_my_ships_moves_to[j].y - all_my_ships_moves_from[j].y))
                     end.radius = my_ship.radius
-                    if custom_intersect_segment_circle(my_ship, end, all_my_ships_moves_from[j],
-                                                       fudge=my_ship.radius + 0.1):
+                    if hlt.collision.intersect_segment_circle(my_ship, end, all_my_ships_moves_from[j],
+                                                              fudge=my_ship.radius + 0.1):
                         collide = True
                         break
                 if not collide:
@@ -565,9 +572,12 @@ while True:
 
         else:
             assert False
+        if action != 'dock':
+            budget.record('navigate', budget.elapsed() - navigate_start)
 
         if command is not None:
             ship_used[ship_idx] = True
+            unassigned -= 1
             command_queue.append(command)
 
     #    logging.info('my_id ' + str(my_id))
@@ -576,6 +586,7 @@ while True:
     #        logging.info(planet.owner)
 
     # Send our set of commands to the Halite engine for this turn
+    hlt.profiling.mark(None)
     game.send_command_queue(command_queue)
     # TURN END
 # GAME END
\ No newline at end of file
@@ -1,16 +1,15 @@
 import hlt
+import hlt.overrides
+import hlt.profiling
 import numpy as np
 import pandas as pd
-from time import time
 import itertools
 import os
 import sys
 
-args = ' '.join(sys.argv)
-if 'define' in args:
-    overrides = eval(args.split('define')[1].strip())
+overrides = hlt.overrides.load()
 
-TIME_LIMIT = 1.9
+TIME_LIMIT = 1.4  # below hlt.budget.MAX_TURN_TIME, with room for the last assignment and sending
 nav_angles = np.array([-np.array(list(range(0, 35, 1)) + list(range(35, 120, 3))), 1+np.array(list(range(0, 35, 1)) + list(range(35, 120, 3)))]).T.flatten()
 nav_rads = np.deg2rad(nav_angles)
 
@@ -28,30 +27,6 @@ def ccw(A,B,C):
 def intersect(A,B,C,D):
     return ccw(A,C,D) != ccw(B,C,D) and ccw(A,B,C) != ccw(A,B,D)
 
-def intersect_segment_circle(start, ex, ey, circle, *, fudge=1.0):
-    sx = start.x
-    sy = start.y
-    worker_radius = start.radius
-    cx = circle.x
-    cy = circle.y
-    cr = circle.radius + worker_radius + fudge
-
-    dx = ex - sx
-    dy = ey - sy
-
-    a = dx ** 2 + dy ** 2
-    b = (sx ** 2 + sy ** 2 - sx * cx - sy * cy + ex * (cx - sx) + ey * (cy - sy))
-
-    t = np.clip(b / (a + 1e-8), 0.0, 1.0)
-
-    closest_x = sx + dx * t
-    closest_y = sy + dy * t
-
-    closest_distance = (closest_x - cx) ** 2 + (closest_y - cy) ** 2
-
-    return (closest_distance <= cr ** 2)
-
-
 from collections import namedtuple
 
 
@@ -175,22 +150,24 @@ class Bot:
             self.D_CENTER_PENALTY = -1 / 3  # minus one unit penalty for three units distance from center
             self.DEFENSE_PENALTY = -45.0
 
-        self.__dict__.update(**overrides)
+        hlt.overrides.apply(self.__dict__, overrides)
+        self.budget = game.budget
+        self.budget.limit = TIME_LIMIT
         self.ships = pd.DataFrame(columns=['docked', 'enemy', 'health', 'x', 'y', 'dx', 'dy', 'dhealth'])
         self.turn_count = 0
         self.update(self.map)
 
     def passed_time_limit(self):
-        return (time() - self.start_of_turn) > TIME_LIMIT
+        # whether another assignment no longer fits in the turn, judging by what assignments have cost so far
+        return not self.budget.can_afford('assign')
 
     def update(self, map):
-        self.start_of_turn = time()
         self.map = map
         self.turn_count += 1
 
         # Ships (computing dx, dy, and dhealth might be a waste of time, ideally the strategy should not depend on that)
-        ships = self.map._all_ships()
-        ids = pd.Index([s.id for s in ships], name='id')
+        ships = self.map.ship_columns
+        ids = pd.Index(ships.id, name='id')
         try:
             old = self.ships.loc[ids]
             old.index = ids
@@ -198,14 +175,14 @@ class Bot:
             old = self.ships
 
         self.ships = pd.DataFrame(dict(
-            enemy=[s.owner.id != self.my_id for s in ships],
-            x=[s.x for s in ships],
-            y=[s.y for s in ships],
-            health=[s.health for s in ships],
-            docked=[s.docking_status.value != 0 for s in ships]
+            enemy=ships.owner != self.my_id,
+            x=ships.x,
+            y=ships.y,
+            health=ships.health,
+            docked=ships.docking_status != 0
         ), index=ids)
 
-        self.full_docked = pd.Series([s.docking_status.value==2 for s in ships], index=ids)
+        self.full_docked = pd.Series(ships.docking_status == 2, index=ids)
 
         self.ships['dx'] = self.ships.x - old.x
         self.ships['dy'] = self.ships.y - old.y
@@ -214,15 +191,15 @@ class Bot:
         self.ships.sort_index(inplace=True)
 
         # Planets
-        planets = self.map.all_planets()
-        ids = pd.Index([p.id for p in planets], name='id')
+        planets = self.map.planet_columns
+        ids = pd.Index(planets.id, name='id')
         self.planets = pd.DataFrame(dict(
-            docks=[(p.num_docking_spots - len(p._docked_ship_ids)) if (p.owner is None or p.owner.id == self.my_id) else 0 for p in planets],
-            x=[p.x for p in planets],
-            y=[p.y for p in planets],
-            radius=[p.radius for p in planets],
-            prod=[self.full_docked.loc[p._docked_ship_ids].sum() for p in planets],
-            owner_id=[p.owner.id if p.owner is not None else -1 for p in planets],
+            docks=np.where((planets.owner == -1) | (planets.owner == self.my_id), planets.num_docking_spots - planets.num_docked, 0),
+            x=planets.x,
+            y=planets.y,
+            radius=planets.radius,
+            prod=[self.full_docked.loc[planets.docked_ships_of(i)].sum() for i in range(len(planets))],
+            owner_id=planets.owner,
         ), index=ids)
 
         if not hasattr(self, 'ship_turns_till_spawn'):
@@ -362,17 +339,24 @@ class Bot:
                 return False
 
     def find_clear_rads(self, target, worker, d):
-        obstacles = self.obstacles.copy()
+        obstacles = self.obstacles
         obstacles = obstacles[np.sqrt(np.square(obstacles.x - worker.x) + np.square(obstacles.y - worker.y)) - obstacles.radius - worker.radius <= d]
         rads = (np.arctan2(target.y - worker.y, target.x - worker.x) + nav_rads)
-        ex = worker.x + np.cos(rads) * d
-        ey = worker.y + np.sin(rads) * d
-        for _, obstacle in obstacles.iterrows():
-            mask = ~intersect_segment_circle(worker, ex, ey, obstacle)
-            rads = rads[mask]
-            ex = ex[mask]
-            ey = ey[mask]
-        return rads
+        # the headings the obstacles leave free, worked out once rather than per heading
+        blocked = hlt.navigation.BlockedHeadings.around(worker.x, worker.y, d, obstacles.x.values, obstacles.y.values,
+                                                        obstacles.radius.values + worker.radius + 1.0,
+                                                        from_start=True)
+        return rads[blocked.free(rads)]
+
+    def dock_idle_workers(self, taken):
+        # fallback once the turn runs out: workers in reach of a free dock take it, the others hold still
+        free = (self.targets['type'] == 'open_dock').values & ~taken
+        for wi in np.flatnonzero(~np.isinf(self.distances).all(axis=1)):
+            worker = self.workers.iloc[wi]
+            docks = np.flatnonzero(free & (self.line_distances[wi] < hlt.constants.DOCK_RADIUS))
+            if worker.name >= 0 and len(docks):
+                free[docks[0]] = False
+                self.command_queue.append(('d', worker.name, self.targets.iloc[docks[0]].name))
 
     def update_penalties(self, wi, ti):
         # Update distances here (could add penalty updates based on map and/or command_queue, e.g. additionals logic)
@@ -448,18 +432,24 @@ class Bot:
         self.apply_distance_penalties()
 
         sindex, tindex = np.indices(self.distances.shape)
+        taken = np.zeros(len(self.targets), dtype=bool)
 
         for _ in range(len(self.workers)):
-            if self.passed_time_limit() or len(self.targets) == 0 or len(self.workers) == 0:
+            if len(self.targets) == 0 or len(self.workers) == 0:
+                break
+            if self.passed_time_limit():
+                self.dock_idle_workers(taken)
                 break
 
-            fi = np.argmin(self.distances)
-            wi = sindex.flat[fi]
-            ti = tindex.flat[fi]
+            with self.budget.timed('assign'):
+                fi = np.argmin(self.distances)
+                wi = sindex.flat[fi]
+                ti = tindex.flat[fi]
+                taken[ti] = True
 
-            self.update_penalties(wi, ti)
+                self.update_penalties(wi, ti)
 
-            self.send_to(wi, ti)
+                self.send_to(wi, ti)
 
         self.command_queue = [x for x in self.command_queue if x[1] >= 0] # filter unspawned
         return [' '.join(str(x) for x in command) for command in self.command_queue]
@@ -468,9 +458,13 @@ if __name__ == '__main__':
     debug = False
     bot_name = 'Captain'
     game = hlt.Game(bot_name)
+    # Phases and counters of the turn profile (only if profiling is on, see hlt.profiling)
+    hlt.profiling.instrument(Bot, 'update', phase='update')
+    hlt.profiling.instrument(Bot, 'get_commands', phase='commands')
+    hlt.profiling.instrument(Bot, 'find_clear_rads', phase='navigation')
     if not debug:
         sys.stderr = open(os.devnull, mode='w') # prevent warning messages from breaking bot
-        bot = Bot(game)
+        bot = Bot(game, **overrides)
         while True:
             game_map = game.update_map()
             bot.update(game_map)
@@ -479,7 +473,7 @@ if __name__ == '__main__':
     else:
         import pickle
 
-        bot = Bot(game)
+        bot = Bot(game, **overrides)
         turn_count =0
         with open('{}.{}.pkl'.format(bot_name,turn_count), mode='wb') as file:
             pickle.dump(bot, file)
@@ -1,14 +1,17 @@
 import hlt
+import hlt.profiling
+import functools
 import logging
 import numpy
 import math
+import sys
 import time
 
 from hlt import Game
-from hlt.entity import Ship, Planet, Position
+from hlt.entity import Ship, Planet, Point, Position
 from hlt import constants
 
-game = hlt.Game("Dragon")
+game = hlt.Game("Dragon", incremental=True)
 
 ship_pos_dict = {}
 
@@ -27,14 +30,14 @@ def calc_dist(point1, point2):
 
 
 def calc_update_pos(ship, speed, angle):
-    return Position(speed * numpy.cos(numpy.radians(angle)) + ship.x,
+    return Point(speed * numpy.cos(numpy.radians(angle)) + ship.x,
                     speed * numpy.sin(numpy.radians(angle)) + ship.y)
 
 
 def calc_midpoint(pos1, pos2):
     x_m = (numpy.abs(pos1.x - pos2.x) / 2) + numpy.minimum(pos1.x, pos2.x)
     y_m = (numpy.abs(pos1.y - pos2.y) / 2) + numpy.minimum(pos1.y, pos2.y)
-    return Position(x_m, y_m)
+    return Point(x_m, y_m)
 
 
 def get_offset_points(pos1, pos2, middle, offset):
@@ -43,7 +46,7 @@ def get_offset_points(pos1, pos2, middle, offset):
     m = (numpy.abs(pos1.x - pos2.x) / numpy.abs(pos1.y - pos2.y))
     new_y_1 = m * new_x_1 + (m * middle.x) * (-1) + middle.y
     new_y_2 = m * new_x_2 + (m * middle.x) * (-1) + middle.y
-    return [Position(new_x_1, new_y_1), Position(new_x_2, new_y_2)]
+    return [Point(new_x_1, new_y_1), Point(new_x_2, new_y_2)]
 
 
 def take_first(elem):
@@ -70,8 +73,8 @@ def intersect(a, b, c, d):
 
 
 def check_intersection(pos1_start: Position, vec1, pos2_start: Position, vec2, threshold):
-    pos1_end = Position(pos1_start.x + vec1[0] * 2, pos1_start.y + vec1[1] * 2)
-    pos2_end = Position(pos2_start.x + vec2[0] * 2, pos2_start.y + vec2[1] * 2)
+    pos1_end = Point(pos1_start.x + vec1[0] * 2, pos1_start.y + vec1[1] * 2)
+    pos2_end = Point(pos2_start.x + vec2[0] * 2, pos2_start.y + vec2[1] * 2)
     if intersect(pos1_start, pos1_end, pos2_start, pos2_end):
         return True
     if in_radius_of_point(pos1_end, pos2_end, threshold * 2):
@@ -91,10 +94,9 @@ class Bot:
         self.me = self.map.get_me()
         self.id = self.me.id
         self.my_ships = self.me.all_ships()
-        self.enemy_ships = []
-        for ship in self.map._all_ships():
-            if ship.owner.id != self.id:
-                self.enemy_ships.append(ship)
+        self.enemy_ships = self.map.enemy_ships()
+        self.enemy_ids = [player.id for player in self.map.all_players() if player.id != self.id]
+        self.closest_enemy_ships = {}
         self.planets = self.map.all_planets()
         self.max_distance = numpy.lib.math.sqrt(self.map.width ** 2 + self.map.height ** 2)
         self.max_planet = max(self.planets, key=lambda planet: planet.radius)
@@ -123,39 +125,71 @@ class Bot:
         self.my_ships_ids = []
         for ship in self.my_ships:
             self.my_ships_ids.append(ship.id)
-        self.enemy_ships = []
-        for ship in self.map._all_ships():
-            if ship.owner.id != self.id:
-                self.enemy_ships.append(ship)
+        self.enemy_ships = self.map.enemy_ships()
         self.planets = self.map.all_planets()
+        # Distances from my ships (rows) to the planets (columns), and where each ship and planet is in them
+        self.planet_distances = self.map.ship_planet_distances()[self.map.ship_rows(self.id)]
+        self.ship_index = {ship.id: index for index, ship in enumerate(self.my_ships)}
+        self.undocked = self.map.ship_columns.docking_status[self.map.ship_rows(self.id)] == \
+            Ship.DockingStatus.UNDOCKED.value
+        if self.turn < 1:
+            # Planets never move, so which ones lie behind the starting position is known for the whole game
+            planets = self.map.planet_geometry()
+            dx = planets.x - self.starting_position.x
+            dy = planets.y - self.starting_position.y
+            self.back_planets = numpy.sqrt(dx * dx + dy * dy) < self.map.width / 4
+        # The most interesting planet of each of my ships, scored for all of them at once
+        priorities = self.planet_priorities()
+        self.interesting_planets = [None] * len(self.my_ships)
+        if len(self.planets):
+            best = numpy.argmax(priorities, axis=1)
+            interesting = priorities[numpy.arange(len(best)), best] > 0
+            for index in numpy.flatnonzero(interesting).tolist():
+                self.interesting_planets[index] = self.planets[best[index]]
+        # The closest enemy ship of each of my ships and its distance, found for all of them at once
+        closest, distances = self.map.nearest_batch(self.my_ships, owner=self.enemy_ids)
+        self.closest_enemy_ships = {}
+        for ship, found, distance in zip(self.my_ships, closest, distances[:, 0].tolist()):
+            self.closest_enemy_ships[ship.id] = (found[0] if found else None, distance)
         self.turn += 1
-        saved_ids = []
-        for ship_id in ship_pos_dict.keys():
-            if ship_id not in self.my_ships_ids:
-                saved_ids.append(ship_id)
-        for saved_id in saved_ids:
-            ship_pos_dict.pop(saved_id)
-
-    # Main commanding method
+        # Forget the planned positions of ships that died last turn
+        for ship_id in self.game.delta.ships_died.tolist():
+            ship_pos_dict.pop(ship_id, None)
+
+    # Main commanding method. Ships are commanded by priority while the turn's budget lasts; the rest fall back to
+    # docking or holding still. The rush watch goes first, then ships in contact with the enemy, then the other
+    # undocked ships, and docked ships, which mostly just stay docked, last
     def command_ships(self):
-        _command_queue = []
-        if self.turn < 100:
-            self.my_ships: []
-            for ship in self.my_ships:
-                if self.my_ships.index(ship) == 0 and self.check_if_rushed(ship):
-                    mitigate_command = self.mitigate_rush(ship)
-                    if mitigate_command:
-                        _command_queue.append(mitigate_command)
+        tasks = []
+        for index, ship in enumerate(self.my_ships):
+            if self.turn < 100 and index == 0:
+                work = functools.partial(self.get_first_command, ship)
+                priority = 3
+            else:
+                work = functools.partial(self.get_command, ship)
+                if ship.docking_status != ship.DockingStatus.UNDOCKED:
+                    priority = 0
+                elif self.in_proximity_of_enemy(ship):
+                    priority = 2
                 else:
-                    command = self.get_command(ship)
-                    if command:
-                        _command_queue.append(command)
-            return _command_queue
-        for ship in self.my_ships:
-            navigate_command = self.get_command(ship)
-            if navigate_command is not None:
-                _command_queue.append(navigate_command)
-        return _command_queue
+                    priority = 1
+            tasks.append(hlt.budget.Task(priority, work, functools.partial(self.get_fallback_command, ship)))
+        return [command for command in self.game.budget.run(tasks, kind='ship') if command]
+
+    # The first ship watches out for rushes early in the game
+    def get_first_command(self, ship):
+        if self.check_if_rushed(ship):
+            return self.mitigate_rush(ship)
+        return self.get_command(ship)
+
+    # Cheap command for a ship the turn has no time left for: dock if possible, else hold still
+    def get_fallback_command(self, ship):
+        if ship.docking_status != ship.DockingStatus.UNDOCKED:
+            return None
+        for planet in self.planets:
+            if ship.can_dock(planet) and not planet.is_full() and (planet.owner == self.me or not planet.is_owned()):
+                return ship.dock(planet)
+        return None
 
     def get_command(self, ship):
         # Leave non undocked ships alone
@@ -169,7 +203,7 @@ class Bot:
         # MAIN LOGIC
         # Get an interesting planet
         interesting_planet = self.determine_interesting_planet(ship)
-        # If None (by construction of evaluate_planet if you for example own all planets)
+        # If None (by construction of planet_priorities if you for example own all planets)
         # or if that ship is close to an enemy ship
         if interesting_planet is None or self.in_proximity_of_enemy(ship):
             # Hunt down the closest enemy ship
@@ -185,83 +219,59 @@ class Bot:
         # Else navigate towards that interesting planet
         return self.ship_move(ship, ship.closest_point_to(interesting_planet))
 
-    # Main function for evaluating planets and determining an for the ship interesting one
-    def evaluate_planet(self, ship, planet):
-        # If it's my planet and if I can't dock any more ships
-        if planet.owner is self.me and planet.is_full():
-            # It is an uninteresting planet
-            return 0
-        # If the planet has no remaining resources
-        if not planet.remaining_resources > 0:
-            # The planet is uninteresting
-            return 0
+    # Main function for evaluating planets: the priority of every planet (columns, in the order of self.planets) for
+    # every one of my ships (rows), from the distances of the turn. A priority of 0 makes a planet uninteresting
+    def planet_priorities(self):
+        planets = self.map.planet_columns
+        distances = self.planet_distances
         # The closer to the center, the more important. Strategic 'castle'
-        distance_to_center = 1 - planet.calculate_distance_between(
-            Position(self.map.width / 2, self.map.height / 2)) / self.max_distance
+        distance_to_center = 1 - self.map.planet_geometry().center_distances[planets.id] / self.max_distance
         # This describes a penalty for navigating towards a planet if some other ships of mine already
         # go there. The more ships navigate towards a planet and form a line, hence the name, the bigger
         # the penalty. Note that a penalty means adding less to or even subtracting from the final planets
-        # priority
-        line_penalty = 1
-        for ship_ahead in self.my_ships:
-            if ship_ahead.docking_status != ship_ahead.DockingStatus.UNDOCKED:
-                continue
-            if ship_ahead.calculate_distance_between(planet) < ship.calculate_distance_between(planet):
-                line_penalty -= 1 / 4
+        # priority. It counts my undocked ships closer to the planet than the ship, by binary search
+        closer = numpy.sort(distances[self.undocked], axis=0)
+        in_line = numpy.empty(distances.shape, dtype=numpy.int64)
+        for column in range(distances.shape[1]):
+            in_line[:, column] = numpy.searchsorted(closer[:, column], distances[:, column], side='left')
+        line_penalty = 1 - in_line / 4
         # The closer a planet, the more important it becomes
-        distance = 1 - (ship.calculate_distance_between(planet)) / self.max_distance
+        distance = 1 - distances / self.max_distance
         # Same with all these
-        remaining_resources = planet.remaining_resources / self.max_remaining_resources
-        free_docking_spots = 1 - len(planet.all_docked_ships()) / planet.num_docking_spots
-        enemy_planet = 0
-        if planet.is_owned() and planet.owner != self.me:
-            # Only show interest if planet is close enough
-            if ship.calculate_distance_between(planet) < self.max_distance / 4:
-                enemy_planet = 1 - len(planet.all_docked_ships()) / planet.num_docking_spots
-        unowned_planet = 0
-        if not planet.is_owned():
-            unowned_planet = 1
-        back_planet = 0
-        if self.starting_position.calculate_distance_between(Position(planet.x, planet.y)) < self.map.width / 4:
-            back_planet = 1
+        remaining_resources = planets.remaining_resources / self.max_remaining_resources
+        docked_share = planets.num_docked / planets.num_docking_spots
+        free_docking_spots = 1 - docked_share
+        # Only show interest in an enemy planet if it is close enough
+        enemy = (planets.owner >= 0) & (planets.owner != self.id)
+        enemy_planet = numpy.where(enemy & (distances < self.max_distance / 4), 1 - docked_share, 0)
+        unowned_planet = planets.owner < 0
+        back_planet = self.back_planets[planets.id]
         # Weighted priority
         priority = distance * 1 + enemy_planet * 1 + remaining_resources * 0.05 + free_docking_spots * 0.05 \
                    + line_penalty * 0.5 + distance_to_center * 0.5 + unowned_planet * 0.1 + back_planet * 1
+        # My planets I can't dock any more ships to, and planets without remaining resources, are uninteresting
+        full = (planets.owner == self.id) & (planets.num_docked >= planets.num_docking_spots)
+        priority[:, full | ~(planets.remaining_resources > 0)] = 0
         return priority
 
     # Hunt down the closest enemy ship
     def hunt(self, ship):
-        closest_enemy_ship = None
-        command = None
-        closest_distance = self.max_distance
         # Determine the closest enemy ship
-        for enemy_ship in self.enemy_ships:
-            enemy_ship_distance = ship.calculate_distance_between(enemy_ship)
-            if closest_distance > enemy_ship_distance:
-                closest_enemy_ship = enemy_ship
-                closest_distance = enemy_ship_distance
+        closest_enemy_ship, _ = self.closest_enemy_ships[ship.id]
         # Navigate towards it. This will attack it if it reaches its radius.
         command = self.ship_move(ship, ship.closest_point_to(closest_enemy_ship))
         return command
 
     # Same as hunting, except now attack the closest docked ship of a given planet
     def attack(self, ship, planet):
-        closest_enemy_ship = None
-        closest_distance = self.max_distance
-        for enemy_ship in planet.all_docked_ships():
-            enemy_ship_distance = ship.calculate_distance_between(enemy_ship)
-            if closest_distance > enemy_ship_distance:
-                closest_enemy_ship = enemy_ship
-                closest_distance = enemy_ship_distance
+        closest = self.map.nearest(ship, planet=planet)
+        closest_enemy_ship = closest[0] if closest else None
         command = self.ship_move(ship, ship.closest_point_to(closest_enemy_ship))
         return command
 
     # Gives a ship an option to detect close ships
     def in_proximity_of_enemy(self, ship):
-        for enemy_ship in self.enemy_ships:
-            if ship.calculate_distance_between(enemy_ship) < 3 * hlt.constants.WEAPON_RADIUS:
-                return True
-        return False
+        return self.closest_enemy_ships[ship.id][1] < 3 * hlt.constants.WEAPON_RADIUS
 
     def has_obstacle_in_path(self, points, ship):
         obs1 = self.map.obstacles_between(ship, points[0])
@@ -275,22 +285,13 @@ class Bot:
 
     # Checks if enemy rushes. Assumes rushing only happens if starting positions are top and bottom.
     def check_if_rushed(self, ship):
-        for enemy_ship in self.enemy_ships:
-            if ship.calculate_distance_between(enemy_ship) < self.map.height / 2 and len(self.enemy_ships) <= 3:
-                return True
-        return False
+        return len(self.enemy_ships) <= 3 and self.closest_enemy_ships[ship.id][1] < self.map.height / 2
 
     # Mitigates an enemy rush. Works best if enemy forms squads
     def mitigate_rush(self, ship):
         command = None
-        closest_enemy_ship = None
-        closest_distance = self.max_distance
         # Determine closest enemy ship
-        for enemy_ship in self.enemy_ships:
-            enemy_ship_distance = ship.calculate_distance_between(enemy_ship)
-            if closest_distance > enemy_ship_distance:
-                closest_enemy_ship = enemy_ship
-                closest_distance = enemy_ship_distance
+        closest_enemy_ship, closest_distance = self.closest_enemy_ships[ship.id]
         # If the enemy ship is less than 4 weapon radii, start the circle planet protocol
         if closest_distance > hlt.constants.WEAPON_RADIUS * 4:
             command = self.ship_move(ship, ship.closest_point_to(closest_enemy_ship))
@@ -338,54 +339,38 @@ class Bot:
 
     # Returns an interesting planet
     def determine_interesting_planet(self, ship):
-        interesting_planet = None
-        highest_priority = 0
-        # Determine an interesting planet
-        for planet in self.planets:
-            priority = self.evaluate_planet(ship, planet)
-            if priority > highest_priority:
-                interesting_planet = planet
-                highest_priority = priority
-        return interesting_planet
+        return self.interesting_planets[self.ship_index[ship.id]]
 
     # Returns a defend command (Attack closest enemy ship) if conditions are met
     def check_if_defend(self, ship):
         # Base is the closest planet
         closest_planet = self.get_closest_planet(ship)
-        closest_enemy_ship = None
         command = None
-        closest_distance = self.max_distance
         # Get the closest enemy ship and distance of that closest planet
-        for enemy_ship in self.enemy_ships:
-            enemy_ship_distance = enemy_ship.calculate_distance_between(closest_planet)
-            if closest_distance > enemy_ship_distance:
-                closest_enemy_ship = enemy_ship
-                closest_distance = enemy_ship_distance
+        closest = self.map.nearest(closest_planet, owner=self.enemy_ids)
+        closest_enemy_ship = closest[0] if closest else None
+        closest_distance = closest_enemy_ship.calculate_distance_between(closest_planet) if closest \
+            else self.max_distance
         # If I own the closest planet and an enemy ship is within 3 times its radius distance
         if closest_planet.owner == self.me and closest_distance < hlt.constants.MAX_SPEED * 3 + closest_planet.radius:
             # Defend the planet
             command = self.ship_move(ship, ship.closest_point_to(closest_enemy_ship))
         if closest_planet.owner == self.me and ship.calculate_distance_between(
-                Position(self.map.width / 2,
-                         self.map.height / 2)) < 4 * hlt.constants.MAX_SPEED and closest_distance < hlt.constants.MAX_SPEED * 5 + closest_planet.radius:
+                Point(self.map.width / 2,
+                      self.map.height / 2)) < 4 * hlt.constants.MAX_SPEED and closest_distance < hlt.constants.MAX_SPEED * 5 + closest_planet.radius:
             command = self.ship_move(ship, ship.closest_point_to(closest_enemy_ship))
         return command
 
     # Returns closest planet
     def get_closest_planet(self, ship):
-        min_planet = None
-        min_distance = self.max_distance
-        for planet in self.planets:
-            if min_distance > ship.calculate_distance_between(planet):
-                min_planet = planet
-                min_distance = ship.calculate_distance_between(planet)
-        return min_planet
+        closest = self.map.nearest(ship, kind=Planet)
+        return closest[0] if closest else None
 
     def get_viable_planet_for_bait(self, ship):
         min_planet = None
         min_distance = self.max_distance
         for planet in self.planets:
-            if planet.calculate_distance_between(Position(self.map.width / 2, self.map.height / 2)) < 20:
+            if planet.calculate_distance_between(Point(self.map.width / 2, self.map.height / 2)) < 20:
                 continue
             if self.map.width / 3 < planet.x < self.map.width - self.map.width / 3:
                 continue
@@ -402,19 +387,19 @@ class Bot:
         speed = constants.MAX_SPEED
 
         obstacles_on_path = game_map.obstacles_between(ship, target)
-        logging.debug("ShipNR: " + str(ship.id) + " || OBSTACLES: " + str(obstacles_on_path))
+        # only the count: a list of entities would be formatted here, on the turn loop, rather than by the log thread
+        logging.debug("ShipNR: %s || OBSTACLES: %s", ship.id, len(obstacles_on_path))
 
         # If no obstacles on the way, fly straight
         if len(obstacles_on_path) == 0:
             # If you are already closer then 8, fly with slower speed
             if distance_to_target < hlt.constants.MAX_SPEED:
-                logging.debug(
-                    "ShipNR: " + str(ship.id) + " || Thrust: " + str(distance_to_target) + " with Angle: " + str(angle))
+                logging.debug("ShipNR: %s || Thrust: %s with Angle: %s", ship.id, distance_to_target, angle)
                 ship_pos_dict[ship.id] = calc_update_pos(ship, distance_to_target, angle)
                 return ship.thrust(distance_to_target, angle)
             # Fly straight as fast as possible
             else:
-                logging.debug("ShipNR: " + str(ship.id) + " || Thrust: " + str(speed) + " with Angle: " + str(angle))
+                logging.debug("ShipNR: %s || Thrust: %s with Angle: %s", ship.id, speed, angle)
                 ship_pos_dict[ship.id] = calc_update_pos(ship, speed, angle)
                 return ship.thrust(speed, angle)
         else:
@@ -427,7 +412,7 @@ class Bot:
                     angle = ((((-1) ** i) * numpy.floor(i / 2) * 180 / 10 + org_angle) % 360)
                     # calc next position
                     vec = create_vector_by_angle(angle, speed)
-                    possible_target = Position(ship.x + vec[0], ship.y + vec[1])
+                    possible_target = Point(ship.x + vec[0], ship.y + vec[1])
                     # save all positions that are outside of a planet or enemy
                     if len(game_map.obstacles_between(ship, possible_target)) > 0:
                         break
@@ -438,35 +423,35 @@ class Bot:
             # if it cant find any nearest targets, do nothing
             if len(ship_targets) == 0:
                 logging.debug("COULDNT FIND ANYTHING HELP1")
-                ship_pos_dict[ship.id] = Position(ship.x, ship.y)
+                ship_pos_dict[ship.id] = Point(ship.x, ship.y)
                 return None
             ship_targets.sort(key=lambda x: x[0])
             ship_pos_dict[ship.id] = ship_targets[0][1]
             better_speed = ship_targets[0][2]
-            vec1 = create_vector_by_positions(Position(ship.x, ship.y),
-                                              Position(ship_pos_dict[ship.id].x, ship_pos_dict[ship.id].y))
+            vec1 = create_vector_by_positions(Point(ship.x, ship.y),
+                                              Point(ship_pos_dict[ship.id].x, ship_pos_dict[ship.id].y))
             # look through all ships
             for ship_id in ship_pos_dict.keys():
                 ships = self.me.get_ship(ship_id)
                 ships: Ship
                 ships_end_position = ship_pos_dict.get(ships.id)
-                vec2 = create_vector_by_positions(Position(ships.x, ships.y),
-                                                  Position(ships_end_position.x, ships_end_position.y))
+                vec2 = create_vector_by_positions(Point(ships.x, ships.y),
+                                                  Point(ships_end_position.x, ships_end_position.y))
                 if ships.id == ship.id:
                     continue
                 if ship.calculate_distance_between(ships) > hlt.constants.MAX_SPEED * 2.5:
                     continue
                 counter = 0
                 # if position is the same, then iterate through saved positions of this ship
-                while check_intersection(Position(ship.x, ship.y), vec1,
-                                              Position(ships.x, ships.y), vec2, hlt.constants.SHIP_RADIUS):
+                while check_intersection(Point(ship.x, ship.y), vec1,
+                                              Point(ships.x, ships.y), vec2, hlt.constants.SHIP_RADIUS):
                     # logging.debug(str("COUNTER: " + str(counter)))
                     # logging.debug("Checking: " + str(ship_pos_dict[ship].x) + " " + str(ship_pos_dict[ship].y))
                     # logging.debug("Still intersecting with " + str(ships.id))
                     # if cant find any, stop
                     if counter == len(ship_targets):
-                        ship_pos_dict[ship.id] = Position(ship.x, ship.y)
-                        logging.debug("COULDNT FIND ANYTHING HELP2" + " || With counter: " + str(counter))
+                        ship_pos_dict[ship.id] = Point(ship.x, ship.y)
+                        logging.debug("COULDNT FIND ANYTHING HELP2 || With counter: %s", counter)
                         return None
                     ship_pos_dict[ship.id] = ship_targets[counter][1]
                     better_speed = ship_targets[counter][2]
@@ -475,8 +460,7 @@ class Bot:
                     counter = counter + 1
             new_angle = ship.calculate_angle_between(ship_pos_dict[ship.id])
             # use the one with shortest distance to goal as next target
-            logging.debug("ShipNR: " + str(ship.id) + " || Found New Command: " + " || Thrust: " + str(
-                better_speed) + " with Angle: " + str(new_angle))
+            logging.debug("ShipNR: %s || Found New Command:  || Thrust: %s with Angle: %s", ship.id, better_speed, new_angle)
             return ship.thrust(better_speed, new_angle)
 
     def ship_move2(self, ship, target):
@@ -485,7 +469,7 @@ class Bot:
         speed = constants.MAX_SPEED
 
         obstacles_on_path = game_map.obstacles_between(ship, target)
-        logging.debug("ShipNR: " + str(ship.id) + " || OBSTACLES: " + str(obstacles_on_path))
+        logging.debug("ShipNR: %s || OBSTACLES: %s", ship.id, len(obstacles_on_path))
 
         # If ship is already closer then 0.5 units then dont do anything
         # if distance_to_target < 0.5:
@@ -499,13 +483,12 @@ class Bot:
             # If you are already closer then 7, fly with slower speed
             if distance_to_target < 7:
                 smaller_speed = numpy.ceil(distance_to_target)
-                logging.debug(
-                    "ShipNR: " + str(ship.id) + " || Thrust: " + str(smaller_speed) + " with Angle: " + str(angle))
+                logging.debug("ShipNR: %s || Thrust: %s with Angle: %s", ship.id, smaller_speed, angle)
                 ship_pos_dict[ship] = calc_update_pos(ship, smaller_speed, angle)
                 return ship.thrust(smaller_speed, angle)
             # Fly straight as fast as possible
             else:
-                logging.debug("ShipNR: " + str(ship.id) + " || Thrust: " + str(speed) + " with Angle: " + str(angle))
+                logging.debug("ShipNR: %s || Thrust: %s with Angle: %s", ship.id, speed, angle)
                 ship_pos_dict[ship] = calc_update_pos(ship, speed, angle)
                 return ship.thrust(speed, angle)
         else:
@@ -534,12 +517,12 @@ class Bot:
                         dist_to_poss_targ = calc_dist(possible_target, target)
                         ship_targets.append((dist_to_poss_targ, possible_target, speed))
                     speed = speed + 1
-            logging.debug("TIME1 : " + str(time.time() - start_time))
+            logging.debug("TIME1 : %s", time.time() - start_time)
 
             # if it cant find any nearest targets, do nothing
             if len(ship_targets) == 0:
                 logging.debug("COULDNT FIND ANYTHING HELP1")
-                ship_pos_dict[ship] = Position(ship.x, ship.y)
+                ship_pos_dict[ship] = Point(ship.x, ship.y)
                 return None
             # sort these so the one with shortest distance to goal is first
             ship_targets.sort(key=take_first)
@@ -563,8 +546,8 @@ class Bot:
                             # logging.debug(str("COUNTER: " + str(counter)))
                             # if cant find any, stop
                             if counter == len(ship_targets):
-                                ship_pos_dict[ship] = Position(ship.x, ship.y)
-                                logging.debug("COULDNT FIND ANYTHING HELP2" + " || With counter: " + str(counter))
+                                ship_pos_dict[ship] = Point(ship.x, ship.y)
+                                logging.debug("COULDNT FIND ANYTHING HELP2 || With counter: %s", counter)
                                 return None
                             ship_pos_dict[ship] = ship_targets[counter][1]
                             better_speed = ship_targets[counter][2]
@@ -573,25 +556,30 @@ class Bot:
                             restart_counter = restart_counter + 1
             # use the one with shortest distance to goal as next target
             new_angle = ship.calculate_angle_between(ship_pos_dict[ship])
-            logging.debug("TIME2 : " + str(time.time() - start_time))
-            logging.debug("ShipNR: " + str(ship.id) + " || Thrust: " + str(better_speed) + " with Angle: " + str(angle))
+            logging.debug("TIME2 : %s", time.time() - start_time)
+            logging.debug("ShipNR: %s || Thrust: %s with Angle: %s", ship.id, better_speed, angle)
             return ship.thrust(better_speed, new_angle)
 
     def is_enemy_ship(self, test_ship):
-        for ship in self.enemy_ships:
-            if ship == test_ship:
-                return True
-        return False
+        return isinstance(test_ship, Ship) and self.map.get_ship(test_ship.id) is test_ship \
+            and test_ship.owner.id != self.id
+
 
+# Phases and counters of the turn profile (only if profiling is on, see hlt.profiling)
+hlt.profiling.instrument(Bot, 'update', phase='update')
+hlt.profiling.instrument(Bot, 'command_ships', phase='commands')
+hlt.profiling.instrument(Bot, 'planet_priorities', phase='scoring')
+hlt.profiling.instrument(Bot, 'ship_move', phase='navigation')
+hlt.profiling.instrument(Bot, 'ship_move2', phase='navigation')
+hlt.profiling.instrument(sys.modules[__name__], 'check_intersection')
 
 # Basic turn loop. First update our bot, then fetch the commands and send them to the halite engine
 bot = Bot(game)
 while True:
-    start = time.time()
     game_map = game.update_map()
     bot.update(game_map)
     command_queue = bot.command_ships()
     game.send_command_queue(command_queue)
-    logging.debug(len(ship_pos_dict))
-    logging.debug(ship_pos_dict)
-    logging.debug("Time taken: " + str((time.time() - start)))
+    logging.debug("%s", len(ship_pos_dict))
+    logging.debug("%s", ship_pos_dict)
+    logging.debug("Time taken: %s", game.budget.elapsed())
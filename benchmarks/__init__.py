@@ -0,0 +1,5 @@
+"""
+Stand-alone benchmarks for the starter kit and the bots.
+
+Run them from the repository root, e.g. ``python -m benchmarks.bench_parse``.
+"""
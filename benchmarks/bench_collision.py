@@ -0,0 +1,180 @@
+"""
+Cost of the segment-versus-circle tests of hlt.collision, and a check that every variant agrees with the
+implementations it replaced.
+
+The references below are the three copies the bots used to have: the starter kit's scalar test (which AdmiralBot
+had copied verbatim), and CaptainBot's vectorised one, which tests many headings against one obstacle and counts a
+start inside the circle as a hit. Agreement is checked on random segments and circles, except for the pairs whose
+distance lies within a rounding error of the reach, where the order of floating-point operations decides.
+"""
+import math
+import random
+import time
+
+import numpy
+
+from hlt import collision, entity
+
+#: Pairs closer than this to the boundary are left out of the agreement checks
+BOUNDARY = 1e-9
+
+
+def _reference_scalar(start, end, circle, *, fudge=0.5):
+    dx = end.x - start.x
+    dy = end.y - start.y
+
+    a = dx**2 + dy**2
+    b = -2 * (start.x**2 - start.x*end.x - start.x*circle.x + end.x*circle.x +
+              start.y**2 - start.y*end.y - start.y*circle.y + end.y*circle.y)
+
+    if a == 0.0:
+        return start.calculate_distance_between(circle) <= circle.radius + fudge
+
+    t = min(-b / (2 * a), 1.0)
+    if t < 0:
+        return False
+
+    closest_x = start.x + dx * t
+    closest_y = start.y + dy * t
+    closest_distance = entity.Position(closest_x, closest_y).calculate_distance_between(circle)
+
+    return closest_distance <= circle.radius + fudge
+
+
+def _reference_vectorised(start, ex, ey, circle, *, fudge=1.0):
+    sx = start.x
+    sy = start.y
+    cx = circle.x
+    cy = circle.y
+    cr = circle.radius + start.radius + fudge
+
+    dx = ex - sx
+    dy = ey - sy
+
+    a = dx ** 2 + dy ** 2
+    b = (sx ** 2 + sy ** 2 - sx * cx - sy * cy + ex * (cx - sx) + ey * (cy - sy))
+
+    t = numpy.clip(b / (a + 1e-8), 0.0, 1.0)
+
+    closest_x = sx + dx * t
+    closest_y = sy + dy * t
+
+    closest_distance = (closest_x - cx) ** 2 + (closest_y - cy) ** 2
+
+    return closest_distance <= cr ** 2
+
+
+def _margin(sx, sy, ex, ey, cx, cy, reach, from_start):
+    """
+    :return: How far the closest point of every segment is from the reach of every circle (the exact test's
+        decision boundary), as arrays broadcast like the inputs
+    """
+    dx, dy = ex - sx, ey - sy
+    a = dx * dx + dy * dy
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        t = numpy.clip(((cx - sx) * dx + (cy - sy) * dy) / a, 0.0 if from_start else -numpy.inf, 1.0)
+    t = numpy.where(a == 0.0, 0.0, t)
+    distance = numpy.hypot(cx - (sx + dx * t), cy - (sy + dy * t))
+    # a closest point behind the start is decided by t < 0, which is its own boundary
+    behind = numpy.where(t < 0, numpy.abs(t) * numpy.sqrt(a), numpy.inf)
+    return numpy.minimum(numpy.abs(distance - reach), behind)
+
+
+def _random_case(rng, segments, circles, length):
+    sx = rng.uniform(0, 384, segments)
+    sy = rng.uniform(0, 256, segments)
+    angle = rng.uniform(0, 2 * math.pi, segments)
+    distance = rng.uniform(0, length, segments)
+    distance[::17] = 0.0  # some segments that are points
+    ex, ey = sx + distance * numpy.cos(angle), sy + distance * numpy.sin(angle)
+    cx = rng.uniform(0, 384, circles)
+    cy = rng.uniform(0, 256, circles)
+    radius = numpy.where(rng.uniform(size=circles) < 0.2, rng.uniform(3, 16, circles), 0.5)
+    return sx, sy, ex, ey, cx, cy, radius
+
+
+def check_agreement(seed=0, segments=400, circles=300, length=40.0):
+    """
+    Compare every variant with the references on random segments and circles.
+
+    :return: The number of pairs compared and of those left out at the boundary
+    :rtype: (int, int)
+    """
+    rng = numpy.random.default_rng(seed)
+    sx, sy, ex, ey, cx, cy, radius = _random_case(rng, segments, circles, length)
+    fudge = 0.6
+    clear = _margin(sx[:, None], sy[:, None], ex[:, None], ey[:, None], cx, cy, radius + fudge, False) > BOUNDARY
+
+    batch = collision.intersect_segments_circles(sx, sy, ex, ey, cx, cy, radius, fudge=fudge)
+    unfiltered = collision.intersect_segments_circles(sx, sy, ex, ey, cx, cy, radius, fudge=fudge, prefilter=False)
+    assert (batch == unfiltered).all(), "the bounding-box prefilter dropped a hit"
+    first = collision.first_hits(sx, sy, ex, ey, cx, cy, radius, fudge=fudge)
+    assert (first == numpy.where(batch.any(axis=1), batch.argmax(axis=1), -1)).all()
+
+    circle_entities = [entity.Position(x, y) for x, y in zip(cx.tolist(), cy.tolist())]
+    for circle, r in zip(circle_entities, radius.tolist()):
+        circle.radius = r
+    for i in range(segments):
+        start, end = entity.Position(sx[i], sy[i]), entity.Position(ex[i], ey[i])
+        for j, circle in enumerate(circle_entities):
+            scalar = collision.intersect_segment_circle(start, end, circle, fudge=fudge)
+            assert scalar == batch[i, j], "scalar and batch disagree on segment {} and circle {}".format(i, j)
+            if clear[i, j]:
+                assert scalar == _reference_scalar(start, end, circle, fudge=fudge), \
+                    "scalar and reference disagree on segment {} and circle {}".format(i, j)
+
+    # CaptainBot's many headings against one obstacle, with a start inside the circle counting as a hit
+    worker = entity.Position(sx[0], sy[0])
+    worker.radius = 0.5
+    headings = rng.uniform(0, 2 * math.pi, segments)
+    hx, hy = worker.x + length * numpy.cos(headings), worker.y + length * numpy.sin(headings)
+    hits = collision.intersect_segments_circles(worker.x, worker.y, hx, hy, cx, cy, radius + worker.radius,
+                                                fudge=1.0, from_start=True)
+    near = _margin(worker.x, worker.y, hx[:, None], hy[:, None], cx, cy, radius + worker.radius + 1.0, True) \
+        <= BOUNDARY
+    for j, circle in enumerate(circle_entities):
+        expected = _reference_vectorised(worker, hx, hy, circle)
+        assert (hits[:, j] == expected)[~near[:, j]].all(), "batch and CaptainBot's test disagree on circle {}"\
+            .format(j)
+    return segments * circles, int((~clear).sum() + near.sum())
+
+
+def _per_call(function, calls):
+    start = time.perf_counter()
+    for arguments in calls:
+        function(*arguments, fudge=0.6)
+    return (time.perf_counter() - start) / len(calls)
+
+
+def main():
+    compared, boundary = check_agreement()
+    print("All variants agree on {} pairs ({} at the boundary left out)\n".format(compared, boundary))
+
+    rng = random.Random(0)
+    calls = []
+    for _ in range(100000):
+        start = entity.Position(rng.uniform(0, 384), rng.uniform(0, 256))
+        end = entity.Position(start.x + rng.uniform(-7, 7), start.y + rng.uniform(-7, 7))
+        circle = entity.Position(rng.uniform(0, 384), rng.uniform(0, 256))
+        circle.radius = 0.5
+        calls.append((start, end, circle))
+    print("scalar, per call: {:.2f} us, reference {:.2f} us\n".format(
+        _per_call(collision.intersect_segment_circle, calls) * 1e6, _per_call(_reference_scalar, calls) * 1e6))
+
+    print("{:>9} {:>8} {:>14} {:>14} {:>14}".format("segments", "circles", "batch (ms)", "no filter (ms)",
+                                                    "scalar (ms)"))
+    generator = numpy.random.default_rng(1)
+    for segments, circles in ((100, 100), (500, 500), (1000, 2000), (2000, 2000)):
+        case = _random_case(generator, segments, circles, 7.0)
+        timings = []
+        for prefilter in (True, False):
+            start = time.perf_counter()
+            collision.intersect_segments_circles(*case, fudge=0.6, prefilter=prefilter)
+            timings.append(time.perf_counter() - start)
+        # the scalar loop over all pairs, estimated from its per-call cost
+        timings.append(segments * circles * _per_call(collision.intersect_segment_circle, calls[:20000]))
+        print("{:>9} {:>8} {:>14.2f} {:>14.2f} {:>14.0f}".format(segments, circles, *(t * 1000 for t in timings)))
+
+
+if __name__ == '__main__':
+    main()
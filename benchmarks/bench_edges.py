@@ -0,0 +1,208 @@
+"""
+Cost of AdmiralBot's edge scoring and selection versus the number of ships: the original section, which built a list
+of (score, ship, target, kind) tuples ship by ship and target by target and sorted all of it, against the current one,
+which computes one score matrix per target kind with NumPy masks and sorts only chunks of the best remaining edges.
+
+The distance matrices and the per-target scores are computed beforehand and shared, so only the edges are timed.
+Statuses and planet owners are drawn at random and some ships are put within docking range, so all four kinds of edges
+occur; both sections must give the edges in the same order. Selection is timed as the bot walks it: an edge is taken
+if its ship has none yet, and the walk stops once every ship has one.
+"""
+import random
+import timeit
+
+import numpy
+
+from hlt import constants, game_map, geometry
+from hlt.entity import Ship
+from benchmarks import synthetic
+
+MIN_OPPONENT_DIST_TO_DOCK = 25.0
+MIN_OPPONENT_DIST_TO_TARGET_PLANET = 25.0
+MAX_DIST_TO_TARGET_OPPONENT_UNDOCKED_SHIP = 20.0
+UNDOCKED, DOCKING, DOCKED, UNDOCKING = (Ship.DockingStatus.UNDOCKED, Ship.DockingStatus.DOCKING,
+                                        Ship.DockingStatus.DOCKED, Ship.DockingStatus.UNDOCKING)
+EDGE_KINDS = ('dock', 'my_ship', 'opponent_ship', 'planet')
+DOCK_EDGE, MY_SHIP_EDGE, OPPONENT_SHIP_EDGE, PLANET_EDGE = range(len(EDGE_KINDS))
+
+
+class _Turn:
+    """
+    What AdmiralBot knows when it starts scoring the edges of a turn.
+    """
+
+    def __init__(self, parsed, seed):
+        rng = numpy.random.default_rng(seed)
+        ship_columns, planet_columns = parsed.ship_columns, parsed.planet_columns
+        self.my_id = parsed.my_id
+        self.all_my_ships = parsed.get_me().all_ships()
+        self.all_planets = parsed.all_planets()
+        self.planet_columns = planet_columns
+        self.dock_rings = parsed.planet_geometry().dock_rings[planet_columns.id]
+        self.planet_owner = planet_columns.owner
+        is_my_ship = ship_columns.owner == parsed.my_id
+        mx, my = ship_columns.x[is_my_ship], ship_columns.y[is_my_ship]
+        ox, oy = ship_columns.x[~is_my_ship], ship_columns.y[~is_my_ship]
+        self.planet_dist_matrix = geometry.distance_matrix(mx, my, planet_columns.x, planet_columns.y)
+        self.my_ship_dist_matrix = geometry.distance_matrix(mx, my, mx, my)
+        self.ship_dist_matrix = geometry.distance_matrix(mx, my, ox, oy)
+        self.my_ships_status = ship_columns.docking_status[is_my_ship]
+        self.my_ships_undocked = (self.my_ships_status == UNDOCKED) | (self.my_ships_status == UNDOCKING)
+        self.opponent_ships_undocked = ship_columns.docking_status[~is_my_ship] == UNDOCKED
+        self.closest_undocked_opponent_ship = numpy.min(
+            self.ship_dist_matrix + 99999999.0 * ~self.opponent_ships_undocked[numpy.newaxis, :], axis=1)
+        # rounded, so that equal scores (and the order of their ships, targets and kinds) matter too
+        self.planet_score = numpy.round(rng.uniform(0, 100, len(planet_columns)))
+        self.my_ship_score = numpy.round(rng.uniform(0, 100, len(mx)))
+        self.opponent_ship_score = numpy.round(rng.uniform(0, 100, len(ox)))
+
+
+def _reference_edges(turn, early_game_all_in):
+    all_my_ships, all_planets = turn.all_my_ships, turn.all_planets
+    scores = []
+    for k in range(len(all_my_ships)):
+        ship = all_my_ships[k]
+        if ship.docking_status != ship.DockingStatus.UNDOCKED:
+            continue
+        if not early_game_all_in == 1:
+            opponent_too_close_to_target_planet = not turn.closest_undocked_opponent_ship[
+                k] > MIN_OPPONENT_DIST_TO_TARGET_PLANET
+            opponent_too_close_to_dock = not turn.closest_undocked_opponent_ship[k] > MIN_OPPONENT_DIST_TO_DOCK
+            for i in range(len(all_planets)):
+                planet = all_planets[i]
+                if planet.owner is None or planet.owner.id == turn.my_id:
+                    dist_score = -(turn.planet_dist_matrix[k][i] - planet.radius)
+                    opponent_score = -99999999.0 if opponent_too_close_to_target_planet else 0.0
+                    scores.append((turn.planet_score[i] + dist_score + opponent_score, k, i, 'planet'))
+                    if ship.can_dock(planet) and not opponent_too_close_to_dock:
+                        scores.append((99999999.0, k, i, 'dock'))
+        for i in range(len(all_my_ships)):
+            if turn.my_ships_undocked[i]:
+                continue
+            dist_score = -(turn.my_ship_dist_matrix[k][i] - constants.SHIP_RADIUS)
+            scores.append((turn.my_ship_score[i] + dist_score, k, i, 'my_ship'))
+        for i in range(len(turn.opponent_ship_score)):
+            if turn.ship_dist_matrix[k][i] > MAX_DIST_TO_TARGET_OPPONENT_UNDOCKED_SHIP and \
+                    turn.opponent_ships_undocked[i] and not early_game_all_in == 1:
+                continue
+            dist_score = -(turn.ship_dist_matrix[k][i] - constants.SHIP_RADIUS)
+            scores.append((turn.opponent_ship_score[i] + dist_score, k, i, 'opponent_ship'))
+    return sorted(scores, reverse=True)
+
+
+def _edge_matrices(turn, early_game_all_in):
+    movable = numpy.flatnonzero(turn.my_ships_status == UNDOCKED)
+    edges = []
+    if not early_game_all_in == 1:
+        closest_opponent = turn.closest_undocked_opponent_ship[movable]
+        opponent_too_close_to_target_planet = ~(closest_opponent > MIN_OPPONENT_DIST_TO_TARGET_PLANET)
+        opponent_too_close_to_dock = ~(closest_opponent > MIN_OPPONENT_DIST_TO_DOCK)
+        targetable = (turn.planet_owner == -1) | (turn.planet_owner == turn.my_id)
+        dist_score = -(turn.planet_dist_matrix[movable] - turn.planet_columns.radius[numpy.newaxis, :])
+        opponent_score = numpy.where(opponent_too_close_to_target_planet, -99999999.0, 0.0)
+        total_score = turn.planet_score[numpy.newaxis, :] + dist_score + opponent_score[:, numpy.newaxis]
+        edges.append((total_score, movable, targetable[numpy.newaxis, :], PLANET_EDGE))
+        dockable = targetable[numpy.newaxis, :] & ~opponent_too_close_to_dock[:, numpy.newaxis] & (
+            turn.planet_dist_matrix[movable] <= turn.dock_rings + 1e-9)
+        for row, i in zip(*numpy.nonzero(dockable)):
+            dockable[row, i] = turn.all_my_ships[movable[row]].can_dock(turn.all_planets[i])
+        edges.append((numpy.full(dockable.shape, 99999999.0), movable, dockable, DOCK_EDGE))
+    dist_score = -(turn.my_ship_dist_matrix[movable] - constants.SHIP_RADIUS)
+    total_score = turn.my_ship_score[numpy.newaxis, :] + dist_score
+    edges.append((total_score, movable, ~turn.my_ships_undocked[numpy.newaxis, :], MY_SHIP_EDGE))
+    dist_score = -(turn.ship_dist_matrix[movable] - constants.SHIP_RADIUS)
+    total_score = turn.opponent_ship_score[numpy.newaxis, :] + dist_score
+    too_far = (turn.ship_dist_matrix[movable] > MAX_DIST_TO_TARGET_OPPONENT_UNDOCKED_SHIP) & \
+        turn.opponent_ships_undocked[numpy.newaxis, :] & (not early_game_all_in == 1)
+    edges.append((total_score, movable, ~too_far, OPPONENT_SHIP_EDGE))
+
+    edge_score, edge_ship, edge_target, edge_kind = [], [], [], []
+    for total_score, rows, allowed, kind in edges:
+        row, target = numpy.nonzero(numpy.broadcast_to(allowed, total_score.shape))
+        edge_score.append(total_score[row, target])
+        edge_ship.append(rows[row])
+        edge_target.append(target)
+        edge_kind.append(numpy.full(len(row), kind))
+    return (numpy.concatenate(edge_score), numpy.concatenate(edge_ship), numpy.concatenate(edge_target),
+            numpy.concatenate(edge_kind), max(64, 4 * len(movable)))
+
+
+def _edges_in_order(edge_score, edge_ship, edge_target, edge_kind, chunk_size):
+    # as in AdmiralBot
+    remaining = numpy.arange(len(edge_score))
+    while len(remaining):
+        if len(remaining) > chunk_size:
+            scores = edge_score[remaining]
+            threshold = -numpy.partition(-scores, chunk_size - 1)[chunk_size - 1]
+            best = scores >= threshold
+            chunk, remaining = remaining[best], remaining[~best]
+        else:
+            chunk, remaining = remaining, remaining[:0]
+        order = numpy.lexsort((-edge_kind[chunk], -edge_target[chunk], -edge_ship[chunk], -edge_score[chunk]))
+        yield from chunk[order].tolist()
+
+
+def _reference_walk(turn, early_game_all_in):
+    ship_used = numpy.zeros(len(turn.all_my_ships), dtype=bool)
+    for _, ship_idx, _, _ in _reference_edges(turn, early_game_all_in):
+        ship_used[ship_idx] = True
+    return ship_used
+
+
+def _walk(turn, early_game_all_in):
+    edge_score, edge_ship, edge_target, edge_kind, chunk_size = _edge_matrices(turn, early_game_all_in)
+    ship_used = numpy.zeros(len(turn.all_my_ships), dtype=bool)
+    unassigned = len(numpy.unique(edge_ship))
+    for edge in _edges_in_order(edge_score, edge_ship, edge_target, edge_kind, chunk_size):
+        if not unassigned:
+            break
+        ship_idx = int(edge_ship[edge])
+        if not ship_used[ship_idx]:
+            ship_used[ship_idx] = True
+            unassigned -= 1
+    return ship_used
+
+
+def _parsed(ships, seed):
+    """
+    :return: A 2-player map with random docking statuses and planet owners, and a tenth of the ships next to a
+        planet; the ship and planet objects are built after they are drawn
+    :rtype: game_map.Map
+    """
+    parsed = game_map.Map(0, 384, 256)
+    parsed._parse(synthetic.map_string(num_players=2, ships_per_player=ships // 2, seed=seed))
+    rng = random.Random(seed)
+    ship_columns, planet_columns = parsed.ship_columns, parsed.planet_columns
+    ship_columns.docking_status[:] = [rng.randrange(4) for _ in range(len(ship_columns))]
+    planet_columns.owner[:] = [rng.choice((-1, -1, 0, 1)) for _ in range(len(planet_columns))]
+    for row in rng.sample(range(len(ship_columns)), len(ship_columns) // 10):
+        planet = rng.randrange(len(planet_columns))
+        ship_columns.x[row] = planet_columns.x[planet] + planet_columns.radius[planet] + rng.uniform(0.5, 4.5)
+        ship_columns.y[row] = planet_columns.y[planet]
+    return parsed
+
+
+def main():
+    print("{:>6} {:>8} {:>16} {:>16} {:>9}".format("ships", "edges", "reference (ms)", "matrices (ms)", "speedup"))
+    kinds = set()
+    for ships in (50, 100, 200, 500, 1000, 2000):
+        turn = _Turn(_parsed(ships, ships), ships)
+        for early_game_all_in in (1, 0):
+            expected = [(score, k, i, EDGE_KINDS.index(kind))
+                        for score, k, i, kind in _reference_edges(turn, early_game_all_in)]
+            edge_score, edge_ship, edge_target, edge_kind, chunk_size = _edge_matrices(turn, early_game_all_in)
+            found = [(edge_score[e], edge_ship[e], edge_target[e], edge_kind[e])
+                     for e in _edges_in_order(edge_score, edge_ship, edge_target, edge_kind, chunk_size)]
+            assert expected == found, "the edges disagree on {} ships".format(ships)
+            kinds.update(kind for _, _, _, kind in found)
+        assert numpy.array_equal(_reference_walk(turn, 0), _walk(turn, 0))
+        repeat = 5 if ships <= 500 else 2
+        reference = min(timeit.repeat(lambda: _reference_walk(turn, 0), number=1, repeat=repeat))
+        matrices = min(timeit.repeat(lambda: _walk(turn, 0), number=1, repeat=repeat))
+        print("{:>6} {:>8} {:>16.3f} {:>16.3f} {:>8.1f}x".format(
+            ships, len(expected), reference * 1000, matrices * 1000, reference / matrices))
+    assert len(kinds) == len(EDGE_KINDS), "not every kind of edge occurred"
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Round-trip I/O cost per turn: reading and parsing a late-game map line, then sending one command per ship.
+
+The text path reproduces the old networking code (text-mode readline, one write per command); the bytes path
+is the current hlt.networking.Game. Both run against in-memory streams, so only our own overhead is measured.
+"""
+import io
+import sys
+import time
+
+from hlt import game_map, networking
+from benchmarks import synthetic
+
+TURNS = 200
+
+
+def _text_turn(game):
+    game._parse(sys.stdin.readline().rstrip('\n'))
+    for command in _commands:
+        sys.stdout.write(command)
+    sys.stdout.write('\n')
+    sys.stdout.flush()
+
+
+def _bytes_turn(game):
+    game._parse(networking.Game._get_line())
+    networking.Game.send_command_queue(_commands)
+
+
+def _time_per_turn(turn, map_line):
+    stdin, stdout = sys.stdin, sys.stdout
+    sys.stdin = io.TextIOWrapper(io.BytesIO((map_line + '\n').encode('ascii') * TURNS))
+    sys.stdout = io.TextIOWrapper(io.BytesIO())
+    try:
+        game = game_map.Map(0, 384, 256)
+        start = time.perf_counter()
+        for _ in range(TURNS):
+            turn(game)
+        return (time.perf_counter() - start) / TURNS
+    finally:
+        sys.stdin, sys.stdout = stdin, stdout
+
+
+def main():
+    global _commands
+    print("{:>8} {:>10} {:>12} {:>12}".format("ships", "line (KB)", "text (us)", "bytes (us)"))
+    for ships_per_player in (25, 100, 250):
+        map_line = synthetic.map_string(ships_per_player=ships_per_player)
+        _commands = ["t {} 7 {}".format(ship_id, ship_id % 360) for ship_id in range(ships_per_player)]
+        text = _time_per_turn(_text_turn, map_line)
+        binary = _time_per_turn(_bytes_turn, map_line)
+        print("{:>8} {:>10.1f} {:>12.1f} {:>12.1f}".format(
+            4 * ships_per_player, len(map_line) / 1024, text * 1e6, binary * 1e6))
+
+
+if __name__ == '__main__':
+    main()
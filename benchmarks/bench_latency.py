@@ -0,0 +1,133 @@
+"""
+Per-turn latency of every bot on fixed game states, with a budget that fails the run when it is exceeded.
+
+    python -m benchmarks.bench_latency [--bots MyBot.py ...] [--ships 10 100 500 1000 2000] [--repeat 10]
+                                       [--recording game.rec ...] [--budget 1500] [--p99-budget 1000] [--json out]
+                                       [--time-limit 30]
+
+Each synthetic state (a 2-player map with the given total number of ships, see benchmarks.synthetic) is fed to the
+bot --repeat times in a row, and every recording is replayed turn by turn, each for at most --time-limit seconds
+(but at least one turn). The bots run in-process through
+hlt.replay.run_bot, so the numbers are pure decision time without pipes or a second process. The run exits with
+status 1 if any bot's max latency exceeds --budget or its p99 exceeds --p99-budget (both in milliseconds). The
+default budget is hlt.budget.MAX_TURN_TIME, which the bots' turn budgets stay below.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import warnings
+
+from hlt import budget, replay
+from benchmarks import synthetic
+from sim.tournament import latency_summary
+
+BOTS = ('MyBot.py', 'AdmiralBot.py', 'CaptainBot.py', 'StandardBot.py', 'CommanderBot.py')
+SHIP_COUNTS = (10, 100, 500, 1000, 2000)
+WIDTH, HEIGHT = 384, 256
+
+
+def synthetic_lines(ships, repeat, seed=0):
+    """
+    :param int ships: Total number of ships, split over two players
+    :param int repeat: Number of turns to play the state for
+    :param int seed: Seed of the state
+    :return: Engine lines that open with three ships per player, like a real game (CaptainBot plans its opening
+        around them), and then play the same state over and over
+    :rtype: list[bytes]
+    """
+    opening = synthetic.map_string(num_players=2, ships_per_player=3, seed=seed).encode('ascii')
+    state = synthetic.map_string(num_players=2, ships_per_player=max(1, ships // 2), seed=seed).encode('ascii')
+    return [b'0', '{} {}'.format(WIDTH, HEIGHT).encode('ascii'), opening] + [state] * repeat
+
+
+def _until(engine_lines, seconds):
+    """
+    Yield the engine lines, but stop after the first turn once the given time has passed.
+    """
+    start = time.perf_counter()
+    for index, line in enumerate(engine_lines):
+        if index > 3 and time.perf_counter() - start > seconds:
+            return
+        yield line
+
+
+def measure(bot, engine_lines, time_limit):
+    """
+    Run a bot on engine lines in a scratch directory, so its log files do not pile up.
+
+    :param str bot: The bot script
+    :param list[bytes] engine_lines: Tag, map size, then one map line per turn
+    :param float time_limit: Seconds after which no more turns are fed to the bot
+    :return: The latency of each turn in seconds (initialisation excluded), or the error that stopped the bot
+    :rtype: (list[float], str|None)
+    """
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='halite-bench-') as scratch, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        os.chdir(scratch)
+        try:
+            _, latencies = replay.run_bot(bot, _until(engine_lines, time_limit))
+            return latencies[1:], None
+        except Exception as error:
+            return [], '{}: {}'.format(type(error).__name__, error)
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure per-turn bot latency on fixed game states.")
+    parser.add_argument('--bots', nargs='+', default=list(BOTS), help="The bot scripts")
+    parser.add_argument('--ships', nargs='*', type=int, default=list(SHIP_COUNTS),
+                        help="Total ship counts of the synthetic states")
+    parser.add_argument('--repeat', type=int, default=10, help="Turns per synthetic state")
+    parser.add_argument('--recording', action='append', default=[], help="A recorded game to replay (see "
+                                                                          "HLT_RECORD); repeat for several")
+    parser.add_argument('--time-limit', type=float, default=30.0, help="Seconds per bot and state after which "
+                                                                         "no more turns are played")
+    parser.add_argument('--budget', type=float, default=budget.MAX_TURN_TIME * 1000,
+                        help="Max latency allowed, in milliseconds")
+    parser.add_argument('--p99-budget', type=float, help="p99 latency allowed, in milliseconds")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args()
+
+    states = [('{} ships'.format(ships), synthetic_lines(ships, args.repeat)) for ships in args.ships]
+    states += [(os.path.basename(path), replay.read_recording(path)[0]) for path in args.recording]
+
+    print("{:<16} {:<16} {:>6} {:>9} {:>9} {:>9} {:>9}".format(
+        "bot", "state", "turns", "p50 ms", "p95 ms", "p99 ms", "max ms"))
+    results = []
+    failures = []
+    for bot in args.bots:
+        for label, engine_lines in states:
+            latencies, error = measure(os.path.abspath(bot), engine_lines, args.time_limit)
+            summary = latency_summary(latencies)
+            summary.update(bot=bot, state=label, error=error)
+            results.append(summary)
+            if error is not None:
+                print("{:<16} {:<16} {}".format(bot, label, error))
+                failures.append("{} on {} crashed".format(bot, label))
+                continue
+            over = []
+            if summary.get('max_ms', 0.0) > args.budget:
+                over.append("max {:.1f} ms > {:.1f} ms".format(summary['max_ms'], args.budget))
+            if args.p99_budget is not None and summary.get('p99_ms', 0.0) > args.p99_budget:
+                over.append("p99 {:.1f} ms > {:.1f} ms".format(summary['p99_ms'], args.p99_budget))
+            print("{:<16} {:<16} {:>6} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}{}".format(
+                bot, label, summary['turns'], summary.get('p50_ms', 0.0), summary.get('p95_ms', 0.0),
+                summary.get('p99_ms', 0.0), summary.get('max_ms', 0.0), "  OVER BUDGET" if over else ""))
+            failures += ["{} on {}: {}".format(bot, label, reason) for reason in over]
+
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump({'budget_ms': args.budget, 'p99_budget_ms': args.p99_budget, 'results': results}, output,
+                      indent=1)
+    if failures:
+        print("\n".join(["", "Failed:"] + failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
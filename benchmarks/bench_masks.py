@@ -0,0 +1,107 @@
+"""
+Cost of AdmiralBot's docking-status masks versus the number of ships: the original section, which gathered the
+statuses of the ship objects into object arrays of DockingStatus members and looped over the opponents to find the
+closest docked ally of each, against the current one, which compares the int8 status column of the map and does
+that search as one argmin.
+
+The distance matrices are computed beforehand and shared, so only the masks are timed. Statuses are drawn at random,
+so all four of them occur, and both sections must give the same counts and distances.
+"""
+import random
+import timeit
+
+import numpy
+
+from hlt import game_map, geometry
+from hlt.entity import Ship
+from benchmarks import synthetic
+
+MIN_OPPONENT_DIST_TO_DOCK = 25.0
+CLOSE_OPPONENT_DIST = 12.0
+UNDOCKED, DOCKING, DOCKED, UNDOCKING = (Ship.DockingStatus.UNDOCKED, Ship.DockingStatus.DOCKING,
+                                        Ship.DockingStatus.DOCKED, Ship.DockingStatus.UNDOCKING)
+
+
+def _reference_masks(parsed, ship_dist_matrix):
+    all_my_ships = parsed.get_me().all_ships()
+    all_opponent_ships = list(parsed.enemy_ships())
+    # DockingStatus was a plain Enum, which NumPy can only hold as objects
+    my_ships_status = numpy.array([v.docking_status for v in all_my_ships], dtype=object)
+    opponent_ships_status = numpy.array([v.docking_status for v in all_opponent_ships], dtype=object)
+    closest_undocked_opponent_ship = numpy.min(
+        ship_dist_matrix + 99999999.0 * (opponent_ships_status != Ship.DockingStatus.UNDOCKED)[numpy.newaxis, :],
+        axis=1)
+    docked = ((my_ships_status == Ship.DockingStatus.DOCKED) |
+              (my_ships_status == Ship.DockingStatus.DOCKING))[:, numpy.newaxis]
+    cnt_too_close_to_dock_opponent = numpy.sum((ship_dist_matrix < MIN_OPPONENT_DIST_TO_DOCK) * docked, axis=0)
+    cnt_too_close_to_dock_ally = numpy.sum((ship_dist_matrix < MIN_OPPONENT_DIST_TO_DOCK) * docked, axis=1)
+    close_opponent_ship_cnt = numpy.sum(
+        (ship_dist_matrix < CLOSE_OPPONENT_DIST) *
+        (opponent_ships_status == Ship.DockingStatus.UNDOCKED)[numpy.newaxis, :], axis=1)
+    cnt_too_close_to_dock_closest_ally = numpy.zeros(len(all_my_ships), dtype=numpy.int64)
+    for i in range(len(all_opponent_ships)):
+        if opponent_ships_status[i] == Ship.DockingStatus.UNDOCKED:
+            k = numpy.argmin(ship_dist_matrix[:, i] + 99999999.0 * (
+                (my_ships_status == Ship.DockingStatus.UNDOCKED) | (my_ships_status == Ship.DockingStatus.UNDOCKING)))
+            if ship_dist_matrix[k][i] < MIN_OPPONENT_DIST_TO_DOCK:
+                cnt_too_close_to_dock_closest_ally[k] += 1
+    return (closest_undocked_opponent_ship, cnt_too_close_to_dock_opponent, cnt_too_close_to_dock_ally,
+            close_opponent_ship_cnt, cnt_too_close_to_dock_closest_ally)
+
+
+def _masks(parsed, ship_dist_matrix):
+    ship_columns = parsed.ship_columns
+    is_my_ship = ship_columns.owner == parsed.my_id
+    my_ships_status = ship_columns.docking_status[is_my_ship]
+    opponent_ships_status = ship_columns.docking_status[~is_my_ship]
+    my_ships_docked = (my_ships_status == DOCKED) | (my_ships_status == DOCKING)
+    my_ships_undocked = (my_ships_status == UNDOCKED) | (my_ships_status == UNDOCKING)
+    opponent_ships_undocked = opponent_ships_status == UNDOCKED
+    closest_undocked_opponent_ship = numpy.min(
+        ship_dist_matrix + 99999999.0 * ~opponent_ships_undocked[numpy.newaxis, :], axis=1)
+    too_close_to_dock = ship_dist_matrix < MIN_OPPONENT_DIST_TO_DOCK
+    cnt_too_close_to_dock_opponent = numpy.count_nonzero(too_close_to_dock & my_ships_docked[:, numpy.newaxis], axis=0)
+    cnt_too_close_to_dock_ally = numpy.count_nonzero(too_close_to_dock & my_ships_docked[:, numpy.newaxis], axis=1)
+    close_opponent_ship_cnt = numpy.count_nonzero(
+        (ship_dist_matrix < CLOSE_OPPONENT_DIST) & opponent_ships_undocked[numpy.newaxis, :], axis=1)
+    cnt_too_close_to_dock_closest_ally = numpy.zeros(len(my_ships_status), dtype=numpy.int64)
+    if len(my_ships_status) and numpy.any(opponent_ships_undocked):
+        opponents = numpy.flatnonzero(opponent_ships_undocked)
+        closest_ally = numpy.argmin(
+            ship_dist_matrix[:, opponents] + 99999999.0 * my_ships_undocked[:, numpy.newaxis], axis=0)
+        threatened = ship_dist_matrix[closest_ally, opponents] < MIN_OPPONENT_DIST_TO_DOCK
+        numpy.add.at(cnt_too_close_to_dock_closest_ally, closest_ally[threatened], 1)
+    return (closest_undocked_opponent_ship, cnt_too_close_to_dock_opponent, cnt_too_close_to_dock_ally,
+            close_opponent_ship_cnt, cnt_too_close_to_dock_closest_ally)
+
+
+def _parsed(ships, seed):
+    """
+    :return: A 2-player map with random docking statuses; the ship objects are built after they are drawn
+    :rtype: game_map.Map
+    """
+    parsed = game_map.Map(0, 384, 256)
+    parsed._parse(synthetic.map_string(num_players=2, ships_per_player=ships // 2, seed=seed))
+    rng = random.Random(seed)
+    parsed.ship_columns.docking_status[:] = [rng.randrange(4) for _ in range(len(parsed.ship_columns))]
+    return parsed
+
+
+def main():
+    print("{:>6} {:>16} {:>16} {:>9}".format("ships", "reference (ms)", "int8 codes (ms)", "speedup"))
+    for ships in (10, 50, 100, 250, 500, 1000, 2000):
+        parsed = _parsed(ships, ships)
+        ship_columns = parsed.ship_columns
+        mine = ship_columns.owner == parsed.my_id
+        ship_dist_matrix = geometry.distance_matrix(ship_columns.x[mine], ship_columns.y[mine],
+                                                    ship_columns.x[~mine], ship_columns.y[~mine])
+        for expected, found in zip(_reference_masks(parsed, ship_dist_matrix), _masks(parsed, ship_dist_matrix)):
+            assert numpy.array_equal(expected, found), "the masks disagree on {} ships".format(ships)
+        repeat = 20 if ships <= 500 else 5
+        reference = min(timeit.repeat(lambda: _reference_masks(parsed, ship_dist_matrix), number=1, repeat=repeat))
+        codes = min(timeit.repeat(lambda: _masks(parsed, ship_dist_matrix), number=1, repeat=repeat))
+        print("{:>6} {:>16.3f} {:>16.3f} {:>8.1f}x".format(ships, reference * 1000, codes * 1000, reference / codes))
+
+
+if __name__ == '__main__':
+    main()
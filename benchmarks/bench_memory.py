@@ -0,0 +1,205 @@
+"""
+Memory of the entity model: what one Position, Ship or Point costs, and what a whole game costs a bot.
+
+    python -m benchmarks.bench_memory [--bots MyBot.py AdmiralBot.py] [--ships 100] [--turns 300] [--baseline REV]
+
+The first table compares the slotted entities with _DictPosition, a copy of the old Position that kept its attributes
+in a per-instance __dict__: bytes and allocated blocks per live object, and the time to create one. The second plays
+every bot through a game of --turns turns on synthetic states (ships move every turn) in a fresh process, and reports
+the peak RSS of that process and, in a second run under tracemalloc, the largest amount of memory a single turn
+allocates on top of what it started with.
+
+With --baseline, the same game is also played by the bots and starter kit of that git revision (exported to a scratch
+directory with git archive; any revision that has hlt.replay will do), on the same engine lines, and both sides are
+reported. E.g. --baseline a5dd321~1 gives the numbers from before the entities had __slots__.
+"""
+import argparse
+import io
+import os
+import resource
+import subprocess
+import sys
+import tarfile
+import tempfile
+import timeit
+import tracemalloc
+import warnings
+
+from hlt import entity, replay
+from benchmarks import synthetic
+
+BOTS = ('MyBot.py', 'AdmiralBot.py')
+WIDTH, HEIGHT = 384, 256
+COUNT = 100000
+
+
+class _DictPosition:
+    # Position as it was before the entities had __slots__. It cannot subclass Entity, whose slots it would inherit.
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+        self.radius = 0
+        self.health = None
+        self.owner = None
+        self.id = None
+
+
+def _ship(x, y):
+    return entity.Ship(0, 0, x, y, 255, 0, 0, entity.Ship.DockingStatus.UNDOCKED, 0, 0, 0)
+
+
+def _footprint(make):
+    """
+    :return: Bytes and allocated blocks per object, of COUNT live objects
+    :rtype: (float, float)
+    """
+    objects = [None] * COUNT
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    for i in range(COUNT):
+        objects[i] = make(1.0, 2.0)
+    blocks = sys.getallocatedblocks() - blocks
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / COUNT, blocks / COUNT
+
+
+def engine_lines(ships, turns):
+    """
+    :param int ships: Total number of ships, split over two players
+    :param int turns: Number of turns
+    :return: Engine lines of a game whose ships move to new random positions every turn
+    :rtype: list[bytes]
+    """
+    opening = synthetic.map_string(num_players=2, ships_per_player=3).encode('ascii')
+    return [b'0', '{} {}'.format(WIDTH, HEIGHT).encode('ascii'), opening] + [
+        synthetic.map_string(num_players=2, ships_per_player=max(1, ships // 2), seed=turn).encode('ascii')
+        for turn in range(turns)]
+
+
+def _traced(lines, peaks):
+    """
+    Yield the engine lines, recording the memory every turn (initialisation excluded) allocated on top of what it
+    started with.
+    """
+    for index, line in enumerate(lines):
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        yield line
+        _, peak = tracemalloc.get_traced_memory()
+        if index > 2:
+            peaks.append(peak - start)
+
+
+def _peak_rss():
+    """
+    :return: Peak RSS of this process in MB. ru_maxrss would do, but Linux carries it over from the parent process
+        across exec, so VmHWM is read where there is one.
+    :rtype: float
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def play(bot, lines, traced):
+    """
+    Play a bot through a game in this process, in a scratch directory so its log files do not pile up.
+
+    :param str bot: The bot script
+    :param list[bytes] lines: The engine lines
+    :param bool traced: Whether to measure the peak memory of a single turn instead of the peak RSS
+    :return: Peak RSS of this process in MB, or the peak memory of a single turn in KB if traced
+    :rtype: float
+    """
+    peaks = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix='halite-bench-') as scratch, warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        os.chdir(scratch)
+        try:
+            if traced:
+                tracemalloc.start()
+                replay.run_bot(bot, _traced(lines, peaks))
+                tracemalloc.stop()
+            else:
+                replay.run_bot(bot, lines)
+        finally:
+            os.chdir(cwd)
+    if traced:
+        return max(peaks) / 1024
+    return _peak_rss()
+
+
+def _in_child(root, bot, lines_path, traced):
+    # Run as a script, so that hlt comes from root, which may be a baseline tree
+    command = [sys.executable, os.path.abspath(__file__), '--child', bot, '--lines', lines_path] + (
+        ['--traced'] if traced else [])
+    return float(subprocess.run(command, check=True, stdout=subprocess.PIPE,
+                                env=dict(os.environ, PYTHONPATH=root)).stdout)
+
+
+def _export(root, revision, directory):
+    """
+    Extract the tree of a git revision into a directory.
+
+    :param str root: The git checkout
+    :param str revision: The revision, e.g. a5dd321~1
+    :param str directory: Where to extract it
+    :return: nothing
+    """
+    archive = subprocess.run(['git', 'archive', '--format=tar', revision], cwd=root, check=True,
+                             stdout=subprocess.PIPE).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the memory of the entity model and of a whole game.")
+    parser.add_argument('--bots', nargs='+', default=list(BOTS), help="The bot scripts")
+    parser.add_argument('--ships', type=int, default=100, help="Total number of ships on the map")
+    parser.add_argument('--turns', type=int, default=300, help="Number of turns of the game")
+    parser.add_argument('--baseline', help="A git revision whose bots and starter kit to compare against")
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    parser.add_argument('--lines', help=argparse.SUPPRESS)
+    parser.add_argument('--traced', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        with open(args.lines, 'rb') as lines:
+            print(play(args.child, lines.read().split(b'\n'), args.traced))
+        return
+
+    print("{:<14} {:>12} {:>14} {:>12}".format("object", "bytes", "blocks", "create (us)"))
+    for label, make in (('_DictPosition', _DictPosition), ('Position', entity.Position), ('Point', entity.Point),
+                        ('Ship', _ship)):
+        size, blocks = _footprint(make)
+        seconds = min(timeit.repeat(lambda: make(1.0, 2.0), number=COUNT, repeat=5)) / COUNT
+        print("{:<14} {:>12.1f} {:>14.2f} {:>12.3f}".format(label, size, blocks, seconds * 1e6))
+
+    print()
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory(prefix='halite-bench-') as scratch:
+        lines_path = os.path.join(scratch, 'lines')
+        with open(lines_path, 'wb') as lines:
+            lines.write(b'\n'.join(engine_lines(args.ships, args.turns)))
+        trees = [('current', root)]
+        if args.baseline:
+            _export(root, args.baseline, os.path.join(scratch, 'baseline'))
+            trees.insert(0, (args.baseline, os.path.join(scratch, 'baseline')))
+        print("{:<16} {:<12} {:>8} {:>16} {:>18}".format("bot", "revision", "turns", "peak RSS (MB)", "turn peak (KB)"))
+        for bot in args.bots:
+            bot = os.path.relpath(os.path.abspath(bot), root)
+            for revision, tree in trees:
+                rss = _in_child(tree, os.path.join(tree, bot), lines_path, False)
+                turn = _in_child(tree, os.path.join(tree, bot), lines_path, True)
+                print("{:<16} {:<12} {:>8} {:>16.1f} {:>18.1f}".format(
+                    os.path.basename(bot), revision, args.turns, rss, turn))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Cost of Ship.navigate versus the number of ships on the map: the original recursive search of one heading at a time,
+the fan-out of all headings through hlt.collision, and the free-space intervals of hlt.navigation (the default).
+
+Every ship of the first player navigates towards a random point across the map with the default 90 corrections of
+one degree, which is where the recursion is deepest. All three must give the same command for every ship, also with
+ignore_ships, which the recursion only applied to the direct path; the fan-out's fallback to shorter thrusts
+(min_speed) is timed separately, as it may succeed where the others give up. With an expired budget, both modes must
+keep the clear direct paths and give up on the rest.
+"""
+import math
+import random
+import time
+
+from hlt import budget, constants, entity, game_map
+from benchmarks import synthetic
+
+
+def _recursive_navigate(ship, target, parsed, speed, max_corrections=90, angular_step=1, ignore_ships=False,
+                        ignore_planets=False):
+    if max_corrections <= 0:
+        return None
+    distance = ship.calculate_distance_between(target)
+    angle = ship.calculate_angle_between(target)
+    ignore = () if not (ignore_ships or ignore_planets) \
+        else entity.Ship if (ignore_ships and not ignore_planets) \
+        else entity.Planet if (ignore_planets and not ignore_ships) \
+        else entity.Entity
+    if parsed.obstacles_between(ship, target, ignore):
+        new_target_dx = math.cos(math.radians(angle + angular_step)) * distance
+        new_target_dy = math.sin(math.radians(angle + angular_step)) * distance
+        new_target = entity.Position(ship.x + new_target_dx, ship.y + new_target_dy)
+        return _recursive_navigate(ship, new_target, parsed, speed, max_corrections - 1, angular_step)
+    speed = speed if (distance >= speed) else distance
+    return ship.thrust(speed, angle)
+
+
+def _targets(parsed, seed):
+    """
+    :return: (ship, target) pairs, one for every ship of the first player
+    :rtype: list[(entity.Ship, entity.Position)]
+    """
+    rng = random.Random(seed)
+    queries = []
+    for ship in parsed.get_me().all_ships():
+        angle = rng.uniform(0, 2 * math.pi)
+        distance = rng.uniform(10, 100)
+        queries.append((ship, entity.Position(ship.x + distance * math.cos(angle), ship.y + distance * math.sin(angle))))
+    return queries
+
+
+def _time(navigate, parsed, queries, **kwargs):
+    start = time.perf_counter()
+    commands = [navigate(ship, target, parsed, constants.MAX_SPEED, **kwargs) for ship, target in queries]
+    return time.perf_counter() - start, commands
+
+
+def main():
+    print("{:>6} {:>12} {:>12} {:>14} {:>12} {:>8} {:>10} {:>10}".format(
+        "ships", "recurse (ms)", "fan-out (ms)", "intervals (ms)", "fallback", "speedup", "given up", "rescued"))
+    for ships in (50, 100, 250, 500, 1000, 2000):
+        map_string = synthetic.map_string(num_players=2, ships_per_player=ships // 2, seed=ships)
+        parsed = game_map.Map(0, 384, 256)
+        parsed._parse(map_string)
+        queries = _targets(parsed, ships)
+
+        recurse, expected = _time(_recursive_navigate, parsed, queries)
+        fan_out, found = _time(entity.Ship.navigate, parsed, queries, fan_out=True)
+        assert found == expected, "the fan-out and the recursion disagree on {} ships".format(ships)
+        intervals, found = _time(entity.Ship.navigate, parsed, queries)
+        assert found == expected, "the intervals and the recursion disagree on {} ships".format(ships)
+        _, ignoring = _time(_recursive_navigate, parsed, queries, ignore_ships=True)
+        for exact in (False, True):
+            _, found = _time(entity.Ship.navigate, parsed, queries, ignore_ships=True, fan_out=exact)
+            assert found == ignoring, "navigate and the recursion disagree on {} ships, ignoring ships".format(ships)
+            _, found = _time(entity.Ship.navigate, parsed, queries, budget=budget.TurnBudget(0.0), fan_out=exact)
+            assert found == [None if parsed.obstacles_between(ship, target) else command
+                             for (ship, target), command in zip(queries, expected)], "the budget was not kept"
+        fallback, rescued = _time(entity.Ship.navigate, parsed, queries, fan_out=True, min_speed=1)
+        given_up = sum(command is None for command in expected)
+        print("{:>6} {:>12.2f} {:>12.2f} {:>14.2f} {:>12.2f} {:>7.1f}x {:>10} {:>10}".format(
+            ships, recurse * 1000, fan_out * 1000, intervals * 1000, fallback * 1000, recurse / intervals, given_up,
+            given_up - sum(command is None for command in rescued)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Parse time of Map._parse versus the number of ships on the map, for the NumPy columns alone and including the
+lazily built Player, Ship and Planet objects.
+
+The reference parser below is the original star-unpacking implementation, kept here to show the
+quadratic slope it had and to check that the cursor-based parser builds identical maps. The check also holds the
+Map's per-turn ship collections and id index against filtering the object graph by hand.
+"""
+import timeit
+
+from hlt import entity, game_map
+from benchmarks import synthetic
+
+
+def _reference_parse(map_string):
+    tokens = map_string.split()
+    num_players, *tokens = tokens
+    players = {}
+    for _ in range(int(num_players)):
+        player_id, num_ships, *tokens = tokens
+        ships = {}
+        for _ in range(int(num_ships)):
+            (sid, x, y, hp, vel_x, vel_y, docked, docked_planet, progress, cooldown, *tokens) = tokens
+            ships[int(sid)] = entity.Ship(int(player_id), int(sid), float(x), float(y), int(hp),
+                                          float(vel_x), float(vel_y), entity.Ship.DockingStatus(int(docked)),
+                                          int(docked_planet), int(progress), int(cooldown))
+        players[int(player_id)] = ships
+    num_planets, *tokens = tokens
+    planets = {}
+    for _ in range(int(num_planets)):
+        (plid, x, y, hp, r, docking, current, remaining, owned, owner, num_docked, *tokens) = tokens
+        docked_ships = []
+        for _ in range(int(num_docked)):
+            ship_id, *tokens = tokens
+            docked_ships.append(int(ship_id))
+        planets[int(plid)] = (float(x), float(y), int(hp), float(r), int(docking), int(current),
+                              int(remaining), int(owner) if int(owned) else None, docked_ships)
+    return players, planets
+
+
+def _check_identical(map_string):
+    players, planets = _reference_parse(map_string)
+    parsed = game_map.Map(0, 384, 256)
+    parsed._parse(map_string)
+    for player_id, ships in players.items():
+        for ship_id, ship in ships.items():
+            other = parsed.get_player(player_id).get_ship(ship_id)
+            assert (other.x, other.y, other.health, other.docking_status) == \
+                (ship.x, ship.y, ship.health, ship.docking_status)
+    for plid, fields in planets.items():
+        planet = parsed.get_planet(plid)
+        assert (planet.x, planet.y, planet.health, planet.radius, planet.num_docking_spots,
+                planet.current_production, planet.remaining_resources,
+                planet.owner.id if planet.owner else None, planet._docked_ship_ids) == fields
+    everything = [ship for player in parsed.all_players() for ship in player.all_ships()]
+    assert list(parsed.all_ships()) == everything
+    assert list(parsed.enemy_ships()) == [ship for ship in everything if ship.owner.id != parsed.my_id]
+    for status in entity.Ship.DockingStatus:
+        assert list(parsed.ships_with_status(status)) == [ship for ship in everything if ship.docking_status == status]
+        assert list(parsed.ships_with_status(status, parsed.my_id)) == \
+            [ship for ship in parsed.get_me().all_ships() if ship.docking_status == status]
+    assert all(parsed.get_ship(ship.id) is ship for ship in everything)
+
+
+def _parse_with_objects(parsed, map_string):
+    parsed._parse(map_string)
+    return parsed.all_players()
+
+
+def main():
+    print("{:>8} {:>14} {:>14} {:>14}".format("ships", "columns (ms)", "objects (ms)", "reference (ms)"))
+    for ships_per_player in (10, 50, 100, 250, 500):
+        map_string = synthetic.map_string(ships_per_player=ships_per_player)
+        _check_identical(map_string)
+        parsed = game_map.Map(0, 384, 256)
+        repeat = 20
+        columns = min(timeit.repeat(lambda: parsed._parse(map_string), number=1, repeat=repeat))
+        objects = min(timeit.repeat(lambda: _parse_with_objects(parsed, map_string), number=1, repeat=repeat))
+        reference = min(timeit.repeat(lambda: _reference_parse(map_string), number=1, repeat=repeat))
+        print("{:>8} {:>14.3f} {:>14.3f} {:>14.3f}".format(4 * ships_per_player, columns * 1000, objects * 1000,
+                                                         reference * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+Simulator throughput in game-turns per second: G games stepped one after another in separate Simulators versus all
+at once in a BatchSimulator. The ships follow a vectorized expand-and-ram policy, so the games see movement,
+docking, production, collisions and combat without bot processes in the loop. Before timing, it checks that ships
+crashing into a planet damage it, and that enough of them destroy it.
+"""
+import time
+
+import numpy
+
+from hlt import constants
+from hlt.entity import Ship
+from sim import engine
+
+
+def _policy(simulator):
+    """
+    Send every undocked ship to the closest planet it may dock to (or, failing that, the closest planet), and dock
+    once in range.
+
+    :return: The arguments for BatchSimulator.step_arrays
+    :rtype: tuple
+    """
+    ships, planets = simulator.ship_view(), simulator.planet_view()
+    rows = numpy.flatnonzero(ships['status'] == Ship.DockingStatus.UNDOCKED.value)
+    grid = simulator.planet_grid()[ships['game'][rows]]
+    exists = grid >= 0
+    grid = numpy.where(exists, grid, 0)
+    dx = planets['x'][grid] - ships['x'][rows, None]
+    dy = planets['y'][grid] - ships['y'][rows, None]
+    surface = numpy.hypot(dx, dy) - planets['radius'][grid]
+    owner = planets['owner'][grid]
+    open_spot = ((owner == -1) | (owner == ships['owner'][rows, None])) & \
+                (planets['num_docked'][grid] < planets['docking_spots'][grid])
+    preferred = numpy.where(exists & open_spot, surface, numpy.where(exists, surface + 1000.0, numpy.inf))
+    choice = numpy.argmin(preferred, axis=1)
+    picked = numpy.arange(len(rows))
+    distance = surface[picked, choice]
+    target = grid[picked, choice]
+    docking = open_spot[picked, choice] & (distance <= constants.DOCK_RADIUS)
+    thrusting = ~docking
+    angles = numpy.round(numpy.degrees(numpy.arctan2(dy[picked, choice], dx[picked, choice]))) % 360
+    magnitudes = numpy.clip(distance - constants.DOCK_RADIUS / 2, 0, constants.MAX_SPEED).astype(numpy.int64)
+    return (rows[thrusting], magnitudes[thrusting], angles[thrusting],
+            rows[docking], planets['id'][target[docking]], ())
+
+
+def _planet_row(simulator, game, planet):
+    """
+    :return: The row of a planet, or an empty array if it is gone
+    :rtype: numpy.ndarray
+    """
+    planets = simulator._planets
+    return numpy.flatnonzero((planets.game == game) & (planets.id == planet))
+
+
+def _crash(simulator, game, planet, angles, bystander_angle=None):
+    """
+    Put a ship of player 0 at each of the given angles, 3 units off the planet's surface, and send them all into the
+    planet. A bystander ship, if its angle is given, waits 5 units off the surface. The other games get no commands.
+
+    :param engine.BatchSimulator simulator: Fresh games
+    :param int game: The game to crash the ships in
+    :param int planet: The planet's id
+    :return: The health the planet had before, and its row and the bystander's row afterwards (empty if gone)
+    :rtype: (int, numpy.ndarray, numpy.ndarray)
+    """
+    ships, planets = simulator._ships, simulator._planets
+    health = int(planets.health[_planet_row(simulator, game, planet)[0]])
+    angles = list(angles)
+    placed = [(1000 + i, angle, 3.0) for i, angle in enumerate(angles)]
+    if bystander_angle is not None:
+        placed.append((2000, bystander_angle, 5.0))
+    row = _planet_row(simulator, game, planet)[0]
+    for ship_id, angle, gap in placed:
+        distance = planets.radius[row] + gap
+        ships.append(game=game, id=ship_id, owner=0, x=planets.x[row] + distance * numpy.cos(numpy.radians(angle)),
+                     y=planets.y[row] + distance * numpy.sin(numpy.radians(angle)), health=constants.MAX_SHIP_HEALTH,
+                     vel_x=0.0, vel_y=0.0, status=Ship.DockingStatus.UNDOCKED.value, planet=-1, progress=0,
+                     cooldown=0)
+    simulator._sort_ships()
+    line = ' '.join('t {} 4 {}'.format(1000 + i, (angle + 180) % 360) for i, angle in enumerate(angles))
+    engine.BatchSimulator.step(simulator, {game: {0: line.encode('ascii'), 1: b''}})
+    return (health, _planet_row(simulator, game, planet),
+            numpy.flatnonzero((simulator._ships.game == game) & (simulator._ships.id == 2000)))
+
+
+def _check_planet_crashes():
+    """
+    A ship crashing into a planet takes its health off the planet's, and enough of them destroy it: its explosion
+    damages the ships around it. In a batch, only the game the ships crash in is affected.
+    """
+    simulator = engine.Simulator(2, seed=3)
+    health, planet, _ = _crash(simulator, 0, 0, [0])
+    assert simulator._planets.health[planet[0]] == health - constants.MAX_SHIP_HEALTH, "a crash did not damage"
+    simulator = engine.BatchSimulator(2, seeds=(3, 3, 3))
+    untouched = simulator._planets.health[_planet_row(simulator, 0, 0)[0]]
+    crashes = int(untouched) // constants.MAX_SHIP_HEALTH + 1
+    _, planet, bystander = _crash(simulator, 1, 0, range(0, 360, 360 // crashes), bystander_angle=180 // crashes)
+    assert not len(planet), "{} crashes did not destroy the planet".format(crashes)
+    for game in (0, 2):
+        assert simulator._planets.health[_planet_row(simulator, game, 0)[0]] == untouched, "another game was hit"
+    assert len(bystander), "the explosion killed the bystander"
+    assert simulator._ships.health[bystander[0]] < constants.MAX_SHIP_HEALTH, "the explosion did no damage"
+
+
+def _play(simulator):
+    while not simulator.is_over():
+        simulator.step_arrays(*_policy(simulator))
+    return int(simulator.turns.sum())
+
+
+def main():
+    _check_planet_crashes()
+    print("{:>6} {:>22} {:>22} {:>10}".format("games", "sequential (turns/s)", "batched (turns/s)", "speed-up"))
+    for num_games in (1, 8, 64, 256):
+        seeds = list(range(num_games))
+        start = time.perf_counter()
+        sequential_turns = sum(_play(engine.Simulator(2, seed)) for seed in seeds[:min(num_games, 16)])
+        sequential = sequential_turns / (time.perf_counter() - start)
+        start = time.perf_counter()
+        batched_turns = _play(engine.BatchSimulator(2, seeds))
+        batched = batched_turns / (time.perf_counter() - start)
+        print("{:>6} {:>22.0f} {:>22.0f} {:>9.1f}x".format(num_games, sequential, batched, batched / sequential))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+"""
+Cost of Game.initial_map: the old copy.deepcopy of the linked object graph versus Map._snapshot.
+"""
+import copy
+import timeit
+import tracemalloc
+
+from hlt import game_map
+from benchmarks import synthetic
+
+
+def _peak_bytes(function):
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _check_same_view(original, snapshot):
+    assert [p.id for p in snapshot.all_players()] == [p.id for p in original.all_players()]
+    for planet in original.all_planets():
+        frozen = snapshot.get_planet(planet.id)
+        assert (frozen.x, frozen.y, frozen.radius, frozen.num_docking_spots, frozen.is_owned()) == \
+            (planet.x, planet.y, planet.radius, planet.num_docking_spots, planet.is_owned())
+    assert [(s.id, s.x, s.y) for s in snapshot.get_me().all_ships()] == \
+        [(s.id, s.x, s.y) for s in original.get_me().all_ships()]
+
+
+def main():
+    print("{:>8} {:>14} {:>14} {:>14} {:>14}".format(
+        "ships", "deepcopy (ms)", "snapshot (ms)", "deepcopy (KB)", "snapshot (KB)"))
+    for ships_per_player in (3, 50, 250):
+        original = game_map.Map(0, 384, 256)
+        original._parse(synthetic.map_string(ships_per_player=ships_per_player))
+        original.all_players()
+        _check_same_view(original, original._snapshot())
+        deep = min(timeit.repeat(lambda: copy.deepcopy(original), number=1, repeat=10))
+        snapshot = min(timeit.repeat(original._snapshot, number=1, repeat=10))
+        print("{:>8} {:>14.3f} {:>14.3f} {:>14.1f} {:>14.1f}".format(
+            4 * ships_per_player, deep * 1000, snapshot * 1000,
+            _peak_bytes(lambda: copy.deepcopy(original)) / 1024, _peak_bytes(original._snapshot) / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Cost of Map.obstacles_between and Map._intersects_entity versus the number of ships on the map, through the
+uniform grids of hlt.spatial and through a full scan of every entity.
+
+Every turn is parsed afresh, so the grid times include building the ship grid for the turn; the planet grid is
+built on the first turn only, as in a game. The full scan below is the original implementation, kept here to show
+its slope and to check that the grid finds exactly the same obstacles, in the same order.
+"""
+import math
+import random
+import time
+
+from hlt import collision, entity, game_map
+from benchmarks import synthetic
+
+#: Queries per turn: one short move per ship, as a navigating bot makes, plus a few long ones
+QUERIES_PER_SHIP = 1
+LONG_QUERIES = 50
+
+
+def _full_scan_obstacles(parsed, ship, target, ignore=()):
+    obstacles = []
+    entities = ([] if issubclass(entity.Planet, ignore) else parsed.all_planets()) \
+        + ([] if issubclass(entity.Ship, ignore) else parsed._all_ships())
+    for foreign_entity in entities:
+        if foreign_entity == ship or foreign_entity == target:
+            continue
+        if collision.intersect_segment_circle(ship, target, foreign_entity, fudge=ship.radius + 0.1):
+            obstacles.append(foreign_entity)
+    return obstacles
+
+
+def _full_scan_intersects(parsed, target):
+    for celestial_object in parsed._all_ships() + parsed.all_planets():
+        if celestial_object is target:
+            continue
+        d = celestial_object.calculate_distance_between(target)
+        if d <= celestial_object.radius + target.radius + 0.1:
+            return celestial_object
+    return None
+
+
+def _queries(parsed, seed):
+    """
+    :return: (ship, target) pairs: a max-speed move of every ship in a random direction, and some cross-map paths
+    :rtype: list[(entity.Ship, entity.Position)]
+    """
+    rng = random.Random(seed)
+    ships = parsed._all_ships()
+    queries = []
+    for ship in ships * QUERIES_PER_SHIP:
+        angle = rng.uniform(0, 2 * math.pi)
+        queries.append((ship, entity.Position(ship.x + 7 * math.cos(angle), ship.y + 7 * math.sin(angle))))
+    for _ in range(LONG_QUERIES):
+        target = entity.Position(rng.uniform(0, parsed.width), rng.uniform(0, parsed.height))
+        queries.append((rng.choice(ships), target))
+    return queries
+
+
+def _time(function, queries):
+    start = time.perf_counter()
+    results = [function(ship, target) for ship, target in queries]
+    return time.perf_counter() - start, results
+
+
+def main():
+    print("{:>6} {:>8} {:>12} {:>12} {:>8} {:>12} {:>12}".format(
+        "ships", "queries", "grid (ms)", "scan (ms)", "speedup", "point grid", "point scan"))
+    for ships in (50, 100, 250, 500, 1000, 2000):
+        map_string = synthetic.map_string(num_players=2, ships_per_player=ships // 2, seed=ships)
+        parsed = game_map.Map(0, 384, 256)
+        parsed._parse(map_string)
+        parsed.obstacles_between(parsed._all_ships()[0], parsed._all_ships()[1])  # the once-per-game planet grid
+        parsed._parse(map_string)
+        queries = _queries(parsed, ships)
+
+        grid, found = _time(parsed.obstacles_between, queries)
+        scan, expected = _time(lambda ship, target: _full_scan_obstacles(parsed, ship, target), queries)
+        assert found == expected, "the grid and the full scan disagree on {} ships".format(ships)
+        point_grid, found = _time(lambda ship, _: parsed._intersects_entity(ship), queries)
+        point_scan, expected = _time(lambda ship, _: _full_scan_intersects(parsed, ship), queries)
+        assert found == expected, "the grid and the full scan disagree on {} ships".format(ships)
+        print("{:>6} {:>8} {:>12.2f} {:>12.2f} {:>7.1f}x {:>12.2f} {:>12.2f}".format(
+            ships, len(queries), grid * 1000, scan * 1000, scan / grid, point_grid * 1000, point_scan * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""
+Generators for synthetic engine input, so benchmarks do not need a recorded game.
+"""
+import random
+
+
+def map_string(num_players=4, ships_per_player=100, num_planets=28, width=384, height=256, seed=0):
+    """
+    Build a map line in the format the Halite engine sends every turn.
+
+    Every player owns one planet, and about a fifth of each player's ships are docked to it.
+
+    :param int num_players: Number of players on the map
+    :param int ships_per_player: Number of ships each player controls
+    :param int num_planets: Number of planets on the map (at least num_players)
+    :param int width: Map width
+    :param int height: Map height
+    :param int seed: Seed for the random generator
+    :return: The map line, without the trailing newline
+    :rtype: str
+    """
+    rng = random.Random(seed)
+    tokens = [num_players]
+    docked = {}
+    next_id = 0
+    for player_id in range(num_players):
+        tokens += [player_id, ships_per_player]
+        docked[player_id] = []
+        for i in range(ships_per_player):
+            status = 2 if i % 5 == 0 else 0
+            planet = player_id if status else 0
+            if status:
+                docked[player_id].append(next_id)
+            tokens += [next_id, round(rng.uniform(0, width), 4), round(rng.uniform(0, height), 4),
+                       rng.randint(1, 255), 0.0, 0.0, status, planet, 0, 0]
+            next_id += 1
+    tokens.append(num_planets)
+    for plid in range(num_planets):
+        owned = plid < num_players
+        ships = docked[plid] if owned else []
+        tokens += [plid, round(rng.uniform(0, width), 4), round(rng.uniform(0, height), 4),
+                   rng.randint(1000, 3000), round(rng.uniform(3, 16), 4), max(2, len(ships)),
+                   rng.randint(0, 71), rng.randint(0, 2000), int(owned), plid if owned else 0, len(ships)]
+        tokens += ships
+    return ' '.join(str(token) for token in tokens)
@@ -0,0 +1,140 @@
+"""
+The time a bot has left in the current turn.
+
+The engine waits about two seconds for a bot's commands, counted from the moment it sends the map. Game keeps a
+TurnBudget that restarts as soon as the map line arrives (see Game.update_map), so parsing counts against it too.
+Decision code asks it whether it can afford a piece of work before starting it: expired() for a hard stop, or
+can_afford(kind) to compare what is left with what that kind of work has cost so far. run() goes through prioritised
+tasks that way and falls back to a cheap alternative (holding still, docking, a straight thrust) for those that no
+longer fit, so a slow turn degrades in priority order instead of cutting off wherever the clock happened to run out.
+"""
+import collections
+import contextlib
+import time
+
+#: Seconds a turn may take at most, well inside the engine's two seconds; benchmarks.bench_latency fails a bot above it
+MAX_TURN_TIME = 1.5
+#: Seconds a bot plans to spend on a turn by default, leaving room under MAX_TURN_TIME for the last piece of work
+#: to overrun its estimate, and for sending and the pipe
+DEFAULT_LIMIT = 1.3
+#: Weight of the newest cost in the running estimate of a kind of work
+ESTIMATE_WEIGHT = 0.25
+
+Task = collections.namedtuple('Task', ['priority', 'work', 'fallback'])
+Task.__doc__ = """
+A piece of work for TurnBudget.run.
+
+:ivar priority: Higher runs first; equal priorities keep their order
+:ivar work: Called without arguments while the budget lasts
+:ivar fallback: Called without arguments instead once it does not, or None to skip the task
+"""
+
+
+class TurnBudget:
+    """
+    A deadline for the current turn and running estimates of what work costs.
+
+    :ivar limit: Seconds available per turn, counted from restart()
+    :ivar start: When the turn started, on the clock
+    """
+
+    def __init__(self, limit=DEFAULT_LIMIT, clock=time.perf_counter):
+        """
+        :param float limit: Seconds available per turn
+        :param clock: Returns the current time in seconds
+        """
+        self.limit = limit
+        self._clock = clock
+        self._estimates = {}
+        self.start = clock()
+
+    def restart(self):
+        """
+        Start a new turn. Cost estimates carry over, so the first task of a turn is already judged by its history.
+
+        :return: nothing
+        """
+        self.start = self._clock()
+
+    def elapsed(self):
+        """
+        :return: Seconds since the turn started
+        :rtype: float
+        """
+        return self._clock() - self.start
+
+    def remaining(self):
+        """
+        :return: Seconds left in the turn, negative once it is over
+        :rtype: float
+        """
+        return self.limit - self.elapsed()
+
+    def expired(self):
+        """
+        :return: Whether the turn's time is used up
+        :rtype: bool
+        """
+        return self.remaining() <= 0.0
+
+    def estimate(self, kind):
+        """
+        :param kind: A kind of work, e.g. 'navigate'
+        :return: The expected cost of one piece of that kind of work in seconds, 0 if it has never been recorded
+        :rtype: float
+        """
+        return self._estimates.get(kind, 0.0)
+
+    def can_afford(self, kind=None, seconds=0.0):
+        """
+        :param kind: A kind of work whose estimated cost has to fit, if any
+        :param float seconds: Further seconds that have to fit
+        :return: Whether that much work still fits in the turn
+        :rtype: bool
+        """
+        return self.remaining() > seconds + self.estimate(kind)
+
+    def record(self, kind, seconds):
+        """
+        Update the estimate of a kind of work with the cost of one piece of it.
+
+        :param kind: The kind of work
+        :param float seconds: What it cost
+        :return: nothing
+        """
+        if kind in self._estimates:
+            self._estimates[kind] += ESTIMATE_WEIGHT * (seconds - self._estimates[kind])
+        else:
+            self._estimates[kind] = seconds
+
+    @contextlib.contextmanager
+    def timed(self, kind):
+        """
+        Record the time spent inside a with-block as one piece of a kind of work.
+
+        :param kind: The kind of work
+        """
+        start = self._clock()
+        try:
+            yield self
+        finally:
+            self.record(kind, self._clock() - start)
+
+    def run(self, tasks, kind=None):
+        """
+        Run tasks in priority order: the work of each while its estimated cost still fits, its fallback otherwise.
+
+        :param tasks: The tasks
+        :type tasks: collections.Iterable[Task]
+        :param kind: The kind of work the tasks do, whose cost estimate decides whether the next one fits
+        :return: What the work or fallback of every task returned, in the order they ran; skipped tasks give None
+        :rtype: list
+        """
+        results = []
+        for task in sorted(tasks, key=lambda task: -task.priority):
+            if self.can_afford(kind):
+                with self.timed(kind):
+                    results.append(task.work())
+            else:
+                results.append(task.fallback() if task.fallback is not None else None)
+        return results
@@ -1,4 +1,15 @@
-from .entity import Position, Entity
+"""
+Segment-versus-circle intersection, for one pair at a time and for many segments against many circles at once.
+
+All variants share the same geometry: the segment is parameterised as start + t * (end - start), t is the
+parameter of the point closest to the circle's centre, clamped to at most 1, and the segment hits the circle if
+that point is within the circle's radius plus a fudge. A closest point before the start (t < 0) means the segment
+leads away from the circle, which does not count as a hit unless from_start is set, in which case the start
+itself is tested instead.
+"""
+import math
+
+import numpy
 
 
 def intersect_segment_circle(start, end, circle, *, fudge=0.5):
@@ -12,29 +23,110 @@ def intersect_segment_circle(start, end, circle, *, fudge=0.5):
     :return: True if intersects, False otherwise
     :rtype: bool
     """
+    sx, sy, ex, ey, cx, cy = start.x, start.y, end.x, end.y, circle.x, circle.y
+    reach = circle.radius + fudge
+    # Bounding boxes first: a circle clear of the segment's box, grown by the reach, cannot be hit
+    if cx + reach < (sx if sx < ex else ex) or cx - reach > (sx if sx > ex else ex) or \
+            cy + reach < (sy if sy < ey else ey) or cy - reach > (sy if sy > ey else ey):
+        return False
+
     # Derived with SymPy
     # Parameterize the segment as start + t * (end - start),
     # and substitute into the equation of a circle
     # Solve for t
-    dx = end.x - start.x
-    dy = end.y - start.y
-
-    a = dx**2 + dy**2
-    b = -2 * (start.x**2 - start.x*end.x - start.x*circle.x + end.x*circle.x +
-              start.y**2 - start.y*end.y - start.y*circle.y + end.y*circle.y)
-    c = (start.x - circle.x)**2 + (start.y - circle.y)**2
+    dx = ex - sx
+    dy = ey - sy
+    a = dx * dx + dy * dy
 
     if a == 0.0:
         # Start and end are the same point
-        return start.calculate_distance_between(circle) <= circle.radius + fudge
+        return math.sqrt((cx - sx) * (cx - sx) + (cy - sy) * (cy - sy)) <= reach
+
+    b = -2 * (sx * sx - sx * ex - sx * cx + ex * cx + sy * sy - sy * ey - sy * cy + ey * cy)
 
     # Time along segment when closest to the circle (vertex of the quadratic)
     t = min(-b / (2 * a), 1.0)
     if t < 0:
         return False
 
-    closest_x = start.x + dx * t
-    closest_y = start.y + dy * t
-    closest_distance = Position(closest_x, closest_y).calculate_distance_between(circle)
+    closest_x = sx + dx * t
+    closest_y = sy + dy * t
+    return math.sqrt((cx - closest_x) * (cx - closest_x) + (cy - closest_y) * (cy - closest_y)) <= reach
+
+
+def intersect_segments_circles(sx, sy, ex, ey, cx, cy, radius, *, fudge=0.5, from_start=False, prefilter=True):
+    """
+    Test every segment against every circle. Segments and circles are given as arrays (or scalars), which are
+    broadcast to one segment per row and one circle per column.
+
+    :param numpy.ndarray sx: Segment start x-coordinates, shape (n,)
+    :param numpy.ndarray sy: Segment start y-coordinates, shape (n,)
+    :param numpy.ndarray ex: Segment end x-coordinates, shape (n,)
+    :param numpy.ndarray ey: Segment end y-coordinates, shape (n,)
+    :param numpy.ndarray cx: Circle centre x-coordinates, shape (m,)
+    :param numpy.ndarray cy: Circle centre y-coordinates, shape (m,)
+    :param numpy.ndarray radius: Circle radii, shape (m,)
+    :param float fudge: Additional distance to leave between segment and circle
+    :param bool from_start: Whether a circle around the start counts as hit even when the segment leads away from it
+    :param bool prefilter: Whether to run the exact test only on pairs whose bounding boxes overlap; worth it
+        when most pairs are far apart
+    :return: Which segment hits which circle
+    :rtype: numpy.ndarray of bool, shape (n, m)
+    """
+    sx, sy, ex, ey = (numpy.asarray(value, dtype=numpy.float64).reshape(-1, 1) for value in (sx, sy, ex, ey))
+    cx, cy, radius = (numpy.asarray(value, dtype=numpy.float64).reshape(1, -1) for value in (cx, cy, radius))
+    shape = numpy.broadcast_shapes(sx.shape, sy.shape, ex.shape, ey.shape, cx.shape, cy.shape, radius.shape)
+    reach = radius + fudge
+    if not prefilter:
+        return _exact(sx, sy, ex, ey, cx, cy, reach, from_start) & numpy.ones(shape, dtype=bool)
+    rows, columns = numpy.nonzero(bounding_boxes_overlap(sx, sy, ex, ey, cx, cy, reach))
+    hits = numpy.zeros(shape, dtype=bool)
+    hits[rows, columns] = _exact(*(numpy.broadcast_to(value, shape)[rows, columns]
+                                   for value in (sx, sy, ex, ey, cx, cy, reach)), from_start)
+    return hits
+
 
-    return closest_distance <= circle.radius + fudge
+def first_hits(sx, sy, ex, ey, cx, cy, radius, *, fudge=0.5, from_start=False, prefilter=True):
+    """
+    Like intersect_segments_circles, but only report the first circle each segment hits.
+
+    :return: The index of the first circle hit by every segment, or -1 if it hits none
+    :rtype: numpy.ndarray of int, shape (n,)
+    """
+    hits = intersect_segments_circles(sx, sy, ex, ey, cx, cy, radius, fudge=fudge, from_start=from_start,
+                                      prefilter=prefilter)
+    if hits.shape[1] == 0:
+        return numpy.full(hits.shape[0], -1, dtype=numpy.intp)
+    return numpy.where(hits.any(axis=1), hits.argmax(axis=1), -1)
+
+
+def bounding_boxes_overlap(sx, sy, ex, ey, cx, cy, reach):
+    """
+    The cheap prefilter: whether the bounding box of each segment overlaps that of each circle grown by its reach.
+    A segment can only hit a circle if they do. Arguments broadcast like those of intersect_segments_circles.
+
+    :return: Which boxes overlap
+    :rtype: numpy.ndarray of bool
+    """
+    return (cx + reach >= numpy.minimum(sx, ex)) & (cx - reach <= numpy.maximum(sx, ex)) & \
+        (cy + reach >= numpy.minimum(sy, ey)) & (cy - reach <= numpy.maximum(sy, ey))
+
+
+def _exact(sx, sy, ex, ey, cx, cy, reach, from_start):
+    """
+    The exact test of intersect_segment_circle on broadcast arrays.
+    """
+    dx = ex - sx
+    dy = ey - sy
+    a = dx * dx + dy * dy
+    b = -2 * (sx * sx - sx * ex - sx * cx + ex * cx + sy * sy - sy * ey - sy * cy + ey * cy)
+    point = a == 0.0
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        t = numpy.minimum(-b / (2 * a), 1.0)
+    ahead = t >= 0
+    # a segment that is a point, or leads away from the circle with from_start, is tested at its start
+    t = numpy.where(point | ~ahead, 0.0, t)
+    closest_x = sx + dx * t
+    closest_y = sy + dy * t
+    hits = numpy.sqrt((cx - closest_x) * (cx - closest_x) + (cy - closest_y) * (cy - closest_y)) <= reach
+    return hits & (point | ahead | from_start)
@@ -0,0 +1,220 @@
+import copy
+
+import numpy
+
+#: Number of tokens describing one ship in the engine's map line
+SHIP_TOKENS = 10
+#: Number of tokens describing one planet in the engine's map line, excluding its docked ship ids
+PLANET_TOKENS = 11
+
+
+class ShipColumns:
+    """
+    All ships of the map in struct-of-arrays form, one NumPy array per attribute. Rows are grouped by player
+    in the order the engine sends them, which is also the order of Map.all_players() and Player.all_ships().
+
+    :ivar id: The ship IDs.
+    :ivar owner: The player ID owning each ship, as int16.
+    :ivar x: The ship x-coordinates.
+    :ivar y: The ship y-coordinates.
+    :ivar health: The ships' remaining health.
+    :ivar vel_x: The ship x-velocities.
+    :ivar vel_y: The ship y-velocities.
+    :ivar docking_status: The docking status codes, as int8. They compare equal to the members of
+        entity.Ship.DockingStatus, e.g. ``docking_status == Ship.DockingStatus.UNDOCKED``.
+    :ivar docked_planet: The ID of the planet each ship is docked to. Meaningless for undocked ships.
+    :ivar progress: The docking progress of each ship.
+    :ivar cooldown: The weapon cooldown of each ship.
+    :ivar player_ids: The player IDs, in engine order.
+    :ivar player_offsets: Row ranges of each player's ships: player i owns rows player_offsets[i]:player_offsets[i + 1].
+    """
+    _SHIP_ARRAYS = ('id', 'owner', 'x', 'y', 'health', 'vel_x', 'vel_y',
+                    'docking_status', 'docked_planet', 'progress', 'cooldown')
+    _ARRAYS = _SHIP_ARRAYS + ('player_ids', 'player_offsets')
+
+    def __init__(self, capacity, num_players):
+        """
+        Preallocate the columns; they are cut down to the parsed length by _parse.
+
+        :param int capacity: Upper bound on the number of ships
+        :param int num_players: Number of players
+        """
+        self.id = numpy.empty(capacity, dtype=numpy.int32)
+        self.owner = numpy.empty(capacity, dtype=numpy.int16)
+        self.x = numpy.empty(capacity, dtype=numpy.float64)
+        self.y = numpy.empty(capacity, dtype=numpy.float64)
+        self.health = numpy.empty(capacity, dtype=numpy.int32)
+        self.vel_x = numpy.empty(capacity, dtype=numpy.float64)
+        self.vel_y = numpy.empty(capacity, dtype=numpy.float64)
+        self.docking_status = numpy.empty(capacity, dtype=numpy.int8)
+        self.docked_planet = numpy.empty(capacity, dtype=numpy.int32)
+        self.progress = numpy.empty(capacity, dtype=numpy.int32)
+        self.cooldown = numpy.empty(capacity, dtype=numpy.int32)
+        self.player_ids = numpy.empty(num_players, dtype=numpy.int16)
+        self.player_offsets = numpy.zeros(num_players + 1, dtype=numpy.int64)
+
+    def __len__(self):
+        return len(self.id)
+
+    def _truncate(self, length):
+        """
+        Cut every ship column down to the given number of rows (as views, without copying).
+
+        :param int length: The number of parsed ships
+        :return: nothing
+        """
+        for name in self._SHIP_ARRAYS:
+            setattr(self, name, getattr(self, name)[:length])
+
+    def _frozen_copy(self):
+        """
+        :return: A copy of these columns whose arrays are compact and read-only
+        :rtype: ShipColumns
+        """
+        return _frozen_copy(self)
+
+    @staticmethod
+    def _parse(tokens, index):
+        """
+        Parse the ships of all players given a tokenized input.
+
+        Each player's ships are converted as a single block of numbers, so no per-ship Python objects are made.
+
+        :param list[str|bytes] tokens: The tokenized input
+        :param int index: The index of the player count token
+        :return: The ship columns and the index of the first unused token.
+        :rtype: (ShipColumns, int)
+        """
+        num_players = int(tokens[index])
+        index += 1
+        columns = ShipColumns((len(tokens) - index) // SHIP_TOKENS, num_players)
+        row = 0
+        for player in range(num_players):
+            columns.player_ids[player] = int(tokens[index])
+            num_ships = int(tokens[index + 1])
+            index += 2
+            end = index + num_ships * SHIP_TOKENS
+            block = numpy.array(tokens[index:end], dtype=numpy.float64).reshape(num_ships, SHIP_TOKENS)
+            stop = row + num_ships
+            columns.id[row:stop] = block[:, 0]
+            columns.owner[row:stop] = columns.player_ids[player]
+            columns.x[row:stop] = block[:, 1]
+            columns.y[row:stop] = block[:, 2]
+            columns.health[row:stop] = block[:, 3]
+            columns.vel_x[row:stop] = block[:, 4]
+            columns.vel_y[row:stop] = block[:, 5]
+            columns.docking_status[row:stop] = block[:, 6]
+            columns.docked_planet[row:stop] = block[:, 7]
+            columns.progress[row:stop] = block[:, 8]
+            columns.cooldown[row:stop] = block[:, 9]
+            columns.player_offsets[player + 1] = stop
+            row = stop
+            index = end
+        columns._truncate(row)
+        return columns, index
+
+
+class PlanetColumns:
+    """
+    All planets of the map in struct-of-arrays form, one NumPy array per attribute, in engine order.
+
+    :ivar id: The planet IDs.
+    :ivar x: The planet x-coordinates.
+    :ivar y: The planet y-coordinates.
+    :ivar health: The planets' health.
+    :ivar radius: The planet radii.
+    :ivar num_docking_spots: The max number of ships that can be docked to each planet.
+    :ivar current_production: The production each planet has generated towards its next ship.
+    :ivar remaining_resources: The remaining production capacity of each planet.
+    :ivar owner: The player ID owning each planet, or -1 if it is not owned, as int16.
+    :ivar num_docked: The number of ships docked to each planet.
+    :ivar docked_ship_ids: The IDs of all docked ships, planet after planet.
+    :ivar docked_offsets: Ranges into docked_ship_ids: planet i holds docked_offsets[i]:docked_offsets[i + 1].
+    """
+    _ARRAYS = ('id', 'x', 'y', 'health', 'radius', 'num_docking_spots', 'current_production',
+               'remaining_resources', 'owner', 'num_docked', 'docked_offsets', 'docked_ship_ids')
+
+    def __init__(self, capacity):
+        """
+        :param int capacity: Number of planets
+        """
+        self.id = numpy.empty(capacity, dtype=numpy.int32)
+        self.x = numpy.empty(capacity, dtype=numpy.float64)
+        self.y = numpy.empty(capacity, dtype=numpy.float64)
+        self.health = numpy.empty(capacity, dtype=numpy.int32)
+        self.radius = numpy.empty(capacity, dtype=numpy.float64)
+        self.num_docking_spots = numpy.empty(capacity, dtype=numpy.int32)
+        self.current_production = numpy.empty(capacity, dtype=numpy.int32)
+        self.remaining_resources = numpy.empty(capacity, dtype=numpy.int32)
+        self.owner = numpy.empty(capacity, dtype=numpy.int16)
+        self.num_docked = numpy.empty(capacity, dtype=numpy.int32)
+        self.docked_offsets = numpy.zeros(capacity + 1, dtype=numpy.int64)
+        self.docked_ship_ids = numpy.empty(0, dtype=numpy.int32)
+
+    def __len__(self):
+        return len(self.id)
+
+    def docked_ships_of(self, row):
+        """
+        :param int row: The planet's row in the columns
+        :return: The IDs of the ships docked to that planet
+        :rtype: numpy.ndarray
+        """
+        return self.docked_ship_ids[self.docked_offsets[row]:self.docked_offsets[row + 1]]
+
+    def _frozen_copy(self):
+        """
+        :return: A copy of these columns whose arrays are compact and read-only
+        :rtype: PlanetColumns
+        """
+        return _frozen_copy(self)
+
+    @staticmethod
+    def _parse(tokens, index):
+        """
+        Parse planet data given a tokenized input.
+
+        :param list[str|bytes] tokens: The tokenized input
+        :param int index: The index of the planet count token
+        :return: The planet columns and the index of the first unused token.
+        :rtype: (PlanetColumns, int)
+        """
+        num_planets = int(tokens[index])
+        index += 1
+        columns = PlanetColumns(num_planets)
+        docked_ship_ids = []
+        for row in range(num_planets):
+            (plid, x, y, hp, r, docking, current, remaining,
+             owned, owner, num_docked_ships) = tokens[index:index + PLANET_TOKENS]
+            index += PLANET_TOKENS
+            end = index + int(num_docked_ships)
+            columns.id[row] = int(plid)
+            columns.x[row] = float(x)
+            columns.y[row] = float(y)
+            columns.health[row] = int(hp)
+            columns.radius[row] = float(r)
+            columns.num_docking_spots[row] = int(docking)
+            columns.current_production[row] = int(current)
+            columns.remaining_resources[row] = int(remaining)
+            columns.owner[row] = int(owner) if int(owned) else -1
+            columns.num_docked[row] = end - index
+            columns.docked_offsets[row + 1] = columns.docked_offsets[row] + end - index
+            docked_ship_ids.extend(tokens[index:end])
+            index = end
+        columns.docked_ship_ids = numpy.array(docked_ship_ids, dtype=numpy.int32)
+        return columns, index
+
+
+def _frozen_copy(table):
+    """
+    Copy a column table, giving every array its own compact, read-only buffer.
+
+    :param table: The ShipColumns or PlanetColumns to copy
+    :return: The copy
+    """
+    frozen = copy.copy(table)
+    for name in table._ARRAYS:
+        array = getattr(table, name).copy()
+        array.setflags(write=False)
+        setattr(frozen, name, array)
+    return frozen
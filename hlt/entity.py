@@ -1,8 +1,11 @@
 import logging
 import abc
 import math
-from enum import Enum
-from . import constants
+from enum import IntEnum
+
+import numpy
+
+from . import collision, constants, navigation
 
 
 class Entity:
@@ -19,6 +22,7 @@ class Entity:
     :ivar owner: The player ID of the owner, if any. If None, Entity is not owned.
     """
     __metaclass__ = abc.ABCMeta
+    __slots__ = ('id', 'x', 'y', 'radius', 'health', 'owner')
 
     def __init__(self, x, y, radius, health, player, entity_id):
         self.x = x
@@ -56,14 +60,14 @@ class Entity:
         :param Entity target: The target to compare against
         :param int min_distance: Minimum distance specified from the object's outer radius
         :return: The closest point's coordinates
-        :rtype: Position
+        :rtype: Point
         """
         angle = target.calculate_angle_between(self)
         radius = target.radius + min_distance
         x = target.x + radius * math.cos(math.radians(angle))
         y = target.y + radius * math.sin(math.radians(angle))
 
-        return Position(x, y)
+        return Point(x, y)
 
     @abc.abstractmethod
     def _link(self, players, planets):
@@ -92,6 +96,8 @@ class Planet(Entity):
     :ivar owner: The Player object of the owner, if any. Else None if Planet is not owned.
 
     """
+    __slots__ = ('num_docking_spots', 'current_production', 'remaining_resources', '_docked_ship_ids',
+                 '_docked_ships')
 
     def __init__(self, planet_id, x, y, hp, radius, docking_spots, current,
                  remaining, owned, owner, docked_ships):
@@ -157,22 +163,22 @@ class Planet(Entity):
                 self._docked_ships[ship] = self.owner.get_ship(ship)
 
     @staticmethod
-    def _parse_single(tokens):
+    def _parse_single(tokens, index):
         """
         Parse a single planet given tokenized input from the game environment.
 
-        :return: The planet ID, planet object, and unused tokens.
-        :rtype: (int, Planet, list[str])
+        :param list[str] tokens: The tokenized input
+        :param int index: The index of the planet's first token
+        :return: The planet ID, planet object, and the index of the first unused token.
+        :rtype: (int, Planet, int)
         """
         (plid, x, y, hp, r, docking, current, remaining,
-         owned, owner, num_docked_ships, *remainder) = tokens
+         owned, owner, num_docked_ships) = tokens[index:index + 11]
+        index += 11
 
         plid = int(plid)
-        docked_ships = []
-
-        for _ in range(int(num_docked_ships)):
-            ship_id, *remainder = remainder
-            docked_ships.append(int(ship_id))
+        end = index + int(num_docked_ships)
+        docked_ships = [int(ship_id) for ship_id in tokens[index:end]]
 
         planet = Planet(int(plid),
                         float(x), float(y),
@@ -181,26 +187,72 @@ class Planet(Entity):
                         bool(int(owned)), int(owner),
                         docked_ships)
 
-        return plid, planet, remainder
+        return plid, planet, end
 
     @staticmethod
-    def _parse(tokens):
+    def _parse(tokens, index):
         """
         Parse planet data given a tokenized input.
 
         :param list[str] tokens: The tokenized input
-        :return: the populated planet dict and the unused tokens.
-        :rtype: (dict, list[str])
+        :param int index: The index of the planet count token
+        :return: the populated planet dict and the index of the first unused token.
+        :rtype: (dict, int)
         """
-        num_planets, *remainder = tokens
-        num_planets = int(num_planets)
+        num_planets = int(tokens[index])
+        index += 1
         planets = {}
 
         for _ in range(num_planets):
-            plid, planet, remainder = Planet._parse_single(remainder)
+            plid, planet, index = Planet._parse_single(tokens, index)
+            planets[plid] = planet
+
+        return planets, index
+
+    @staticmethod
+    def _from_columns(planet_columns, planets=None):
+        """
+        Create every planet from the planet columns.
+
+        :param columns.PlanetColumns planet_columns: The parsed planet columns
+        :param dict[int, Planet] planets: Planets of the previous turn to update in place instead of recreating
+        :return: The planets keyed by id
+        :rtype: dict[int, Planet]
+        """
+        previous = planets or {}
+        planets = {}
+        docked_ship_ids = planet_columns.docked_ship_ids.tolist()
+        offsets = planet_columns.docked_offsets.tolist()
+        rows = zip(planet_columns.id.tolist(), planet_columns.x.tolist(), planet_columns.y.tolist(),
+                   planet_columns.health.tolist(), planet_columns.radius.tolist(),
+                   planet_columns.num_docking_spots.tolist(), planet_columns.current_production.tolist(),
+                   planet_columns.remaining_resources.tolist(), planet_columns.owner.tolist())
+        for row, (plid, x, y, hp, r, docking, current, remaining, owner) in enumerate(rows):
+            docked_ships = docked_ship_ids[offsets[row]:offsets[row + 1]]
+            planet = previous.get(plid)
+            if planet is None:
+                planet = Planet(plid, x, y, hp, r, docking, current, remaining, owner >= 0, owner, docked_ships)
+            else:
+                planet._update(x, y, hp, r, docking, current, remaining, owner >= 0, owner, docked_ships)
             planets[plid] = planet
+        return planets
+
+    def _update(self, x, y, hp, radius, docking_spots, current, remaining, owned, owner, docked_ships):
+        """
+        Overwrite the state of this planet in place. The owner and docked ships have to be linked again.
 
-        return planets, remainder
+        :return: nothing
+        """
+        self.x = x
+        self.y = y
+        self.radius = radius
+        self.num_docking_spots = docking_spots
+        self.current_production = current
+        self.remaining_resources = remaining
+        self.health = hp
+        self.owner = owner if owned else None
+        self._docked_ship_ids = docked_ships
+        self._docked_ships = {}
 
 
 class Ship(Entity):
@@ -216,8 +268,13 @@ class Ship(Entity):
     :ivar planet: The ID of the planet the ship is docked to, if applicable.
     :ivar owner: The player ID of the owner, if any. If None, Entity is not owned.
     """
+    __slots__ = ('docking_status', 'planet', '_docking_progress', '_weapon_cooldown')
 
-    class DockingStatus(Enum):
+    class DockingStatus(IntEnum):
+        """
+        The docking status of a ship. The members are the codes the engine sends, so they compare equal to the
+        int8 docking_status column of columns.ShipColumns and can be used in NumPy masks as they are.
+        """
         UNDOCKED = 0
         DOCKING = 1
         DOCKED = 2
@@ -270,7 +327,7 @@ class Ship(Entity):
         return "u {}".format(self.id)
 
     def navigate(self, target, game_map, speed, avoid_obstacles=True, max_corrections=90, angular_step=1,
-                 ignore_ships=False, ignore_planets=False):
+                 ignore_ships=False, ignore_planets=False, budget=None, fan_out=False, min_speed=None):
         """
         Move a ship to a specific target position (Entity). It is recommended to place the position
         itself here, else navigate will crash into the target. If avoid_obstacles is set to True (default)
@@ -286,7 +343,15 @@ class Ship(Entity):
         :param int max_corrections: The maximum number of degrees to deviate per turn while trying to pathfind. If exceeded returns None.
         :param int angular_step: The degree difference to deviate if the original destination has obstacles
         :param bool ignore_ships: Whether to ignore ships in calculations (this will make your movement faster, but more precarious)
+            on the direct path; corrected headings avoid every obstacle, as they always have
         :param bool ignore_planets: Whether to ignore planets in calculations (useful if you want to crash onto planets)
+            on the direct path, like ignore_ships
+        :param budget.TurnBudget budget: The turn's budget, if navigate should give up (returning None) instead of
+            correcting a blocked path once it has expired
+        :param bool fan_out: Whether to test all max_corrections headings with hlt.collision's exact test instead
+            (see _fan_out)
+        :param int min_speed: With fan_out, the slowest thrust to fall back to if no heading has a clear path;
+            None for no fallback, as without fan_out
         :return string: The command trying to be passed to the Halite engine or None if movement is not possible within max_corrections degrees.
         :rtype: str
         """
@@ -299,14 +364,71 @@ class Ship(Entity):
             else Ship if (ignore_ships and not ignore_planets) \
             else Planet if (ignore_planets and not ignore_ships) \
             else Entity
+        if avoid_obstacles and fan_out:
+            return self._fan_out(target, game_map, speed, max_corrections, angular_step, ignore, budget, min_speed)
         if avoid_obstacles and game_map.obstacles_between(self, target, ignore):
-            new_target_dx = math.cos(math.radians(angle + angular_step)) * distance
-            new_target_dy = math.sin(math.radians(angle + angular_step)) * distance
-            new_target = Position(self.x + new_target_dx, self.y + new_target_dy)
-            return self.navigate(new_target, game_map, speed, True, max_corrections - 1, angular_step)
+            if budget is not None and budget.expired():
+                return None
+            # the corrections: the first heading, angular_step degrees further each, that the obstacles leave free.
+            # As in the recursion this replaced, they avoid every obstacle, the ignored ones and the target included
+            cx, cy, radius = game_map.obstacles_near(self, distance)
+            blocked = navigation.BlockedHeadings.around(self.x, self.y, distance, cx, cy, radius + self.radius + 0.1)
+            angles = angle + angular_step * numpy.arange(1, max_corrections)
+            free = numpy.flatnonzero(blocked.free(numpy.radians(angles)))
+            if not len(free):
+                return None
+            angle = float(angles[free[0]]) % 360
         speed = speed if (distance >= speed) else distance
         return self.thrust(speed, angle)
 
+    def _fan_out(self, target, game_map, speed, max_corrections, angular_step, ignore, budget, min_speed):
+        """
+        The search of navigate with the exact test: build the headings it would try, angular_step degrees apart,
+        and test the path along each of them against all nearby obstacles in one batch. As in navigate, only the
+        direct path leaves out the ignored obstacles and the target, so the first clear heading gives the same thrust,
+        up to rounding. If there is none, fall back to shorter thrusts: the least deviated heading whose move alone is
+        clear of every obstacle, at the highest speed from speed down to min_speed.
+
+        :return: The thrust command, or None if no candidate is clear or the direct path is blocked once the budget
+            has expired
+        :rtype: str
+        """
+        distance = self.calculate_distance_between(target)
+        speed = speed if (distance >= speed) else distance
+        direct = game_map.obstacles_near(self, distance, ignore, exclude=target)
+        if not len(direct[0]):
+            return self.thrust(speed, self.calculate_angle_between(target))
+        cx, cy, radius = game_map.obstacles_near(self, distance) if ignore or isinstance(target, (Planet, Ship)) \
+            else direct
+
+        angles = (self.calculate_angle_between(target) + angular_step * numpy.arange(max_corrections)) % 360
+        radians = numpy.radians(angles)
+        dx, dy = numpy.cos(radians), numpy.sin(radians)
+        x, y = self.x + dx * distance, self.y + dy * distance
+        blocked = collision.intersect_segments_circles(self.x, self.y, x, y, cx, cy, radius,
+                                                       fudge=self.radius + 0.1).any(axis=1)
+        if cx is not direct[0]:
+            blocked[0] = collision.intersect_segments_circles(self.x, self.y, x[:1], y[:1], *direct,
+                                                              fudge=self.radius + 0.1).any()
+        if blocked[0] and budget is not None and budget.expired():
+            return None
+        clear = numpy.flatnonzero(~blocked)
+        if len(clear):
+            return self.thrust(speed, float(angles[clear[0]]))
+        if min_speed is None or int(speed) < min_speed:
+            return None
+
+        # every heading at every speed, heading-major so the first clear one deviates least and is fastest
+        speeds = numpy.arange(int(speed), min_speed - 1, -1, dtype=numpy.float64)
+        blocked = collision.intersect_segments_circles(
+            self.x, self.y, (self.x + numpy.outer(dx, speeds)).ravel(), (self.y + numpy.outer(dy, speeds)).ravel(),
+            cx, cy, radius, fudge=self.radius + 0.1).any(axis=1)
+        clear = numpy.flatnonzero(~blocked)
+        if not len(clear):
+            return None
+        heading, choice = divmod(int(clear[0]), len(speeds))
+        return self.thrust(float(speeds[choice]), float(angles[heading]))
+
     def can_dock(self, planet):
         """
         Determine whether a ship can dock to a planet
@@ -330,17 +452,18 @@ class Ship(Entity):
         self.planet = planets.get(self.planet)  # If not will just reset to none
 
     @staticmethod
-    def _parse_single(player_id, tokens):
+    def _parse_single(player_id, tokens, index):
         """
         Parse a single ship given tokenized input from the game environment.
 
         :param int player_id: The id of the player who controls the ships
-        :param list[tokens]: The remaining tokens
-        :return: The ship ID, ship object, and unused tokens.
-        :rtype: int, Ship, list[str]
+        :param list[str] tokens: The tokenized input
+        :param int index: The index of the ship's first token
+        :return: The ship ID, ship object, and the index of the first unused token.
+        :rtype: int, Ship, int
         """
         (sid, x, y, hp, vel_x, vel_y,
-         docked, docked_planet, progress, cooldown, *remainder) = tokens
+         docked, docked_planet, progress, cooldown) = tokens[index:index + 10]
 
         sid = int(sid)
         docked = Ship.DockingStatus(int(docked))
@@ -353,23 +476,71 @@ class Ship(Entity):
                     docked, int(docked_planet),
                     int(progress), int(cooldown))
 
-        return sid, ship, remainder
+        return sid, ship, index + 10
 
     @staticmethod
-    def _parse(player_id, tokens):
+    def _parse(player_id, tokens, index):
         """
         Parse ship data given a tokenized input.
 
         :param int player_id: The id of the player who owns the ships
         :param list[str] tokens: The tokenized input
-        :return: The dict of Players and unused tokens.
-        :rtype: (dict, list[str])
+        :param int index: The index of the ship count token
+        :return: The dict of Ships and the index of the first unused token.
+        :rtype: (dict, int)
         """
         ships = {}
-        num_ships, *remainder = tokens
-        for _ in range(int(num_ships)):
-            ship_id, ships[ship_id], remainder = Ship._parse_single(player_id, remainder)
-        return ships, remainder
+        num_ships = int(tokens[index])
+        index += 1
+        for _ in range(num_ships):
+            ship_id, ships[ship_id], index = Ship._parse_single(player_id, tokens, index)
+        return ships, index
+
+    @staticmethod
+    def _from_columns(ship_columns, start, stop, ships=None):
+        """
+        Create the ships held in a range of rows of the ship columns.
+
+        :param columns.ShipColumns ship_columns: The parsed ship columns
+        :param int start: The first row
+        :param int stop: One past the last row
+        :param dict[int, Ship] ships: Ships of the previous turn to update in place instead of recreating
+        :return: The ships keyed by id
+        :rtype: dict[int, Ship]
+        """
+        previous = ships or {}
+        ships = {}
+        statuses = list(Ship.DockingStatus)
+        rows = zip(ship_columns.owner[start:stop].tolist(), ship_columns.id[start:stop].tolist(),
+                   ship_columns.x[start:stop].tolist(), ship_columns.y[start:stop].tolist(),
+                   ship_columns.health[start:stop].tolist(),
+                   ship_columns.vel_x[start:stop].tolist(), ship_columns.vel_y[start:stop].tolist(),
+                   ship_columns.docking_status[start:stop].tolist(), ship_columns.docked_planet[start:stop].tolist(),
+                   ship_columns.progress[start:stop].tolist(), ship_columns.cooldown[start:stop].tolist())
+        for player_id, sid, x, y, hp, vel_x, vel_y, docked, docked_planet, progress, cooldown in rows:
+            ship = previous.get(sid)
+            if ship is None:
+                ship = Ship(player_id, sid, x, y, hp, vel_x, vel_y,
+                            statuses[docked], docked_planet, progress, cooldown)
+            else:
+                ship._update(player_id, x, y, hp, statuses[docked], docked_planet, progress, cooldown)
+            ships[sid] = ship
+        return ships
+
+    def _update(self, player_id, x, y, hp, docking_status, planet, progress, cooldown):
+        """
+        Overwrite the per-turn state of this ship in place. The owner and planet have to be linked again.
+
+        :return: nothing
+        """
+        self.x = x
+        self.y = y
+        self.owner = player_id
+        self.health = hp
+        self.docking_status = docking_status
+        self.planet = planet if (docking_status is not Ship.DockingStatus.UNDOCKED) else None
+        self._docking_progress = progress
+        self._weapon_cooldown = cooldown
 
 
 class Position(Entity):
@@ -383,6 +554,7 @@ class Position(Entity):
     :ivar health: Unused.
     :ivar owner: Unused.
     """
+    __slots__ = ()
 
     def __init__(self, x, y):
         self.x = x
@@ -394,3 +566,31 @@ class Position(Entity):
 
     def _link(self, players, planets):
         raise NotImplementedError("Position should not have link attributes.")
+
+
+class Point:
+    """
+    A coordinate, for the targets and waypoints that only live for one decision. It reads like a Position (x, y, a
+    radius of 0, no health, owner or id, and the distance and angle methods of an Entity) and can be passed wherever
+    one is only read, but it only stores the two coordinates, so it is smaller and quicker to create.
+
+    :ivar x: The x-coordinate.
+    :ivar y: The y-coordinate.
+    """
+    __slots__ = ('x', 'y')
+
+    radius = 0
+    health = None
+    owner = None
+    id = None
+
+    def __init__(self, x, y):
+        self.x = x
+        self.y = y
+
+    calculate_distance_between = Entity.calculate_distance_between
+    calculate_angle_between = Entity.calculate_angle_between
+    closest_point_to = Entity.closest_point_to
+
+    def __repr__(self):
+        return "Point(x={}, y={})".format(self.x, self.y)
@@ -1,13 +1,31 @@
-from . import collision, entity
+import numpy
+
+from . import collision, columns, constants, entity, geometry, spatial
+from .entity import Planet, Ship
+
+#: Largest number of distances nearest_batch and within_radius_batch compute at once
+_CHUNK_ELEMENTS = 1 << 20
 
 
 class Map:
     """
     Map which houses the current game information/metadata.
+
+    The map line is parsed into NumPy columns first; the Player, Ship and Planet objects are only built the first
+    time they are accessed, so vectorized code that sticks to the columns never pays for them. With _update, the
+    objects of the previous turn are patched in place instead of being recreated.
     
     :ivar my_id: Current player id associated with the map
     :ivar width: Map width
     :ivar height: Map height
+    :ivar columns.ShipColumns ship_columns: The ships of the current turn as NumPy arrays
+    :ivar columns.PlanetColumns planet_columns: The planets of the current turn as NumPy arrays
+
+    Obstacle queries go through two uniform grids (see hlt.spatial): one of the planets, built once per game since
+    planets never move, and one of the ships, built on the first query of every turn. For the same reason the
+    planets' geometry is kept for the whole game, while the distance matrices are computed at most once per turn.
+    Likewise the collections of ships (all_ships, enemy_ships, ships_with_status) and the index behind get_ship are
+    built once per turn and handed out as tuples, so repeated queries neither rebuild nor copy them.
     """
 
     def __init__(self, my_id, width, height):
@@ -19,8 +37,44 @@ class Map:
         self.my_id = my_id
         self.width = width
         self.height = height
-        self._players = {}
-        self._planets = {}
+        self.ship_columns = None
+        self.planet_columns = None
+        self._player_objects = {}
+        self._planet_objects = {}
+        self._reusable_players = None
+        self._reusable_planets = None
+        self._planet_grid = None
+        self._ship_grid = None
+        self._ship_tuple = None
+        self._enemy_ships = None
+        self._ship_partitions = {}
+        self._ship_index = None
+        self._geometry = None
+        self._planet_matrix = None
+        self._ship_planet_matrix = None
+        self._ship_matrix = None
+
+    @property
+    def _players(self):
+        """
+        The players keyed by id, built from the columns on first access.
+
+        :rtype: dict[int, Player]
+        """
+        if self._player_objects is None:
+            self._build_entities()
+        return self._player_objects
+
+    @property
+    def _planets(self):
+        """
+        The planets keyed by id, built from the columns on first access.
+
+        :rtype: dict[int, entity.Planet]
+        """
+        if self._planet_objects is None:
+            self._build_entities()
+        return self._planet_objects
 
     def get_me(self):
         """
@@ -59,54 +113,364 @@ class Map:
         """
         return list(self._planets.values())
 
+    def all_ships(self):
+        """
+        :return: The ships of all players, in the order of the ship columns. Shared by all callers of the turn.
+        :rtype: tuple[entity.Ship]
+        """
+        if self._ship_tuple is None:
+            # all_players() may build and link the entities, which lists the ships itself
+            ships = []
+            for player in self.all_players():
+                ships.extend(player.all_ships())
+            self._ship_tuple = tuple(ships)
+        return self._ship_tuple
+
+    def enemy_ships(self):
+        """
+        :return: The ships of every player but the user, in the order of the ship columns. Shared by all callers of
+            the turn.
+        :rtype: tuple[entity.Ship]
+        """
+        if self._enemy_ships is None:
+            ships = self.all_ships()
+            mine = self.ship_rows(self.my_id)
+            self._enemy_ships = ships[:mine.start] + ships[mine.stop:]
+        return self._enemy_ships
+
+    def ships_with_status(self, docking_status, player_id=None):
+        """
+        :param entity.Ship.DockingStatus|int docking_status: The docking status of the ships
+        :param int player_id: Only the ships of this player, if given
+        :return: The ships with the docking status, in the order of the ship columns. Shared by all callers of the
+            turn.
+        :rtype: tuple[entity.Ship]
+        """
+        key = (int(docking_status), player_id)
+        ships = self._ship_partitions.get(key)
+        if ships is None:
+            rows = self.ship_rows(player_id) if player_id is not None else slice(0, len(self.ship_columns))
+            found = numpy.flatnonzero(self.ship_columns.docking_status[rows] == docking_status) + rows.start
+            everything = self.all_ships()
+            ships = self._ship_partitions[key] = tuple(everything[row] for row in found.tolist())
+        return ships
+
+    def get_ship(self, ship_id):
+        """
+        :param int ship_id: The id of the desired ship, whichever player owns it
+        :return: The ship associated with ship_id, or None if there is none
+        :rtype: entity.Ship
+        """
+        if self._ship_index is None:
+            self._ship_index = dict(zip(self.ship_columns.id.tolist(), self.all_ships()))
+        return self._ship_index.get(ship_id)
+
+    def planet_geometry(self):
+        """
+        :return: The distances between the planets, to the centre of the map and their docking rings, computed on
+            the first call and kept for the rest of the game
+        :rtype: geometry.PlanetGeometry
+        """
+        if self._geometry is None:
+            self._geometry = geometry.PlanetGeometry(self.planet_columns, self.width, self.height)
+        return self._geometry
+
+    def planet_distances(self):
+        """
+        :return: The distances between the planets of the current turn, in the order of all_planets(). Read-only.
+        :rtype: numpy.ndarray
+        """
+        if self._planet_matrix is None:
+            ids = self.planet_columns.id
+            distances = self.planet_geometry().distances
+            # the game's table itself, unless planets were destroyed
+            self._planet_matrix = distances if len(ids) == len(distances) else distances[numpy.ix_(ids, ids)]
+            self._planet_matrix.flags.writeable = False
+        return self._planet_matrix
+
+    def ship_planet_distances(self):
+        """
+        :return: The distance from every ship to every planet of the current turn; rows in the order of the ship
+            columns (see ship_rows), columns in the order of all_planets(). Read-only.
+        :rtype: numpy.ndarray
+        """
+        if self._ship_planet_matrix is None:
+            ships, planets = self.ship_columns, self.planet_columns
+            self._ship_planet_matrix = geometry.distance_matrix(ships.x, ships.y, planets.x, planets.y)
+            self._ship_planet_matrix.flags.writeable = False
+        return self._ship_planet_matrix
+
+    def ship_distances(self):
+        """
+        :return: The distance between every two ships of the current turn, in the order of the ship columns (see
+            ship_rows). Read-only.
+        :rtype: numpy.ndarray
+        """
+        if self._ship_matrix is None:
+            ships = self.ship_columns
+            self._ship_matrix = geometry.distance_matrix(ships.x, ships.y, ships.x, ships.y)
+            self._ship_matrix.flags.writeable = False
+        return self._ship_matrix
+
+    def ship_rows(self, player_id):
+        """
+        :param int player_id: The id of a player
+        :return: The rows of the player's ships in the ship columns (and the distance matrices), which are in the
+            order of Player.all_ships()
+        :rtype: slice
+        """
+        ships = self.ship_columns
+        index = numpy.flatnonzero(ships.player_ids == player_id)
+        if not len(index):
+            return slice(0, 0)
+        return slice(int(ships.player_offsets[index[0]]), int(ships.player_offsets[index[0] + 1]))
+
     def nearby_entities_by_distance(self, entity):
         """
+        Prefer nearest() and within_radius(), which only return the entities asked for.
+
         :param entity: The source entity to find distances from
         :return: Dict containing all entities with their designated distances
         :rtype: dict
         """
         result = {}
-        for foreign_entity in self._all_ships() + self.all_planets():
-            if entity == foreign_entity:
-                continue
-            result.setdefault(entity.calculate_distance_between(foreign_entity), []).append(foreign_entity)
+        for kind in (Ship, Planet):
+            entities, distances = self._distances([entity], kind, None, None, None)
+            for foreign_entity, distance in zip(entities, distances[0].tolist()):
+                if distance != numpy.inf:
+                    result.setdefault(distance, []).append(foreign_entity)
         return result
 
+    def nearest(self, entity, k=1, kind=None, owner=None, docking_status=None, planet=None):
+        """
+        Find the entities of a kind closest to an entity (centre to centre), the entity itself excluded.
+
+        :param entity.Entity entity: The entity to search around
+        :param int k: How many to find
+        :param type kind: entity.Ship (default) or entity.Planet
+        :param int|list[int] owner: Only entities owned by this player, or by one of these players
+        :param entity.Ship.DockingStatus|list docking_status: Only ships with this status, or one of these
+        :param entity.Planet planet: Only ships docked (or docking, or undocking) to this planet
+        :return: Up to k entities, nearest first; ties in map order
+        :rtype: list[entity.Entity]
+        """
+        return self.nearest_batch([entity], k, kind, owner, docking_status, planet)[0][0]
+
+    def within_radius(self, entity, radius, kind=None, owner=None, docking_status=None, planet=None):
+        """
+        Find the entities of a kind closer than a radius to an entity (centre to centre), the entity itself
+        excluded. The filters are those of nearest().
+
+        :param entity.Entity entity: The entity to search around
+        :param float radius: The radius
+        :return: The entities, nearest first; ties in map order
+        :rtype: list[entity.Entity]
+        """
+        return self.within_radius_batch([entity], radius, kind, owner, docking_status, planet)[0]
+
+    def nearest_batch(self, entities, k=1, kind=None, owner=None, docking_status=None, planet=None):
+        """
+        nearest() for many entities at once, computed as NumPy distance matrices in chunks.
+
+        :param list[entity.Entity] entities: The entities to search around
+        :return: Up to k entities for every entity, nearest first, and their distances as an array of shape
+            (len(entities), k), padded with inf where fewer than k match
+        :rtype: (list[list[entity.Entity]], numpy.ndarray)
+        """
+        found = []
+        nearest_distances = numpy.full((len(entities), k), numpy.inf)
+        for start, candidates, distances in self._chunks(entities, kind, owner, docking_status, planet):
+            if distances.shape[1] > k:
+                order = numpy.argpartition(distances, k - 1, axis=1)[:, :k]
+                order.sort(axis=1)
+                picked = numpy.take_along_axis(distances, order, axis=1)
+                order = numpy.take_along_axis(order, numpy.argsort(picked, axis=1, kind='stable'), axis=1)
+            else:
+                order = numpy.argsort(distances, axis=1, kind='stable')
+            picked = numpy.take_along_axis(distances, order, axis=1)
+            nearest_distances[start:start + len(picked), :picked.shape[1]] = picked
+            for row, columns in zip(picked.tolist(), order.tolist()):
+                found.append([candidates[column] for column, distance in zip(columns, row) if distance != numpy.inf])
+        return found, nearest_distances
+
+    def within_radius_batch(self, entities, radius, kind=None, owner=None, docking_status=None, planet=None):
+        """
+        within_radius() for many entities at once, computed as NumPy distance matrices in chunks.
+
+        :param list[entity.Entity] entities: The entities to search around
+        :param float radius: The radius
+        :return: The entities closer than the radius to every entity, nearest first
+        :rtype: list[list[entity.Entity]]
+        """
+        found = []
+        for _, candidates, distances in self._chunks(entities, kind, owner, docking_status, planet):
+            for row in distances:
+                columns = numpy.flatnonzero(row < radius)
+                columns = columns[numpy.argsort(row[columns], kind='stable')]
+                found.append([candidates[column] for column in columns.tolist()])
+        return found
+
+    def _chunks(self, entities, kind, owner, docking_status, planet):
+        """
+        Yield the distances from the given entities to the matching entities of a kind, a block of rows at a time.
+
+        :return: The first row of each block, the matching entities and the block of distances (inf for the
+            entity itself)
+        :rtype: collections.Iterable[(int, list[entity.Entity], numpy.ndarray)]
+        """
+        rows = max(1, _CHUNK_ELEMENTS // max(1, self._count(kind)))
+        for start in range(0, len(entities), rows):
+            candidates, distances = self._distances(entities[start:start + rows], kind, owner, docking_status, planet)
+            yield start, candidates, distances
+
+    def _count(self, kind):
+        return len(self.planet_columns if kind is Planet else self.ship_columns)
+
+    def _distances(self, entities, kind, owner, docking_status, planet):
+        """
+        :return: The entities of a kind that match the filters, and the distance from every given entity to each of
+            them (inf for the entity itself)
+        :rtype: (list[entity.Entity], numpy.ndarray)
+        """
+        if kind is Planet:
+            if docking_status is not None or planet is not None:
+                raise ValueError("Planets cannot be filtered by docking status or planet")
+            table = self.planet_columns
+            everything = self.all_planets()
+        else:
+            table = self.ship_columns
+            everything = self.all_ships()
+        match = numpy.ones(len(table.id), dtype=bool)
+        if owner is not None:
+            match &= numpy.isin(table.owner, owner)
+        if docking_status is not None:
+            statuses = [docking_status] if isinstance(docking_status, int) else docking_status
+            match &= numpy.isin(table.docking_status, [int(status) for status in statuses])
+        if planet is not None:
+            match &= (table.docked_planet == planet.id) & \
+                (table.docking_status != Ship.DockingStatus.UNDOCKED.value)
+        rows = numpy.flatnonzero(match)
+        x = numpy.array([source.x for source in entities], dtype=numpy.float64)
+        y = numpy.array([source.y for source in entities], dtype=numpy.float64)
+        distances = numpy.sqrt((table.x[rows] - x[:, None]) ** 2 + (table.y[rows] - y[:, None]) ** 2)
+        own_kind = Planet if kind is Planet else Ship
+        itself = numpy.array([source.id if isinstance(source, own_kind) else -1 for source in entities])
+        distances[table.id[rows] == itself[:, None]] = numpy.inf
+        return [everything[row] for row in rows.tolist()], distances
+
     def _link(self):
         """
         Updates all the entities with the correct ship and planet objects
 
         :return:
         """
-        for celestial_object in self.all_planets() + self._all_ships():
+        for celestial_object in self.all_planets():
+            celestial_object._link(self._players, self._planets)
+        for celestial_object in self.all_ships():
             celestial_object._link(self._players, self._planets)
 
     def _parse(self, map_string):
         """
         Parse the map description from the game.
 
-        :param map_string: The string which the Halite engine outputs
+        :param str|bytes map_string: The string which the Halite engine outputs
         :return: nothing
         """
         tokens = map_string.split()
 
-        self._players, tokens = Player._parse(tokens)
-        self._planets, tokens = entity.Planet._parse(tokens)
+        self.ship_columns, index = columns.ShipColumns._parse(tokens, 0)
+        self.planet_columns, index = columns.PlanetColumns._parse(tokens, index)
+
+        assert(index == len(tokens))  # There should be no remaining tokens at this point
+        self._player_objects = None
+        self._planet_objects = None
+        self._reusable_players = None
+        self._reusable_planets = None
+        self._ship_grid = None
+        self._ship_tuple = None
+        self._enemy_ships = None
+        self._ship_partitions = {}
+        self._ship_index = None
+        self._planet_matrix = None
+        self._ship_planet_matrix = None
+        self._ship_matrix = None
+
+    def _update(self, map_string):
+        """
+        Parse the map description of a new turn, reusing the entity objects of the previous turn.
+
+        Ships, planets and players that are still alive keep their identity and are patched in place the next time
+        the object API is used; dead ones are dropped and new ones are created.
 
-        assert(len(tokens) == 0)  # There should be no remaining tokens at this point
+        :param str|bytes map_string: The string which the Halite engine outputs
+        :return: What changed since the previous turn
+        :rtype: MapDelta
+        """
+        previous_ships = self.ship_columns
+        previous_planets = self.planet_columns
+        players = self._player_objects if self._player_objects is not None else self._reusable_players
+        planets = self._planet_objects if self._planet_objects is not None else self._reusable_planets
+        self._parse(map_string)
+        self._reusable_players = players
+        self._reusable_planets = planets
+        return MapDelta(previous_ships, previous_planets, self.ship_columns, self.planet_columns)
+
+    def _snapshot(self):
+        """
+        Take a read-only copy of the current turn.
+
+        :return: The snapshot
+        :rtype: FrozenMap
+        """
+        return FrozenMap(self)
+
+    def _build_entities(self):
+        """
+        Create and link the Player, Ship and Planet objects of the current turn from the columns, reusing the
+        objects kept by _update where possible.
+
+        :return: nothing
+        """
+        self._player_objects = Player._from_columns(self.ship_columns, self._reusable_players)
+        self._planet_objects = entity.Planet._from_columns(self.planet_columns, self._reusable_planets)
+        self._reusable_players = None
+        self._reusable_planets = None
         self._link()
 
     def _all_ships(self):
         """
-        Helper function to extract all ships from all players
+        Helper function to extract all ships from all players. Prefer all_ships(), which does not copy.
 
         :return: List of ships
         :rtype: List[Ship]
         """
-        all_ships = []
-        for player in self.all_players():
-            all_ships.extend(player.all_ships())
-        return all_ships
+        return list(self.all_ships())
+
+    def _planets_near_segment(self, start, end, reach):
+        """
+        :return: The planets that may lie within reach of the segment from start to end, in id order
+        :rtype: list[entity.Planet]
+        """
+        if self._planet_grid is None:
+            self._planet_grid = spatial.Grid()
+            planets = self.planet_columns
+            for planet_id, x, y, radius in zip(planets.id.tolist(), planets.x.tolist(), planets.y.tolist(),
+                                               planets.radius.tolist()):
+                self._planet_grid.insert(planet_id, x, y, radius)
+        planets = self._planets
+        planet_ids = self._planet_grid.near_segment(start.x, start.y, end.x, end.y, reach)
+        return [planets[planet_id] for planet_id in planet_ids if planet_id in planets]
+
+    def _ships_near_segment(self, start, end, reach):
+        """
+        :return: The ships that may lie within reach of the segment from start to end, in column order
+        :rtype: list[entity.Ship]
+        """
+        ships = self.all_ships()
+        if self._ship_grid is None:
+            self._ship_grid = spatial.Grid.from_points(self.ship_columns.x, self.ship_columns.y,
+                                                       constants.SHIP_RADIUS)
+        return [ships[row] for row in self._ship_grid.near_segment(start.x, start.y, end.x, end.y, reach)]
 
     def _intersects_entity(self, target):
         """
@@ -116,7 +480,9 @@ class Map:
         :return: The colliding entity if so, else None.
         :rtype: entity.Entity
         """
-        for celestial_object in self._all_ships() + self.all_planets():
+        reach = target.radius + 0.1
+        for celestial_object in self._ships_near_segment(target, target, reach) \
+                + self._planets_near_segment(target, target, reach):
             if celestial_object is target:
                 continue
             d = celestial_object.calculate_distance_between(target)
@@ -135,8 +501,9 @@ class Map:
         :rtype: list[entity.Entity]
         """
         obstacles = []
-        entities = ([] if issubclass(entity.Planet, ignore) else self.all_planets()) \
-            + ([] if issubclass(entity.Ship, ignore) else self._all_ships())
+        reach = ship.radius + 0.1
+        entities = ([] if issubclass(entity.Planet, ignore) else self._planets_near_segment(ship, target, reach)) \
+            + ([] if issubclass(entity.Ship, ignore) else self._ships_near_segment(ship, target, reach))
         for foreign_entity in entities:
             if foreign_entity == ship or foreign_entity == target:
                 continue
@@ -144,11 +511,46 @@ class Map:
                 obstacles.append(foreign_entity)
         return obstacles
 
+    def obstacles_near(self, ship, distance, ignore=(), exclude=None):
+        """
+        Gather everything that may obstruct a ship moving up to the given distance in any direction, for callers that
+        test many paths at once: the entities whose circles come within reach of that disc.
+
+        :param entity.Ship ship: Source entity
+        :param float distance: How far the ship may move
+        :param entity.Entity ignore: Which entity type to ignore
+        :param entity.Entity exclude: Another entity to leave out, such as the target
+        :return: The x-coordinates, y-coordinates and radii of the planets in id order, then of the ships in column
+            order, without the ship itself
+        :rtype: (numpy.ndarray, numpy.ndarray, numpy.ndarray)
+        """
+        # slightly further than the exact tests reach, so rounding never drops an obstacle they would hit
+        reach = distance + ship.radius + 0.1 + 1e-6
+        found = []
+        if not issubclass(entity.Planet, ignore):
+            planets = self.planet_columns
+            near = numpy.hypot(planets.x - ship.x, planets.y - ship.y) <= reach + planets.radius
+            if isinstance(exclude, entity.Planet):
+                near &= planets.id != exclude.id
+            found.append((planets.x[near], planets.y[near], planets.radius[near]))
+        if not issubclass(entity.Ship, ignore):
+            ships = self.ship_columns
+            near = numpy.hypot(ships.x - ship.x, ships.y - ship.y) <= reach + constants.SHIP_RADIUS
+            near &= ships.id != ship.id
+            if isinstance(exclude, entity.Ship):
+                near &= ships.id != exclude.id
+            found.append((ships.x[near], ships.y[near], numpy.full(numpy.count_nonzero(near), constants.SHIP_RADIUS)))
+        if not found:
+            return numpy.empty(0), numpy.empty(0), numpy.empty(0)
+        return tuple(numpy.concatenate(column) for column in zip(*found))
+
 
 class Player:
     """
     :ivar id: The player's unique id
     """
+    __slots__ = ('id', '_ships')
+
     def __init__(self, player_id, ships={}):
         """
         :param player_id: User's id
@@ -173,40 +575,141 @@ class Player:
         return self._ships.get(ship_id)
 
     @staticmethod
-    def _parse_single(tokens):
+    def _parse_single(tokens, index):
         """
         Parse one user given an input string from the Halite engine.
 
         :param list[str] tokens: The input string as a list of str from the Halite engine.
-        :return: The parsed player id, player object, and remaining tokens
-        :rtype: (int, Player, list[str])
+        :param int index: The index of the player's first token
+        :return: The parsed player id, player object, and the index of the first unused token
+        :rtype: (int, Player, int)
         """
-        player_id, *remainder = tokens
-        player_id = int(player_id)
-        ships, remainder = entity.Ship._parse(player_id, remainder)
+        player_id = int(tokens[index])
+        ships, index = entity.Ship._parse(player_id, tokens, index + 1)
         player = Player(player_id, ships)
-        return player_id, player, remainder
+        return player_id, player, index
 
     @staticmethod
-    def _parse(tokens):
+    def _parse(tokens, index):
         """
         Parse an entire user input string from the Halite engine for all users.
 
         :param list[str] tokens: The input string as a list of str from the Halite engine.
-        :return: The parsed players in the form of player dict, and remaining tokens
-        :rtype: (dict, list[str])
+        :param int index: The index of the player count token
+        :return: The parsed players in the form of player dict, and the index of the first unused token
+        :rtype: (dict, int)
         """
-        num_players, *remainder = tokens
-        num_players = int(num_players)
+        num_players = int(tokens[index])
+        index += 1
         players = {}
 
         for _ in range(num_players):
-            player, players[player], remainder = Player._parse_single(remainder)
+            player, players[player], index = Player._parse_single(tokens, index)
+
+        return players, index
 
-        return players, remainder
+    @staticmethod
+    def _from_columns(ship_columns, players=None):
+        """
+        Create every player, with its ships, from the ship columns.
+
+        :param columns.ShipColumns ship_columns: The parsed ship columns
+        :param dict[int, Player] players: Players of the previous turn to update in place instead of recreating
+        :return: The players keyed by id
+        :rtype: dict[int, Player]
+        """
+        previous = players or {}
+        players = {}
+        offsets = ship_columns.player_offsets.tolist()
+        for i, player_id in enumerate(ship_columns.player_ids.tolist()):
+            player = previous.get(player_id)
+            if player is None:
+                ships = entity.Ship._from_columns(ship_columns, offsets[i], offsets[i + 1])
+                player = Player(player_id, ships)
+            else:
+                player._ships = entity.Ship._from_columns(ship_columns, offsets[i], offsets[i + 1], player._ships)
+            players[player_id] = player
+        return players
 
     def __str__(self):
         return "Player {} with ships {}".format(self.id, self.all_ships())
 
     def __repr__(self):
         return self.__str__()
+
+
+class FrozenMap(Map):
+    """
+    A read-only copy of a map, backed by copies of its NumPy columns. It offers the same read access as Map, with
+    its own entity objects built on first access, but it cannot be parsed into again.
+    """
+
+    def __init__(self, game_map):
+        """
+        :param Map game_map: The map to copy
+        """
+        super().__init__(game_map.my_id, game_map.width, game_map.height)
+        self.ship_columns = game_map.ship_columns._frozen_copy()
+        self.planet_columns = game_map.planet_columns._frozen_copy()
+        self._player_objects = None
+        self._planet_objects = None
+        self._geometry = game_map._geometry
+
+    def _parse(self, map_string):
+        raise TypeError("A FrozenMap cannot be updated")
+
+    def _update(self, map_string):
+        raise TypeError("A FrozenMap cannot be updated")
+
+
+class MapDelta:
+    """
+    What changed between two consecutive turns. All attributes are NumPy arrays of entity ids, in ascending order.
+
+    :ivar ships_spawned: Ships that did not exist in the previous turn.
+    :ivar ships_died: Ships of the previous turn that no longer exist.
+    :ivar ships_moved: Surviving ships whose position changed.
+    :ivar docking_changed: Surviving ships whose docking status changed.
+    :ivar docking_from: The previous docking status code of each ship in docking_changed.
+    :ivar docking_to: The current docking status code of each ship in docking_changed.
+    :ivar planets_captured: Planets that now have an owner they did not have in the previous turn.
+    :ivar planets_lost: Planets whose previous owner no longer owns them (including destroyed planets).
+    :ivar planets_destroyed: Planets of the previous turn that no longer exist.
+    """
+
+    def __init__(self, previous_ships, previous_planets, ships, planets):
+        """
+        :param columns.ShipColumns previous_ships: The ship columns of the previous turn, or None on the first turn
+        :param columns.PlanetColumns previous_planets: The planet columns of the previous turn, or None on the first turn
+        :param columns.ShipColumns ships: The ship columns of the current turn
+        :param columns.PlanetColumns planets: The planet columns of the current turn
+        """
+        previous_ships = previous_ships if previous_ships is not None else columns.ShipColumns(0, 0)
+        previous_planets = previous_planets if previous_planets is not None else columns.PlanetColumns(0)
+
+        self.ships_spawned = numpy.setdiff1d(ships.id, previous_ships.id, assume_unique=True)
+        self.ships_died = numpy.setdiff1d(previous_ships.id, ships.id, assume_unique=True)
+        alive, old, new = numpy.intersect1d(previous_ships.id, ships.id, assume_unique=True, return_indices=True)
+        moved = (previous_ships.x[old] != ships.x[new]) | (previous_ships.y[old] != ships.y[new])
+        self.ships_moved = alive[moved]
+        changed = previous_ships.docking_status[old] != ships.docking_status[new]
+        self.docking_changed = alive[changed]
+        self.docking_from = previous_ships.docking_status[old][changed]
+        self.docking_to = ships.docking_status[new][changed]
+
+        self.planets_destroyed = numpy.setdiff1d(previous_planets.id, planets.id, assume_unique=True)
+        alive, old, new = numpy.intersect1d(previous_planets.id, planets.id, assume_unique=True, return_indices=True)
+        previous_owner = previous_planets.owner[old]
+        owner = planets.owner[new]
+        self.planets_captured = alive[(owner != previous_owner) & (owner >= 0)]
+        destroyed_owned = numpy.isin(previous_planets.id, self.planets_destroyed) & (previous_planets.owner >= 0)
+        self.planets_lost = numpy.union1d(alive[(owner != previous_owner) & (previous_owner >= 0)],
+                                          previous_planets.id[destroyed_owned])
+
+    def __str__(self):
+        return "MapDelta with {} spawned, {} died, {} moved, {} docking changes, {} captured, {} lost"\
+            .format(len(self.ships_spawned), len(self.ships_died), len(self.ships_moved),
+                    len(self.docking_changed), len(self.planets_captured), len(self.planets_lost))
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,58 @@
+"""
+The geometry of the planets, which never changes during a game: planets do not move, so their distances to each other
+and to the centre of the map, and the rings within which ships can dock to them, are fixed from the first turn.
+
+Map computes it once, on first use, and keeps it for the rest of the game. Tables are indexed by planet id; the rows
+of destroyed planets stay where they are, so the ids of the current turn (PlanetColumns.id) index them directly.
+"""
+import numpy
+
+from . import constants
+
+
+class PlanetGeometry:
+    """
+    Game-lifetime tables of the planets. All arrays are read-only.
+
+    :ivar x: The planet x-coordinates
+    :ivar y: The planet y-coordinates
+    :ivar radius: The planet radii
+    :ivar distances: The distances between the planets' centres, shape (n, n)
+    :ivar center_distances: The distance of every planet's centre to the centre of the map
+    :ivar dock_rings: How close a ship's centre must be to every planet's centre to dock (see Ship.can_dock)
+    """
+
+    def __init__(self, planet_columns, width, height):
+        """
+        :param columns.PlanetColumns planet_columns: The planets of the first turn
+        :param int width: Map width
+        :param int height: Map height
+        """
+        size = int(planet_columns.id.max()) + 1 if len(planet_columns) else 0
+        self.x = numpy.full(size, numpy.nan)
+        self.y = numpy.full(size, numpy.nan)
+        self.radius = numpy.full(size, numpy.nan)
+        self.x[planet_columns.id] = planet_columns.x
+        self.y[planet_columns.id] = planet_columns.y
+        self.radius[planet_columns.id] = planet_columns.radius
+        self.distances = distance_matrix(self.x, self.y, self.x, self.y)
+        dx = self.x - width / 2.0
+        dy = self.y - height / 2.0
+        self.center_distances = numpy.sqrt(dx * dx + dy * dy)
+        self.dock_rings = self.radius + constants.DOCK_RADIUS + constants.SHIP_RADIUS
+        for table in (self.x, self.y, self.radius, self.distances, self.center_distances, self.dock_rings):
+            table.flags.writeable = False
+
+
+def distance_matrix(x1, y1, x2, y2):
+    """
+    :param numpy.ndarray x1: The x-coordinates of the rows
+    :param numpy.ndarray y1: The y-coordinates of the rows
+    :param numpy.ndarray x2: The x-coordinates of the columns
+    :param numpy.ndarray y2: The y-coordinates of the columns
+    :return: The distance from every row point to every column point
+    :rtype: numpy.ndarray
+    """
+    dx = x1[:, numpy.newaxis] - x2[numpy.newaxis, :]
+    dy = y1[:, numpy.newaxis] - y2[numpy.newaxis, :]
+    return numpy.sqrt(dx * dx + dy * dy)
@@ -0,0 +1,105 @@
+"""
+Logging for bots that keeps file I/O off the turn loop.
+
+Records are handed to a queue and written to the log file by a background thread. Records whose arguments are all
+plain values (numbers, strings, None) are also formatted by that thread. Any other argument, such as an entity that
+the next turn patches in place or a lazy one, is formatted on the calling thread, while it still holds the value it
+had when logged. The level defaults to DEBUG and can be lowered or raised without touching code through the
+HLT_LOG_LEVEL environment variable (e.g. INFO, WARNING, or OFF to disable logging entirely).
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+
+#: Environment variable holding the log level name
+LEVEL_VARIABLE = 'HLT_LOG_LEVEL'
+#: Argument types that cannot change after the call, so records with only these are formatted by the thread
+_PLAIN = (str, int, float, type(None))
+
+_listener = None
+
+
+def _level():
+    """
+    :return: The log level configured in the environment
+    :rtype: int
+    """
+    name = os.environ.get(LEVEL_VARIABLE, 'DEBUG').upper()
+    if name == 'OFF':
+        return logging.CRITICAL + 1
+    level = logging.getLevelName(name)
+    if not isinstance(level, int):
+        raise ValueError("Unknown log level {}={}".format(LEVEL_VARIABLE, name))
+    return level
+
+
+def set_up(log_file):
+    """
+    Route the root logger through a queue to a truncated log file written by a background thread.
+    The thread is stopped, and the remaining records flushed, when the interpreter exits or set_up is called again.
+
+    :param str log_file: The path of the log file
+    :return: nothing
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener.handlers[0].close()
+    records = queue.SimpleQueue()
+    file_handler = logging.FileHandler(log_file, mode='w')
+    file_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+    listener = logging.handlers.QueueListener(records, file_handler)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(records))
+    root.setLevel(_level())
+    listener.start()
+    if _listener is None:
+        atexit.register(_stop)
+    _listener = listener
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """
+    A QueueHandler that leaves formatting to the background thread where that is safe; the stock one formats every
+    record on the calling thread.
+    """
+
+    def prepare(self, record):
+        """
+        :param logging.LogRecord record: The record logged
+        :return: The record itself if its message and arguments are plain values; otherwise a copy with the message
+            formatted, as QueueHandler.prepare makes
+        :rtype: logging.LogRecord
+        """
+        if record.exc_info or record.stack_info or not isinstance(record.msg, str) or \
+                not isinstance(record.args, tuple) or not all(isinstance(arg, _PLAIN) for arg in record.args):
+            return super().prepare(record)
+        return record
+
+
+def _stop():
+    """
+    Stop the background thread, writing out the records still queued.
+
+    :return: nothing
+    """
+    _listener.stop()
+
+
+class lazy:
+    """
+    A log argument computed only if the record is actually emitted, e.g.
+    ``logging.debug("Obstacles: %s", lazy(game_map.obstacles_between, ship, target))``.
+    """
+
+    def __init__(self, function, *args, **kwargs):
+        self._function = function
+        self._args = args
+        self._kwargs = kwargs
+
+    def __str__(self):
+        return str(self._function(*self._args, **self._kwargs))
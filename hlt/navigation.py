@@ -0,0 +1,151 @@
+"""
+The headings a ship can move along, from the geometry of its obstacles instead of by probing one heading at a time.
+
+A straight move of length L from the ship hits a circle of reach R (its radius plus any fudge) whose centre is at
+distance d exactly when the heading lies within a half-width w of the direction of the centre:
+
+* d <= R: the move starts within reach. Every heading is blocked if from_start is set (or L is 0); otherwise, as
+  in hlt.collision, only the headings that do not lead away from the centre, w = pi / 2.
+* L >= sqrt(d^2 - R^2): the move gets as far as the tangent points, w = asin(R / d).
+* L >= d - R: only the end of the move gets within reach, w = acos((d^2 + L^2 - R^2) / (2 d L)).
+* Otherwise the circle is out of reach.
+
+The blocked intervals are merged once, after which testing a heading is a binary search. Apart from rounding at the
+edges of the intervals, this agrees with hlt.collision's tests of the same moves.
+"""
+import math
+
+import numpy
+
+#: A full turn in radians
+TAU = 2 * math.pi
+
+
+class BlockedHeadings:
+    """
+    The union of the headings blocked by a ship's obstacles, as disjoint closed intervals of radians in [0, 2 pi].
+
+    :ivar starts: The start of every interval, ascending
+    :ivar ends: The end of every interval
+    """
+
+    def __init__(self, starts, ends):
+        """
+        :param numpy.ndarray starts: The start of every interval, ascending
+        :param numpy.ndarray ends: The end of every interval; intervals must not overlap
+        """
+        self.starts = starts
+        self.ends = ends
+
+    @staticmethod
+    def around(x, y, length, cx, cy, reach, *, from_start=False):
+        """
+        Work out which headings a move of the given length from (x, y) cannot take without hitting a circle.
+
+        :param float x: Start x-coordinate
+        :param float y: Start y-coordinate
+        :param float length: Length of the move
+        :param numpy.ndarray cx: Circle centre x-coordinates
+        :param numpy.ndarray cy: Circle centre y-coordinates
+        :param numpy.ndarray reach: How close the move may come to each centre (radius plus fudge)
+        :param bool from_start: Whether a circle around the start blocks every heading, rather than only those that
+            do not lead away from it
+        :return: The blocked headings
+        :rtype: BlockedHeadings
+        """
+        dx = numpy.asarray(cx, dtype=numpy.float64) - x
+        dy = numpy.asarray(cy, dtype=numpy.float64) - y
+        reach = numpy.broadcast_to(numpy.asarray(reach, dtype=numpy.float64), dx.shape)
+        distance = numpy.hypot(dx, dy)
+        inside = distance <= reach
+        if inside.any() and (from_start or length == 0):
+            return BlockedHeadings(numpy.zeros(1), numpy.full(1, TAU))
+
+        outside = ~inside
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            tangent = outside & (length * length >= distance * distance - reach * reach)
+            end_only = outside & ~tangent & (length >= distance - reach)
+            width = numpy.where(inside, math.pi / 2, 0.0)
+            width[tangent] = numpy.arcsin(reach[tangent] / distance[tangent])
+            d, r = distance[end_only], reach[end_only]
+            width[end_only] = numpy.arccos(numpy.clip((d * d + length * length - r * r) / (2 * d * length), -1, 1))
+        near = inside | tangent | end_only
+        if not near.any():
+            return BlockedHeadings(numpy.empty(0), numpy.empty(0))
+
+        width = width[near]
+        starts = numpy.mod(numpy.arctan2(dy[near], dx[near]) - width, TAU)
+        ends = starts + 2 * width
+        # intervals running past a full turn continue from 0
+        wrapped = ends > TAU
+        starts = numpy.concatenate((starts, numpy.zeros(numpy.count_nonzero(wrapped))))
+        ends = numpy.concatenate((numpy.minimum(ends, TAU), ends[wrapped] - TAU))
+        return BlockedHeadings._merge(starts, ends)
+
+    @staticmethod
+    def _merge(starts, ends):
+        """
+        :return: The union of closed intervals, as disjoint intervals in ascending order
+        :rtype: BlockedHeadings
+        """
+        order = numpy.argsort(starts, kind='stable')
+        starts, ends = starts[order], numpy.maximum.accumulate(ends[order])
+        # an interval opens a new group unless it starts within the ones before it
+        first = numpy.ones(len(starts), dtype=bool)
+        first[1:] = starts[1:] > ends[:-1]
+        last = numpy.ones(len(starts), dtype=bool)
+        last[:-1] = first[1:]
+        return BlockedHeadings(starts[first], ends[last])
+
+    def blocked(self, headings):
+        """
+        :param numpy.ndarray headings: Headings in radians, any range
+        :return: Which of the headings are blocked
+        :rtype: numpy.ndarray of bool
+        """
+        headings = numpy.mod(headings, TAU)
+        interval = numpy.searchsorted(self.starts, headings, side='right') - 1
+        if not len(self.ends):
+            return numpy.zeros(headings.shape, dtype=bool)
+        return (interval >= 0) & (headings <= self.ends[numpy.maximum(interval, 0)])
+
+    def free(self, headings):
+        """
+        :param numpy.ndarray headings: Headings in radians, any range
+        :return: Which of the headings are free
+        :rtype: numpy.ndarray of bool
+        """
+        return ~self.blocked(headings)
+
+    def free_intervals(self):
+        """
+        :return: The open intervals of free headings, in ascending order. The last one may run past 2 pi when the
+            free headings wrap around 0.
+        :rtype: list[(float, float)]
+        """
+        if not len(self.starts):
+            return [(0.0, TAU)]
+        starts, ends = self.starts.tolist(), self.ends.tolist()
+        gaps = list(zip(ends[:-1], starts[1:]))
+        # the gap across 0, from the end of the last interval to the start of the first, a full turn later
+        if ends[-1] < starts[0] + TAU:
+            if starts[0] > 0.0 or ends[-1] < TAU:
+                gaps.append((ends[-1], starts[0] + TAU))
+        return gaps
+
+    def closest_free(self, heading):
+        """
+        :param float heading: The desired heading in radians
+        :return: The heading itself if it is free, else the nearest edge of a free interval (where a move just
+            grazes an obstacle), or None if every heading is blocked
+        :rtype: float
+        """
+        if not self.blocked(numpy.array([heading]))[0]:
+            return heading
+        best = None
+        for start, end in self.free_intervals():
+            for edge in (start, end):
+                gap = abs((edge - heading + math.pi) % TAU - math.pi)
+                if best is None or gap < best[0]:
+                    best = (gap, edge % TAU)
+        return None if best is None else best[1]
@@ -1,15 +1,25 @@
 import sys
+import os
+import gzip
+import atexit
 import logging
-import copy
 
-from . import game_map
+from . import budget, game_map, logs, profiling
+
+#: Environment variable naming a file to record the engine stream to (see Game.__init__)
+RECORD_VARIABLE = 'HLT_RECORD'
 
 
 class Game:
     """
     :ivar map: Current map representation
-    :ivar initial_map: The initial version of the map before game starts
+    :ivar initial_map: A read-only snapshot (game_map.FrozenMap) of the map before the game starts
+    :ivar delta: What changed in the last turn (game_map.MapDelta), or None unless the game is incremental
+    :ivar budget: The time left in the current turn (budget.TurnBudget), restarted when the map line arrives
     """
+    #: Open recording file, if the engine stream is being recorded
+    _recording = None
+
     @staticmethod
     def _send_string(s):
         """
@@ -18,7 +28,7 @@ class Game:
         :param str s: String to send
         :return: nothing
         """
-        sys.stdout.write(s)
+        sys.stdout.buffer.write(s.encode('ascii'))
 
     @staticmethod
     def _done_sending():
@@ -27,8 +37,39 @@ class Game:
 
         :return: nothing
         """
-        sys.stdout.write('\n')
-        sys.stdout.flush()
+        sys.stdout.buffer.write(b'\n')
+        sys.stdout.buffer.flush()
+
+    @staticmethod
+    def _send_line(line):
+        """
+        Send one complete line to the game with a single write, recording it if requested.
+
+        :param bytes line: The line to send, without the trailing newline
+        :return: nothing
+        """
+        sys.stdout.buffer.write(line + b'\n')
+        sys.stdout.buffer.flush()
+        if Game._recording is not None:
+            Game._recording.write(b'>' + line + b'\n')
+            Game._recording.flush()
+
+    @staticmethod
+    def _get_line():
+        """
+        Read one line of input from the game, without decoding it. The map parser accepts bytes directly.
+
+        :return: The input read from the Halite engine
+        :rtype: bytes
+        :raises EOFError: If the engine closed the stream
+        """
+        line = sys.stdin.buffer.readline()
+        if not line:
+            raise EOFError("The Halite engine closed the input stream")
+        line = line.rstrip(b'\n')
+        if Game._recording is not None:
+            Game._recording.write(b'<' + line + b'\n')
+        return line
 
     @staticmethod
     def _get_string():
@@ -38,49 +79,74 @@ class Game:
         :return: The input read from the Halite engine
         :rtype: str
         """
-        result = sys.stdin.readline().rstrip('\n')
-        return result
+        return Game._get_line().decode('ascii')
 
     @staticmethod
     def send_command_queue(command_queue):
         """
-        Issue the given list of commands.
+        Issue the given list of commands. They are encoded together and sent with a single write.
 
         :param list[str] command_queue: List of commands to send the Halite engine
         :return: nothing
         """
-        for command in command_queue:
-            Game._send_string(command)
+        Game._send_line(''.join(command_queue).encode('ascii'))
 
-        Game._done_sending()
+    @staticmethod
+    def _start_recording(path):
+        """
+        Record every line read from and sent to the engine. Lines read are prefixed with '<', lines sent with '>';
+        the file is gzip-compressed if its name ends with .gz. See hlt.replay for reading it back.
+
+        :param str path: The file to record to
+        :return: nothing
+        """
+        recording = gzip.open(path, 'wb') if path.endswith('.gz') else open(path, 'wb')
+        atexit.register(recording.close)
+        Game._recording = recording
 
     @staticmethod
     def _set_up_logging(tag, name):
         """
-        Set up and truncate the log
+        Set up and truncate the log. Records are written by a background thread (see hlt.logs).
 
         :param tag: The user tag (used for naming the log)
         :param name: The bot name (used for naming the log)
         :return: nothing
         """
         log_file = "{}_{}.log".format(tag, name)
-        logging.basicConfig(filename=log_file, level=logging.DEBUG, filemode='w')
-        logging.info("Initialized bot {}".format(name))
+        logs.set_up(log_file)
+        logging.info("Initialized bot %s", name)
 
-    def __init__(self, name):
+    def __init__(self, name, incremental=False, record=None, profile=None):
         """
         Initialize the bot with the given name.
 
         :param name: The name of the bot.
+        :param bool incremental: Whether to patch the map's entities in place every turn and report a delta,
+            rather than rebuilding them. Entity objects then stay valid (and up to date) across turns.
+        :param str record: A file to record the engine stream to. Defaults to the HLT_RECORD environment variable,
+            in which "{name}" is replaced by the bot name. Nothing is recorded if neither is set.
+        :param str profile: A file to write per-turn phase times and call counts to (see hlt.profiling). Defaults to
+            the HLT_PROFILE environment variable, in which "{name}" is replaced by the bot name.
         """
         self._name = name
+        self._incremental = incremental
+        self.delta = None
+        self.budget = budget.TurnBudget()
         self._send_name = False
-        tag = int(self._get_string())
+        Game._recording = None
+        record = record or os.environ.get(RECORD_VARIABLE)
+        if record:
+            Game._start_recording(record.format(name=name))
+        profile = profile or os.environ.get(profiling.PROFILE_VARIABLE)
+        if profile:
+            profiling.enable(profile.format(name=name), name)
+        tag = int(self._get_line())
         Game._set_up_logging(tag, name)
-        width, height = [int(x) for x in self._get_string().strip().split()]
+        width, height = [int(x) for x in self._get_line().split()]
         self.map = game_map.Map(tag, width, height)
         self.update_map()
-        self.initial_map = copy.deepcopy(self.map)
+        self.initial_map = self.map._snapshot()
         self._send_name = True
 
     def update_map(self):
@@ -91,9 +157,13 @@ class Game:
         :rtype: game_map.Map
         """
         if self._send_name:
-            self._send_string(self._name)
-            self._done_sending()
+            self._send_line(self._name.encode('ascii'))
             self._send_name = False
         logging.info("---NEW TURN---")
-        self.map._parse(self._get_string())
+        line = self._get_line()
+        self.budget.restart()
+        if self._incremental:
+            self.delta = self.map._update(line)
+        else:
+            self.map._parse(line)
         return self.map
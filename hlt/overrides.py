@@ -0,0 +1,92 @@
+"""
+Typed parameter overrides for bots, without evaluating code.
+
+Overrides are a mapping from parameter names to literal values. They come from the HLT_OVERRIDES environment
+variable and from the command line after the word ``define``, e.g.
+
+    python CaptainBot.py define "{'THREAT_CUTOFF': 25, 'DEFENDER_DISTANCE': 2.5}"
+
+Both are read as JSON, or failing that as a Python literal (ast.literal_eval), so they can hold numbers, strings,
+booleans, lists and dicts but nothing executable. Command-line values win over the environment.
+"""
+import ast
+import json
+import os
+import sys
+
+#: Environment variable holding overrides as a JSON object
+OVERRIDES_VARIABLE = 'HLT_OVERRIDES'
+#: The command-line word after which overrides follow
+DEFINE = 'define'
+
+
+def parse(text):
+    """
+    Parse overrides given as text.
+
+    :param str text: A JSON object or a Python dict literal
+    :return: The overrides
+    :rtype: dict[str, object]
+    :raises ValueError: If the text is not a literal mapping of names to values
+    """
+    try:
+        overrides = json.loads(text)
+    except ValueError:
+        try:
+            overrides = ast.literal_eval(text)
+        except (ValueError, SyntaxError) as error:
+            raise ValueError("Overrides are neither JSON nor a Python literal: {!r}".format(text)) from error
+    if not isinstance(overrides, dict) or not all(isinstance(name, str) for name in overrides):
+        raise ValueError("Overrides must map parameter names to values, not {!r}".format(overrides))
+    return overrides
+
+
+def load(argv=None, environ=None):
+    """
+    Read the overrides given to this process.
+
+    :param list[str] argv: The command line (default: sys.argv)
+    :param dict environ: The environment (default: os.environ)
+    :return: The overrides, empty if none were given
+    :rtype: dict[str, object]
+    """
+    argv = sys.argv if argv is None else argv
+    environ = os.environ if environ is None else environ
+    overrides = {}
+    if environ.get(OVERRIDES_VARIABLE):
+        overrides.update(parse(environ[OVERRIDES_VARIABLE]))
+    args = ' '.join(argv)
+    if DEFINE in args:
+        overrides.update(parse(args.split(DEFINE, 1)[1].strip()))
+    return overrides
+
+
+def apply(namespace, overrides):
+    """
+    Override existing parameters, converting each value to the type of the default it replaces: an int may
+    replace a float, a float with an integral value may replace an int, and otherwise the types must match.
+
+    :param dict namespace: Where the parameters live, e.g. globals() of a bot or vars() of a Bot instance
+    :param dict[str, object] overrides: The new values
+    :return: nothing
+    :raises KeyError: If a parameter does not exist, which is usually a typo
+    :raises TypeError: If a value does not fit the parameter's type
+    """
+    for name, value in overrides.items():
+        if name not in namespace:
+            raise KeyError("Unknown parameter {}".format(name))
+        namespace[name] = _convert(name, value, namespace[name])
+
+
+def _convert(name, value, default):
+    if default is None or isinstance(default, bool) or isinstance(value, bool):
+        if default is None or type(value) is type(default):
+            return value
+    elif isinstance(default, int) and isinstance(value, (int, float)):
+        if value == int(value):
+            return int(value)
+    elif isinstance(default, float) and isinstance(value, (int, float)):
+        return float(value)
+    elif isinstance(value, type(default)):
+        return value
+    raise TypeError("Parameter {} takes a {}, not {!r}".format(name, type(default).__name__, value))
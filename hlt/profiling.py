@@ -0,0 +1,258 @@
+"""
+Per-turn phase timers and call counters, written to one file per game.
+
+Profiling is off unless the HLT_PROFILE environment variable (or Game(profile=...)) names an output file, in which
+"{name}" is replaced by the bot name. While it is off, phase() hands out a shared no-op context manager, mark() and
+count() return at once, and instrument() leaves its target untouched, so instrumented code runs as before.
+
+When on, the starter kit's own hot spots are wrapped at enable time:
+
+    read        Game._get_line (including the wait for the engine)
+    parse       Map._parse (which Map._update calls)
+    link        Map._link
+    send        Game.send_command_queue
+    obstacles_between, intersects_entity, intersect_segment_circle, intersect_segments_circles,
+    blocked_headings (BlockedHeadings.around)                                                  (call counts)
+
+Bots add their own phases with phase(name), mark(name) and instrument(owner, attribute, ...). Phase times are
+inclusive: a phase that runs inside another counts towards both.
+
+The output has one JSON object per line. The first holds the bot name; each further line is one turn, from the
+start of Game.update_map to the start of the next one (turn 0 is the initialisation), with the phase times in
+milliseconds and the call counts:
+
+    {"turn": 12, "total_ms": 41.2, "phases": {"read": 3.1, "parse": 1.9, ...}, "counts": {"obstacles_between": 88}}
+"""
+import atexit
+import collections
+import functools
+import inspect
+import json
+import time
+
+#: Environment variable naming the profile output file
+PROFILE_VARIABLE = 'HLT_PROFILE'
+
+_profiler = None
+
+
+class _NullPhase:
+    """
+    The phase handed out while profiling is off.
+    """
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    """
+    Adds the time spent inside a with-block to a phase.
+    """
+    __slots__ = ('_times', '_name', '_start')
+
+    def __init__(self, times, name):
+        self._times = times
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._times[self._name] += time.perf_counter() - self._start
+        return False
+
+
+class _Profiler:
+    """
+    Collects the phase times and call counts of the current turn and writes them out when the next one starts.
+    """
+
+    def __init__(self, path, name):
+        self._file = open(path, 'w')
+        self._file.write(json.dumps({'bot': name}) + '\n')
+        self._patches = []
+        self.times = collections.defaultdict(float)
+        self.counts = collections.defaultdict(int)
+        self.depths = collections.defaultdict(int)
+        self.turn = 0
+        self._turn_start = None
+        self._mark = None
+        self._mark_start = 0.0
+
+    def mark(self, name):
+        now = time.perf_counter()
+        if self._mark is not None:
+            self.times[self._mark] += now - self._mark_start
+        self._mark = name
+        self._mark_start = now
+
+    def start_turn(self):
+        """
+        Write out the turn that just ended, if any, and start the next one.
+
+        :return: nothing
+        """
+        now = time.perf_counter()
+        if self._turn_start is not None:
+            self.mark(None)
+            self._file.write(json.dumps({
+                'turn': self.turn, 'total_ms': round((now - self._turn_start) * 1000, 3),
+                'phases': {name: round(seconds * 1000, 3) for name, seconds in self.times.items()},
+                'counts': dict(self.counts)}, separators=(',', ':')) + '\n')
+            self.turn += 1
+            self.times.clear()
+            self.counts.clear()
+        self._turn_start = now
+
+    def patch(self, owner, attribute, wrapper):
+        original = inspect.getattr_static(owner, attribute)
+        self._patches.append((owner, attribute, original))
+        setattr(owner, attribute, staticmethod(wrapper) if isinstance(original, staticmethod) else wrapper)
+
+    def close(self):
+        """
+        Write out the last turn, undo all instrumentation and close the file.
+
+        :return: nothing
+        """
+        self.start_turn()
+        for owner, attribute, original in reversed(self._patches):
+            setattr(owner, attribute, original)
+        self._patches = []
+        self._file.close()
+
+
+def enabled():
+    """
+    :return: Whether profiling is on
+    :rtype: bool
+    """
+    return _profiler is not None
+
+
+def phase(name):
+    """
+    Time a with-block as (part of) a phase of the current turn.
+
+    :param str name: The phase
+    :return: A context manager
+    """
+    if _profiler is None:
+        return _NULL_PHASE
+    return _Phase(_profiler.times, name)
+
+
+def mark(name):
+    """
+    End the phase started by the previous mark and start a new one, for code that runs in one long block. The
+    last phase of a turn ends with the turn.
+
+    :param str name: The phase, or None to only end the previous one
+    :return: nothing
+    """
+    if _profiler is not None:
+        _profiler.mark(name)
+
+
+def count(name, n=1):
+    """
+    Add to a counter of the current turn.
+
+    :param str name: The counter
+    :param int n: The amount to add
+    :return: nothing
+    """
+    if _profiler is not None:
+        _profiler.counts[name] += n
+
+
+def instrument(owner, attribute, phase=None, counter=None):
+    """
+    Replace a function (a module function, method or staticmethod) by a wrapper that counts its calls and, if a
+    phase is given, adds its time to that phase. A call made while another instrumented call of the same phase is
+    running (a recursive call, or one instrumented function calling another) is only counted, so that time is added
+    once, at the outermost call. Does nothing while profiling is off; enable() undoes it when profiling is switched
+    off.
+
+    :param owner: The module or class holding the function
+    :param str attribute: The function's name
+    :param str phase: The phase to time the function as, if any
+    :param str counter: The counter of its calls (default: the function's name, without leading underscores)
+    :return: nothing
+    """
+    if _profiler is None:
+        return
+    function = getattr(owner, attribute)
+    counter = counter or attribute.lstrip('_')
+    times, counts, depths = _profiler.times, _profiler.counts, _profiler.depths
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        counts[counter] += 1
+        if phase is None or depths[phase]:
+            return function(*args, **kwargs)
+        depths[phase] += 1
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            times[phase] += time.perf_counter() - start
+            depths[phase] -= 1
+
+    _profiler.patch(owner, attribute, wrapper)
+
+
+def enable(path, name):
+    """
+    Switch profiling on and instrument the starter kit.
+
+    :param str path: The output file
+    :param str name: The bot name, recorded in the file
+    :return: nothing
+    """
+    global _profiler
+    from . import collision, game_map, navigation, networking
+
+    disable()
+    _profiler = _Profiler(path, name)
+    instrument(networking.Game, '_get_line', phase='read', counter='lines_read')
+    instrument(networking.Game, 'send_command_queue', phase='send', counter='commands_sent')
+    instrument(game_map.Map, '_parse', phase='parse', counter='maps_parsed')
+    instrument(game_map.Map, '_link', phase='link', counter='maps_linked')
+    instrument(game_map.Map, 'obstacles_between')
+    instrument(game_map.Map, '_intersects_entity')
+    instrument(collision, 'intersect_segment_circle')
+    instrument(collision, 'intersect_segments_circles')
+    instrument(navigation.BlockedHeadings, 'around', counter='blocked_headings')
+
+    profiler = _profiler
+    original = inspect.getattr_static(networking.Game, 'update_map')
+
+    @functools.wraps(original)
+    def update_map(self):
+        profiler.start_turn()
+        return original(self)
+
+    profiler.patch(networking.Game, 'update_map', update_map)
+    atexit.register(disable)
+
+
+def disable():
+    """
+    Switch profiling off, writing out the last turn and restoring everything instrumented.
+
+    :return: nothing
+    """
+    global _profiler
+    if _profiler is not None:
+        _profiler.close()
+        _profiler = None
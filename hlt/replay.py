@@ -0,0 +1,176 @@
+"""
+Offline replay of a recorded engine stream (see Game's record mode) into a bot, in-process and without the engine.
+
+    python -m hlt.replay MyBot.py game.rec [--turns N] [--profile]
+
+The bot script is run as __main__ with stdin and stdout replaced by the recording, so any bot written against
+hlt.networking.Game works unmodified. The replay ends when the recorded input runs out.
+"""
+import argparse
+import cProfile
+import gzip
+import os
+import pstats
+import random
+import runpy
+import sys
+import time
+
+from . import networking, profiling
+
+
+def read_recording(path):
+    """
+    Read a recording back.
+
+    :param str path: The recording file
+    :return: The lines the engine sent and the lines the bot answered, both without newlines
+    :rtype: (list[bytes], list[bytes])
+    """
+    engine_lines = []
+    bot_lines = []
+    with (gzip.open(path, 'rb') if path.endswith('.gz') else open(path, 'rb')) as recording:
+        for line in recording:
+            line = line.rstrip(b'\n')
+            if line[:1] == b'<':
+                engine_lines.append(line[1:])
+            elif line[:1] == b'>':
+                bot_lines.append(line[1:])
+            else:
+                raise ValueError("Malformed recording line: {!r}".format(line[:40]))
+    return engine_lines, bot_lines
+
+
+class _Input:
+    """
+    Stands in for sys.stdin (and sys.stdin.buffer), serving the recorded engine lines.
+    """
+
+    def __init__(self, lines):
+        self.buffer = self
+        self._lines = iter(lines)
+        self.read_times = []
+
+    def readline(self):
+        line = next(self._lines, None)
+        if line is None:
+            return b''
+        self.read_times.append(time.perf_counter())
+        return line + b'\n'
+
+
+class _Output:
+    """
+    Stands in for sys.stdout (and sys.stdout.buffer), collecting the bot's lines.
+    """
+
+    def __init__(self):
+        self.buffer = self
+        self._pending = b''
+        self.lines = []
+        self.write_times = []
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('ascii')
+        *lines, self._pending = (self._pending + data).split(b'\n')
+        for line in lines:
+            self.lines.append(line)
+            self.write_times.append(time.perf_counter())
+        return len(data)
+
+    def flush(self):
+        pass
+
+
+class ReplayResult:
+    """
+    The outcome of a replay.
+
+    :ivar commands: The lines the bot sent each turn, starting with its name.
+    :ivar latencies: Seconds between reading each map line and answering it, starting with the initialisation.
+    :ivar mismatches: Turns whose commands differ from the recorded ones.
+    """
+
+    def __init__(self, commands, latencies, mismatches):
+        self.commands = commands
+        self.latencies = latencies
+        self.mismatches = mismatches
+
+    def __str__(self):
+        turns = self.latencies[1:]
+        return "Replayed {} turns: mean {:.2f} ms, max {:.2f} ms, {} turns differ from the recording".format(
+            len(turns), 1000 * sum(turns) / max(1, len(turns)), 1000 * max(turns, default=0.0), len(self.mismatches))
+
+
+def run_bot(bot_path, engine_lines, seed=0):
+    """
+    Run a bot script in-process on the given engine lines, until they run out.
+
+    :param str bot_path: The bot script, e.g. MyBot.py
+    :param list[bytes] engine_lines: The engine lines to feed: tag, map size, then one map line per turn
+    :param int seed: Seed for the random module, for bots that use it
+    :return: The lines the bot sent, and the latency of each of its answers in seconds
+    :rtype: (list[bytes], list[float])
+    """
+    stdin, stdout, stderr, argv = sys.stdin, sys.stdout, sys.stderr, sys.argv
+    record = os.environ.pop(networking.RECORD_VARIABLE, None)
+    bot_input = _Input(engine_lines)
+    bot_output = _Output()
+    random.seed(seed)
+    sys.stdin, sys.stdout, sys.argv = bot_input, bot_output, [bot_path]
+    try:
+        runpy.run_path(bot_path, run_name='__main__')
+    except EOFError:
+        pass
+    finally:
+        profiling.disable()
+        sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+        sys.argv = argv
+        if record is not None:
+            os.environ[networking.RECORD_VARIABLE] = record
+    # The map of turn n is read once the answer to turn n - 1 is sent; the tag and size lines come first.
+    answer_reads = bot_input.read_times[2:]
+    latencies = [end - start for start, end in zip(answer_reads, bot_output.write_times)]
+    return bot_output.lines, latencies
+
+
+def replay(bot_path, recording, turns=None, seed=0):
+    """
+    Replay a recording into a bot and compare its answers with the recorded ones.
+
+    :param str bot_path: The bot script, e.g. MyBot.py
+    :param str recording: The recording file
+    :param int turns: Stop after this many turns (default: all recorded turns)
+    :param int seed: Seed for the random module, for bots that use it
+    :return: The replay result
+    :rtype: ReplayResult
+    """
+    engine_lines, bot_lines = read_recording(recording)
+    if turns is not None:
+        engine_lines = engine_lines[:3 + turns]
+    commands, latencies = run_bot(bot_path, engine_lines, seed)
+    mismatches = [turn for turn, (sent, recorded) in enumerate(zip(commands, bot_lines)) if sent != recorded]
+    return ReplayResult(commands, latencies, mismatches)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded Halite engine stream into a bot.")
+    parser.add_argument('bot', help="The bot script, e.g. MyBot.py")
+    parser.add_argument('recording', help="A file recorded with HLT_RECORD or Game(record=...)")
+    parser.add_argument('--turns', type=int, help="Stop after this many turns")
+    parser.add_argument('--profile', action='store_true', help="Print the 25 most expensive functions")
+    args = parser.parse_args()
+
+    profiler = cProfile.Profile() if args.profile else None
+    if profiler is not None:
+        profiler.enable()
+    result = replay(args.bot, args.recording, args.turns)
+    if profiler is not None:
+        profiler.disable()
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats('cumulative').print_stats(25)
+    print(result)
+
+
+if __name__ == '__main__':
+    main()
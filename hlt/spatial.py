@@ -0,0 +1,120 @@
+"""
+A uniform grid over the map, used to cull obstacles before exact collision tests.
+
+Items are small integers (row indices, ids) bucketed by the square cells of the map they overlap. Queries return
+every item that may lie within reach of a segment or a circle, in ascending order, so callers that walk the result
+see the items in the same order as a full scan would. The result is a superset: exact tests are still up to the
+caller.
+"""
+import math
+
+import numpy
+
+#: Side of a grid cell in map units; about a max-speed move plus a ship, so most moves touch only a few cells
+CELL_SIZE = 8.0
+#: Keys are cx * _STRIDE + cy, which keeps them plain ints (fast dict keys) for maps up to 2**19 cells high
+_STRIDE = 1 << 20
+#: Extra reach of every query, so rounding can never drop an item that the exact test would accept
+_SLACK = 1e-6
+
+
+class Grid:
+    """
+    Buckets of items by grid cell.
+
+    :ivar cell_size: Side of a cell
+    :ivar pad: Radius of the items that were bucketed by their centre only; queries reach that much further
+    """
+
+    def __init__(self, cell_size=CELL_SIZE, pad=0.0):
+        """
+        :param float cell_size: Side of a cell
+        :param float pad: Radius of items bucketed by their centre only (see from_points)
+        """
+        self.cell_size = cell_size
+        self.pad = pad
+        self._cells = {}
+
+    @staticmethod
+    def from_points(x, y, radius, cell_size=CELL_SIZE):
+        """
+        Bucket items of equal radius by the cell of their centre. Item i is at (x[i], y[i]).
+
+        :param numpy.ndarray x: The x-coordinates
+        :param numpy.ndarray y: The y-coordinates
+        :param float radius: The radius of every item
+        :param float cell_size: Side of a cell
+        :return: The grid
+        :rtype: Grid
+        """
+        grid = Grid(cell_size, radius)
+        if len(x) == 0:
+            return grid
+        keys = numpy.floor(x / cell_size).astype(numpy.int64) * _STRIDE \
+            + numpy.floor(y / cell_size).astype(numpy.int64)
+        order = numpy.argsort(keys, kind='stable')
+        cells, starts = numpy.unique(keys[order], return_index=True)
+        bounds = starts.tolist() + [len(order)]
+        order = order.tolist()
+        for i, key in enumerate(cells.tolist()):
+            grid._cells[key] = order[bounds[i]:bounds[i + 1]]
+        return grid
+
+    def insert(self, item, x, y, radius):
+        """
+        Add an item to every cell its bounding box overlaps.
+
+        :param int item: The item
+        :param float x: Centre x-coordinate
+        :param float y: Centre y-coordinate
+        :param float radius: Radius
+        :return: nothing
+        """
+        size = self.cell_size
+        for cx in range(math.floor((x - radius) / size), math.floor((x + radius) / size) + 1):
+            for cy in range(math.floor((y - radius) / size), math.floor((y + radius) / size) + 1):
+                self._cells.setdefault(cx * _STRIDE + cy, []).append(item)
+
+    def near_segment(self, x0, y0, x1, y1, reach):
+        """
+        :param float x0: Start x-coordinate
+        :param float y0: Start y-coordinate
+        :param float x1: End x-coordinate
+        :param float y1: End y-coordinate
+        :param float reach: How far from the segment an item may be
+        :return: The items in the cells within reach of the segment, ascending
+        :rtype: list[int]
+        """
+        size = self.cell_size
+        reach += self.pad + _SLACK
+        dx = x1 - x0
+        dy = y1 - y0
+        cells = self._cells
+        found = set()
+        for cy in range(math.floor((min(y0, y1) - reach) / size), math.floor((max(y0, y1) + reach) / size) + 1):
+            # the part of the segment within reach of this row of cells, as a range of the segment parameter
+            if dy == 0.0:
+                low, high = 0.0, 1.0
+            else:
+                low = (cy * size - reach - y0) / dy
+                high = ((cy + 1) * size + reach - y0) / dy
+                low, high = max(0.0, min(low, high)), min(1.0, max(low, high))
+                if low > high:
+                    continue
+            xa = x0 + dx * low
+            xb = x0 + dx * high
+            for cx in range(math.floor((min(xa, xb) - reach) / size), math.floor((max(xa, xb) + reach) / size) + 1):
+                items = cells.get(cx * _STRIDE + cy)
+                if items:
+                    found.update(items)
+        return sorted(found)
+
+    def near_point(self, x, y, reach):
+        """
+        :param float x: The x-coordinate
+        :param float y: The y-coordinate
+        :param float reach: How far from the point an item may be
+        :return: The items in the cells within reach of the point, ascending
+        :rtype: list[int]
+        """
+        return self.near_segment(x, y, x, y, reach)
@@ -0,0 +1,15 @@
+"""
+A local Halite II simulator, so bots can play each other without the official engine.
+
+    python -m sim MyBot.py StandardBot.py [--seed N] [--games N] [--turns N]
+
+engine.Simulator implements the rules on NumPy arrays and speaks the engine's line protocol (the same map lines
+hlt parses); engine.BatchSimulator advances many games in lockstep in the same arrays. match.run_match plays a game
+between bot processes over pipes, and match.run_batch many of them at once. tournament plays round robins and
+gauntlets across a process pool (python -m sim.tournament).
+"""
+
+from . import engine, mapgen, match, players
+
+from .engine import BatchSimulator, Simulator
+from .match import run_batch, run_match
@@ -0,0 +1,31 @@
+import argparse
+import json
+
+from . import match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a Halite II game between bot scripts in the simulator.")
+    parser.add_argument('bots', nargs='+', help="2 or 4 bot scripts, e.g. MyBot.py StandardBot.py")
+    parser.add_argument('--seed', type=int, default=0, help="The map seed (of the first game)")
+    parser.add_argument('--games', type=int, default=1, help="Play this many games in lockstep, on seeds seed, "
+                                                             "seed + 1, ...")
+    parser.add_argument('--turns', type=int, default=match.MAX_TURNS, help="Turn limit")
+    parser.add_argument('--timeout', type=float, default=match.TURN_TIMEOUT, help="Seconds per turn")
+    parser.add_argument('--logs', help="Keep the bots' log files in this directory")
+    parser.add_argument('--json', help="Also write the result to this file")
+    args = parser.parse_args()
+
+    seeds = list(range(args.seed, args.seed + args.games))
+    batch = match.run_batch(args.bots, seeds, args.turns, args.timeout, cwd=args.logs)
+    for result in batch.matches:
+        print(result)
+    if args.games > 1:
+        print(batch)
+    if args.json:
+        with open(args.json, 'w') as output:
+            json.dump([result.to_dict() for result in batch.matches], output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,683 @@
+"""
+The Halite II rules, as far as our bots depend on them, on NumPy arrays.
+
+A BatchSimulator holds any number of games in the same arrays (every row carries the index of its game) and
+advances all of them per step: movement, collisions, combat, docking and production are computed for every ship of
+every game at once. Simulator is the single-game case. Both take the command line each player sent, or, through
+step_arrays, commands already in array form, and render the map line the engine would send next.
+"""
+import re
+
+import numpy
+
+from hlt import constants
+from hlt.entity import Ship
+from . import mapgen
+
+#: Production needed to spawn a ship
+PRODUCTION_PER_SHIP = 72
+#: Turn limit of a game
+MAX_TURNS = 300
+#: Version of the rules; results recorded under other rules are not comparable. 2: crashes damage planets
+RULES_VERSION = 2
+
+_UNDOCKED = Ship.DockingStatus.UNDOCKED.value
+_DOCKING = Ship.DockingStatus.DOCKING.value
+_DOCKED = Ship.DockingStatus.DOCKED.value
+_UNDOCKING = Ship.DockingStatus.UNDOCKING.value
+
+_COMMAND = re.compile(rb't\s*(\d+)\s+(-?\d+)\s+(-?\d+)|d\s*(\d+)\s+(\d+)|u\s*(\d+)')
+#: Entity ids are made unique across games as game * _KEY + id
+_KEY = 1 << 24
+#: Games are laid out side by side along the x-axis, this far apart, so pair searches never cross games
+_GAME_GAP = 100.0
+
+
+class _Table:
+    """
+    A set of equally long NumPy columns that rows can be appended to and selected from.
+    """
+    _COLUMNS = ()
+
+    def __init__(self):
+        for name, dtype in self._COLUMNS:
+            setattr(self, name, numpy.empty(0, dtype=dtype))
+
+    def __len__(self):
+        return len(self.id)
+
+    def keep(self, rows):
+        """
+        Keep only the given rows, in the given order.
+
+        :param numpy.ndarray rows: A boolean mask or an index array
+        :return: nothing
+        """
+        for name, _ in self._COLUMNS:
+            setattr(self, name, getattr(self, name)[rows])
+
+    def append(self, **values):
+        """
+        Append rows, given as one array (or scalar) per column.
+
+        :return: nothing
+        """
+        count = max(numpy.size(value) for value in values.values())
+        for name, dtype in self._COLUMNS:
+            new = numpy.broadcast_to(numpy.asarray(values[name], dtype=dtype), (count,))
+            setattr(self, name, numpy.concatenate((getattr(self, name), new)))
+
+    def keys(self):
+        """
+        :return: The game-qualified id of every row
+        :rtype: numpy.ndarray
+        """
+        return self.game * _KEY + self.id
+
+
+class _Ships(_Table):
+    _COLUMNS = (('game', numpy.int64), ('id', numpy.int64), ('owner', numpy.int64), ('x', numpy.float64),
+                ('y', numpy.float64), ('health', numpy.int64), ('vel_x', numpy.float64), ('vel_y', numpy.float64),
+                ('status', numpy.int64), ('planet', numpy.int64), ('progress', numpy.int64),
+                ('cooldown', numpy.int64))
+
+
+class _Planets(_Table):
+    _COLUMNS = (('game', numpy.int64), ('id', numpy.int64), ('x', numpy.float64), ('y', numpy.float64),
+                ('health', numpy.int64), ('radius', numpy.float64), ('docking_spots', numpy.int64),
+                ('production', numpy.int64), ('remaining', numpy.int64), ('owner', numpy.int64))
+
+
+class BatchSimulator:
+    """
+    Several Halite II games with the same number of players, played in lockstep.
+
+    Ships are kept sorted by game, owner and id, and planets by game and id. Finished games are ranked and their
+    entities removed, so the remaining games get cheaper.
+
+    :ivar num_games: Number of games
+    :ivar num_players: Number of players in each game
+    :ivar seeds: The map seed of each game
+    :ivar widths: The map width of each game
+    :ivar heights: The map height of each game
+    :ivar turn: Number of steps taken so far
+    :ivar turns: Number of turns each game has been played for
+    :ivar finished: Whether each game is over
+    :ivar max_turns: Turn limit
+    """
+
+    def __init__(self, num_players=2, seeds=(0,), width=None, height=None, max_turns=MAX_TURNS):
+        """
+        :param int num_players: 2 or 4
+        :param list[int] seeds: Seed of the map generator, one per game
+        :param int width: Map width (default: random, see mapgen.generate)
+        :param int height: Map height (default: two thirds of the width)
+        :param int max_turns: Turn limit
+        """
+        self.num_games = len(seeds)
+        self.num_players = num_players
+        self.seeds = list(seeds)
+        self.widths = numpy.empty(self.num_games, dtype=numpy.int64)
+        self.heights = numpy.empty(self.num_games, dtype=numpy.int64)
+        self.turn = 0
+        self.turns = numpy.zeros(self.num_games, dtype=numpy.int64)
+        self.finished = numpy.zeros(self.num_games, dtype=bool)
+        self.max_turns = max_turns
+        self._next_ship_id = numpy.empty(self.num_games, dtype=numpy.int64)
+        self._eliminated_at = numpy.full((self.num_games, num_players), -1, dtype=numpy.int64)
+        self._rankings = {}
+
+        self._ships = _Ships()
+        self._planets = _Planets()
+        for game, seed in enumerate(self.seeds):
+            self.widths[game], self.heights[game], ships, planets = mapgen.generate(num_players, seed, width, height)
+            self._next_ship_id[game] = len(ships)
+            self._ships.append(game=game, id=numpy.arange(len(ships)), owner=ships[:, 0], x=ships[:, 1],
+                               y=ships[:, 2], health=constants.BASE_SHIP_HEALTH, vel_x=0.0, vel_y=0.0,
+                               status=_UNDOCKED, planet=-1, progress=0, cooldown=0)
+            radius = planets[:, 2]
+            self._planets.append(game=game, id=numpy.arange(len(planets)), x=planets[:, 0], y=planets[:, 1],
+                                 health=(radius * mapgen.PLANET_HEALTH_PER_RADIUS).astype(numpy.int64),
+                                 radius=radius, docking_spots=numpy.maximum(2, (radius / 3).astype(numpy.int64) + 1),
+                                 production=0, owner=-1,
+                                 remaining=(radius * mapgen.PLANET_RESOURCES_PER_RADIUS).astype(numpy.int64))
+        self._stride = float(self.widths.max()) + _GAME_GAP
+
+    # Observation
+
+    def map_line(self, game=0):
+        """
+        :param int game: The game
+        :return: The map description the engine sends at the start of a turn, without the newline
+        :rtype: bytes
+        """
+        ships, planets = self._ships, self._planets
+        start, stop = numpy.searchsorted(ships.game, (game, game + 1))
+        player_starts = start + numpy.searchsorted(ships.owner[start:stop], numpy.arange(self.num_players + 1))
+        parts = [str(self.num_players)]
+        for player in range(self.num_players):
+            rows = slice(player_starts[player], player_starts[player + 1])
+            count = rows.stop - rows.start
+            parts.append("{} {}".format(player, count))
+            if count:
+                values = numpy.column_stack((
+                    ships.id[rows], ships.x[rows], ships.y[rows], ships.health[rows], ships.vel_x[rows],
+                    ships.vel_y[rows], ships.status[rows], numpy.maximum(ships.planet[rows], 0),
+                    ships.progress[rows], ships.cooldown[rows])).ravel().tolist()
+                parts.append(("%d %.4f %.4f %d %.4f %.4f %d %d %d %d " * count % tuple(values)).rstrip())
+        docked = ships.status[start:stop] != _UNDOCKED
+        docked_planets = ships.planet[start:stop][docked]
+        docked_ships = ships.id[start:stop][docked]
+        planet_start, planet_stop = numpy.searchsorted(planets.game, (game, game + 1))
+        parts.append(str(planet_stop - planet_start))
+        for row in range(planet_start, planet_stop):
+            docked_ids = docked_ships[docked_planets == planets.id[row]].tolist()
+            owned = planets.owner[row] >= 0
+            parts.append("%d %.4f %.4f %d %.4f %d %d %d %d %d %d" % (
+                planets.id[row], planets.x[row], planets.y[row], planets.health[row], planets.radius[row],
+                planets.docking_spots[row], planets.production[row], planets.remaining[row],
+                owned, planets.owner[row] if owned else 0, len(docked_ids)))
+            if docked_ids:
+                parts.append(' '.join(map(str, docked_ids)))
+        return ' '.join(parts).encode('ascii')
+
+    def map_lines(self):
+        """
+        :return: The map line of every game still running, by game
+        :rtype: dict[int, bytes]
+        """
+        return {game: self.map_line(game) for game in numpy.flatnonzero(~self.finished).tolist()}
+
+    def alive_players(self, game=0):
+        """
+        :param int game: The game
+        :return: The ids of the players that still have ships
+        :rtype: list[int]
+        """
+        return numpy.flatnonzero(self._ship_counts()[game]).tolist()
+
+    def is_over(self):
+        """
+        :return: Whether every game has reached the turn limit or has at most one player with ships left
+        :rtype: bool
+        """
+        return bool(self.finished.all())
+
+    def rankings(self, game=0):
+        """
+        Rank the players: survivors first, by ship count and then total ship health; eliminated players by how
+        long they lasted.
+
+        :param int game: The game
+        :return: Player ids, best first
+        :rtype: list[int]
+        """
+        if game in self._rankings:
+            return self._rankings[game]
+        ships = self._ships
+        mine = ships.game == game
+        counts = numpy.bincount(ships.owner[mine], minlength=self.num_players).tolist()
+        health = numpy.bincount(ships.owner[mine], ships.health[mine], minlength=self.num_players).tolist()
+        eliminated_at = self._eliminated_at[game].tolist()
+
+        def key(player):
+            lasted = eliminated_at[player] if eliminated_at[player] >= 0 else self.turn + 1
+            return lasted, counts[player], int(health[player])
+        return sorted(range(self.num_players), key=key, reverse=True)
+
+    def eliminate(self, player, game=0):
+        """
+        Remove all ships of a player, e.g. after a timeout or a crash.
+
+        :param int player: The player id
+        :param int game: The game
+        :return: nothing
+        """
+        self._ships.keep((self._ships.game != game) | (self._ships.owner != player))
+        self._release_planets()
+        self._record_eliminations()
+        self._finish_games()
+
+    # Turn processing
+
+    def step(self, commands):
+        """
+        Play one turn of every running game.
+
+        :param dict[int, dict[int, bytes]] commands: The command line each player sent this turn, by game and player
+        :return: nothing
+        """
+        thrusts, docks, undocks = [], [], []
+        for game, lines in commands.items():
+            for player, line in lines.items():
+                for thrust_id, magnitude, angle, dock_id, planet_id, undock_id in _COMMAND.findall(line):
+                    if thrust_id:
+                        thrusts.append((game, player, int(thrust_id), int(magnitude), int(angle)))
+                    elif dock_id:
+                        docks.append((game, player, int(dock_id), int(planet_id)))
+                    else:
+                        undocks.append((game, player, int(undock_id)))
+        thrusts = numpy.array(thrusts, dtype=numpy.int64).reshape(-1, 5)
+        docks = numpy.array(docks, dtype=numpy.int64).reshape(-1, 4)
+        undocks = numpy.array(undocks, dtype=numpy.int64).reshape(-1, 3)
+        thrust_rows = self._ship_rows(thrusts[:, 0], thrusts[:, 1], thrusts[:, 2])
+        dock_rows = self._ship_rows(docks[:, 0], docks[:, 1], docks[:, 2])
+        undock_rows = self._ship_rows(undocks[:, 0], undocks[:, 1], undocks[:, 2])
+        thrust_valid = thrust_rows >= 0
+        dock_valid = dock_rows >= 0
+        self.step_arrays(thrust_rows[thrust_valid], thrusts[thrust_valid, 3], thrusts[thrust_valid, 4],
+                         dock_rows[dock_valid], docks[dock_valid, 3], undock_rows[undock_rows >= 0])
+
+    def step_arrays(self, thrust_rows=(), magnitudes=(), angles=(), dock_rows=(), dock_planets=(), undock_rows=()):
+        """
+        Play one turn of every running game, given the commands as arrays of ship rows (see ship_view).
+
+        :param numpy.ndarray thrust_rows: Rows of the ships to thrust
+        :param numpy.ndarray magnitudes: Their thrust magnitudes
+        :param numpy.ndarray angles: Their thrust angles in whole degrees
+        :param numpy.ndarray dock_rows: Rows of the ships to dock
+        :param numpy.ndarray dock_planets: The ids of the planets to dock them to
+        :param numpy.ndarray undock_rows: Rows of the ships to undock
+        :return: nothing
+        """
+        ships = self._ships
+        statuses = ships.status.copy()
+        ships.vel_x[:] = 0.0
+        ships.vel_y[:] = 0.0
+
+        thrust_rows = numpy.asarray(thrust_rows, dtype=numpy.int64)
+        thrusting = statuses[thrust_rows] == _UNDOCKED
+        magnitudes = numpy.clip(numpy.asarray(magnitudes, dtype=numpy.int64)[thrusting], 0, constants.MAX_SPEED)
+        radians = numpy.radians(numpy.asarray(angles, dtype=numpy.int64)[thrusting])
+        ships.vel_x[thrust_rows[thrusting]] = magnitudes * numpy.cos(radians)
+        ships.vel_y[thrust_rows[thrusting]] = magnitudes * numpy.sin(radians)
+
+        undock_rows = numpy.asarray(undock_rows, dtype=numpy.int64)
+        undock_rows = undock_rows[statuses[undock_rows] == _DOCKED]
+        ships.status[undock_rows] = _UNDOCKING
+        ships.progress[undock_rows] = constants.DOCK_TURNS
+
+        dock_rows = numpy.asarray(dock_rows, dtype=numpy.int64)
+        docking = statuses[dock_rows] == _UNDOCKED
+        self._dock(dock_rows[docking], numpy.asarray(dock_planets, dtype=numpy.int64)[docking])
+        self._advance_docking(statuses == _DOCKING, statuses == _UNDOCKING)
+        self._move()
+        self._attack()
+        self._remove_dead()
+        self._explode_planets()
+        self._release_planets()
+        self._produce()
+        self._sort_ships()
+        self.turn += 1
+        self.turns[~self.finished] += 1
+        self._record_eliminations()
+        self._finish_games()
+
+    def ship_view(self):
+        """
+        The ships of all running games, for policies that compute their commands with NumPy. Row numbers are valid
+        for the next call of step_arrays.
+
+        :return: Read-only game, id, owner, x, y, health and docking status columns
+        :rtype: dict[str, numpy.ndarray]
+        """
+        return {name: _read_only(getattr(self._ships, name))
+                for name in ('game', 'id', 'owner', 'x', 'y', 'health', 'status')}
+
+    def planet_view(self):
+        """
+        The planets of all running games, like ship_view.
+
+        :return: Read-only game, id, x, y, radius, docking_spots, owner (-1 if unowned) and num_docked columns
+        :rtype: dict[str, numpy.ndarray]
+        """
+        view = {name: _read_only(getattr(self._planets, name))
+                for name in ('game', 'id', 'x', 'y', 'radius', 'docking_spots', 'owner')}
+        view['num_docked'] = _read_only(numpy.bincount(self._docked_planet_rows(), minlength=len(self._planets)))
+        return view
+
+    def _ship_rows(self, games, players, ship_ids):
+        """
+        :return: The rows of the given ships, or -1 for ships that do not exist or are not the player's
+        :rtype: numpy.ndarray
+        """
+        return _lookup(self._ships.keys(), games * _KEY + ship_ids, self._ships.owner, players)
+
+    def _planet_rows(self, games, planet_ids):
+        """
+        :return: The rows of the given planets, or -1 for planets that do not exist (anymore)
+        :rtype: numpy.ndarray
+        """
+        return _lookup(self._planets.keys(), games * _KEY + planet_ids)
+
+    def _docked_planet_rows(self):
+        """
+        :return: The planet row of every ship that is not undocked
+        :rtype: numpy.ndarray
+        """
+        ships = self._ships
+        docked = ships.status != _UNDOCKED
+        rows = self._planet_rows(ships.game[docked], ships.planet[docked])
+        return rows[rows >= 0]
+
+    def _dock(self, rows, planet_ids):
+        """
+        Start docking ships that are close enough to a planet with free spots that is unowned or their own.
+        If several players try to dock to the same unowned planet in the same turn, none of them docks.
+
+        :return: nothing
+        """
+        ships, planets = self._ships, self._planets
+        planet_rows = self._planet_rows(ships.game[rows], planet_ids)
+        close = planet_rows >= 0
+        rows, planet_rows = rows[close], planet_rows[close]
+        distance = numpy.hypot(ships.x[rows] - planets.x[planet_rows], ships.y[rows] - planets.y[planet_rows])
+        owner = planets.owner[planet_rows]
+        close = ((distance <= planets.radius[planet_rows] + constants.DOCK_RADIUS + constants.SHIP_RADIUS)
+                 & ((owner == -1) | (owner == ships.owner[rows])))
+        rows, planet_rows = rows[close], planet_rows[close]
+        if not len(rows):
+            return
+        lowest = numpy.full(len(planets), self.num_players, dtype=numpy.int64)
+        highest = numpy.full(len(planets), -1, dtype=numpy.int64)
+        numpy.minimum.at(lowest, planet_rows, ships.owner[rows])
+        numpy.maximum.at(highest, planet_rows, ships.owner[rows])
+        uncontested = lowest[planet_rows] == highest[planet_rows]
+        rows, planet_rows = rows[uncontested], planet_rows[uncontested]
+
+        order = numpy.argsort(planet_rows, kind='stable')
+        rows, planet_rows = rows[order], planet_rows[order]
+        rank = numpy.arange(len(rows)) - numpy.searchsorted(planet_rows, planet_rows)
+        docked = numpy.bincount(self._docked_planet_rows(), minlength=len(planets))
+        free = planets.docking_spots[planet_rows] - docked[planet_rows]
+        rows, planet_rows = rows[rank < free], planet_rows[rank < free]
+        ships.status[rows] = _DOCKING
+        ships.progress[rows] = constants.DOCK_TURNS
+        ships.planet[rows] = planets.id[planet_rows]
+        planets.owner[planet_rows] = ships.owner[rows]
+
+    def _advance_docking(self, was_docking, was_undocking):
+        ships = self._ships
+        ships.progress[was_docking | was_undocking] -= 1
+        done = ships.progress <= 0
+        ships.status[was_docking & done] = _DOCKED
+        undocked = was_undocking & done
+        ships.status[undocked] = _UNDOCKED
+        ships.planet[undocked] = -1
+        ships.progress[was_docking & done | undocked] = 0
+
+    def _move(self):
+        """
+        Move every ship along its velocity. Ships whose paths come within two ship radii of each other during the
+        turn deal each other damage equal to their health; ships crossing a planet are destroyed and damage it;
+        ships ending outside the map are destroyed.
+
+        :return: nothing
+        """
+        ships, planets = self._ships, self._planets
+        first, second = _close_pairs(ships.x + ships.game * self._stride, ships.y,
+                                     2 * constants.MAX_SPEED + 2 * constants.SHIP_RADIUS)
+        if len(first):
+            px = ships.x[first] - ships.x[second]
+            py = ships.y[first] - ships.y[second]
+            vx = ships.vel_x[first] - ships.vel_x[second]
+            vy = ships.vel_y[first] - ships.vel_y[second]
+            hit = _segment_hits_circle(px, py, vx, vy, 2 * constants.SHIP_RADIUS)
+            first, second = first[hit], second[hit]
+            damage = numpy.zeros(len(ships), dtype=numpy.int64)
+            numpy.add.at(damage, first, ships.health[second])
+            numpy.add.at(damage, second, ships.health[first])
+            ships.health -= damage
+
+        moving = numpy.flatnonzero((ships.vel_x != 0.0) | (ships.vel_y != 0.0))
+        if len(moving) and len(planets):
+            candidates = self.planet_grid()[ships.game[moving]]
+            exists = candidates >= 0
+            candidates = numpy.where(exists, candidates, 0)
+            px = ships.x[moving, None] - planets.x[candidates]
+            py = ships.y[moving, None] - planets.y[candidates]
+            hit = exists & _segment_hits_circle(px, py, ships.vel_x[moving, None], ships.vel_y[moving, None],
+                                                planets.radius[candidates] + constants.SHIP_RADIUS)
+            ship_rows, columns = numpy.nonzero(hit)
+            numpy.subtract.at(planets.health, candidates[ship_rows, columns],
+                              numpy.maximum(ships.health[moving[ship_rows]], 0))
+            ships.health[moving[ship_rows]] = 0
+
+        ships.x += ships.vel_x
+        ships.y += ships.vel_y
+        outside = ((ships.x < 0) | (ships.x > self.widths[ships.game])
+                   | (ships.y < 0) | (ships.y > self.heights[ships.game]))
+        ships.health[outside] = 0
+
+    def planet_grid(self):
+        """
+        :return: The planet rows of each game (rows of planet_view), padded with -1 to the largest planet count
+        :rtype: numpy.ndarray
+        """
+        planets = self._planets
+        counts = numpy.bincount(planets.game, minlength=self.num_games)
+        starts = numpy.cumsum(counts) - counts
+        grid = numpy.full((self.num_games, max(1, counts.max(initial=0))), -1, dtype=numpy.int64)
+        grid[planets.game, numpy.arange(len(planets)) - starts[planets.game]] = numpy.arange(len(planets))
+        return grid
+
+    def _attack(self):
+        """
+        Every undocked ship whose weapon is ready splits WEAPON_DAMAGE among all enemy ships in weapon range.
+
+        :return: nothing
+        """
+        ships = self._ships
+        ships.cooldown = numpy.maximum(ships.cooldown - 1, 0)
+        reach = constants.WEAPON_RADIUS + 2 * constants.SHIP_RADIUS
+        first, second = _close_pairs(ships.x + ships.game * self._stride, ships.y, reach)
+        if not len(first):
+            return
+        alive = ships.health > 0
+        enemies = (ships.owner[first] != ships.owner[second]) & alive[first] & alive[second]
+        first, second = first[enemies], second[enemies]
+        in_range = (ships.x[first] - ships.x[second]) ** 2 + (ships.y[first] - ships.y[second]) ** 2 <= reach ** 2
+        first, second = first[in_range], second[in_range]
+        attackers = numpy.concatenate((first, second))
+        targets = numpy.concatenate((second, first))
+        ready = (ships.status[attackers] == _UNDOCKED) & (ships.cooldown[attackers] == 0)
+        attackers, targets = attackers[ready], targets[ready]
+        if not len(attackers):
+            return
+        num_targets = numpy.bincount(attackers, minlength=len(ships))
+        damage = numpy.zeros(len(ships), dtype=numpy.float64)
+        numpy.add.at(damage, targets, constants.WEAPON_DAMAGE / num_targets[attackers])
+        ships.health -= damage.astype(numpy.int64)
+        ships.cooldown[num_targets > 0] = constants.WEAPON_COOLDOWN
+
+    def _remove_dead(self):
+        self._ships.keep(self._ships.health > 0)
+
+    def _explode_planets(self):
+        """
+        Destroy planets without health. Their docked ships die, and every ship of the game within EXPLOSION_RADIUS
+        of the planet's surface takes damage falling off linearly from MAX_SHIP_HEALTH at the surface.
+
+        :return: nothing
+        """
+        ships, planets = self._ships, self._planets
+        exploding = numpy.flatnonzero(planets.health <= 0)
+        if not len(exploding):
+            return
+        for row in exploding.tolist():
+            nearby = numpy.flatnonzero(ships.game == planets.game[row])
+            distance = numpy.hypot(ships.x[nearby] - planets.x[row], ships.y[nearby] - planets.y[row])
+            falloff = numpy.clip(1.0 - (distance - planets.radius[row]) / constants.EXPLOSION_RADIUS, 0.0, 1.0)
+            ships.health[nearby] -= (constants.MAX_SHIP_HEALTH * falloff).astype(numpy.int64)
+            docked = (ships.planet[nearby] == planets.id[row]) & (ships.status[nearby] != _UNDOCKED)
+            ships.health[nearby[docked]] = 0
+        planets.keep(planets.health > 0)
+        self._remove_dead()
+
+    def _release_planets(self):
+        """
+        Planets without docked ships lose their owner.
+
+        :return: nothing
+        """
+        occupied = numpy.zeros(len(self._planets), dtype=bool)
+        occupied[self._docked_planet_rows()] = True
+        self._planets.owner[~occupied] = -1
+
+    def _produce(self):
+        """
+        Every fully docked ship adds BASE_PRODUCTIVITY to its planet, limited by the planet's remaining resources.
+        Each PRODUCTION_PER_SHIP spawns a ship for the owner at SPAWN_RADIUS from the planet, towards the centre.
+
+        :return: nothing
+        """
+        ships, planets = self._ships, self._planets
+        docked = ships.status == _DOCKED
+        if not docked.any():
+            return
+        workers = numpy.bincount(self._planet_rows(ships.game[docked], ships.planet[docked]),
+                                 minlength=len(planets))
+        produced = numpy.minimum(workers * constants.BASE_PRODUCTIVITY, planets.remaining)
+        planets.remaining -= produced
+        planets.production += produced
+        spawning = numpy.flatnonzero(planets.production >= PRODUCTION_PER_SHIP)
+        if not len(spawning):
+            return
+        counts = planets.production[spawning] // PRODUCTION_PER_SHIP
+        planets.production[spawning] -= counts * PRODUCTION_PER_SHIP
+        rows = numpy.repeat(spawning, counts)
+        games = planets.game[rows]
+        within = numpy.arange(len(rows)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        offsets = within - (numpy.repeat(counts, counts) - 1) / 2
+        angle = numpy.arctan2(self.heights[games] / 2 - planets.y[rows], self.widths[games] / 2 - planets.x[rows])
+        distance = planets.radius[rows] + constants.SPAWN_RADIUS
+        spread = angle + offsets * (2 * constants.SHIP_RADIUS + 0.1) / distance
+        ids = self._next_ship_id[games] + numpy.arange(len(rows)) - numpy.searchsorted(games, games)
+        self._next_ship_id += numpy.bincount(games, minlength=self.num_games)
+        ships.append(game=games, id=ids, owner=planets.owner[rows],
+                     x=planets.x[rows] + distance * numpy.cos(spread), y=planets.y[rows] + distance * numpy.sin(spread),
+                     health=constants.BASE_SHIP_HEALTH, vel_x=0.0, vel_y=0.0, status=_UNDOCKED,
+                     planet=-1, progress=0, cooldown=0)
+
+    def _sort_ships(self):
+        ships = self._ships
+        ships.keep(numpy.lexsort((ships.id, ships.owner, ships.game)))
+
+    def _ship_counts(self):
+        """
+        :return: The number of ships of each player, by game
+        :rtype: numpy.ndarray
+        """
+        ships = self._ships
+        return numpy.bincount(ships.game * self.num_players + ships.owner,
+                              minlength=self.num_games * self.num_players).reshape(self.num_games, self.num_players)
+
+    def _record_eliminations(self):
+        eliminated = (self._ship_counts() == 0) & (self._eliminated_at < 0) & ~self.finished[:, None]
+        self._eliminated_at[eliminated] = self.turn
+
+    def _finish_games(self):
+        """
+        Rank the games that reached the turn limit or have at most one player left, and drop their entities.
+
+        :return: nothing
+        """
+        alive = (self._ship_counts() > 0).sum(axis=1)
+        over = ~self.finished & ((self.turn >= self.max_turns) | (alive <= 1))
+        if not over.any():
+            return
+        for game in numpy.flatnonzero(over).tolist():
+            self._rankings[game] = self.rankings(game)
+        self.finished |= over
+        self._ships.keep(~self.finished[self._ships.game])
+        self._planets.keep(~self.finished[self._planets.game])
+
+
+class Simulator(BatchSimulator):
+    """
+    A single Halite II game.
+
+    :ivar width: Map width
+    :ivar height: Map height
+    """
+
+    def __init__(self, num_players=2, seed=0, width=None, height=None, max_turns=MAX_TURNS):
+        """
+        :param int num_players: 2 or 4
+        :param int seed: Seed of the map generator
+        :param int width: Map width (default: random, see mapgen.generate)
+        :param int height: Map height (default: two thirds of the width)
+        :param int max_turns: Turn limit
+        """
+        super().__init__(num_players, (seed,), width, height, max_turns)
+        self.width = int(self.widths[0])
+        self.height = int(self.heights[0])
+
+    def step(self, commands):
+        """
+        Play one turn.
+
+        :param dict[int, bytes] commands: The command line each player sent this turn
+        :return: nothing
+        """
+        super().step({0: commands})
+
+
+def _lookup(keys, wanted, owners=None, players=None):
+    """
+    Find rows by key, optionally requiring an owner.
+
+    :return: The row of each wanted key, or -1 if it is missing or owned by someone else
+    :rtype: numpy.ndarray
+    """
+    order = numpy.argsort(keys, kind='stable')
+    positions = numpy.minimum(numpy.searchsorted(keys[order], wanted), max(0, len(keys) - 1))
+    rows = order[positions] if len(keys) else numpy.zeros(len(wanted), dtype=numpy.int64)
+    found = (keys[rows] == wanted) if len(keys) else numpy.zeros(len(wanted), dtype=bool)
+    if owners is not None and len(keys):
+        found &= owners[rows] == players
+    return numpy.where(found, rows, -1)
+
+
+def _read_only(array):
+    view = array.view()
+    view.setflags(write=False)
+    return view
+
+
+def _close_pairs(x, y, reach):
+    """
+    Find all pairs of points whose x-coordinates differ by at most reach, by sweeping over the points sorted by x.
+
+    :return: Index arrays (first, second) with first < second
+    :rtype: (numpy.ndarray, numpy.ndarray)
+    """
+    order = numpy.argsort(x, kind='stable')
+    sorted_x = x[order]
+    stop = numpy.searchsorted(sorted_x, sorted_x + reach, side='right')
+    counts = stop - numpy.arange(len(x)) - 1
+    total = int(counts.sum())
+    if total == 0:
+        empty = numpy.empty(0, dtype=numpy.int64)
+        return empty, empty
+    first = numpy.repeat(numpy.arange(len(x)), counts)
+    starts = numpy.cumsum(counts) - counts
+    second = first + 1 + numpy.arange(total) - numpy.repeat(starts, counts)
+    close = numpy.abs(y[order[first]] - y[order[second]]) <= reach
+    first, second = order[first[close]], order[second[close]]
+    return numpy.minimum(first, second), numpy.maximum(first, second)
+
+
+def _segment_hits_circle(px, py, vx, vy, radius):
+    """
+    Whether a point starting at (px, py) relative to a circle's centre and moving by (vx, vy) comes within radius
+    of it. Broadcasts over all arguments.
+
+    :rtype: numpy.ndarray
+    """
+    a = vx * vx + vy * vy
+    b = px * vx + py * vy
+    t = numpy.clip(-b / numpy.where(a > 0, a, 1.0), 0.0, 1.0)
+    closest_x = px + vx * t
+    closest_y = py + vy * t
+    return closest_x * closest_x + closest_y * closest_y <= radius * radius
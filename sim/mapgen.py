@@ -0,0 +1,93 @@
+"""
+Symmetric Halite II map generation.
+"""
+import math
+
+import numpy
+
+from hlt import constants
+
+#: Number of ships each player starts with
+INITIAL_SHIPS = 3
+#: Health of a planet per unit of radius
+PLANET_HEALTH_PER_RADIUS = 255
+#: Production a planet holds per unit of radius
+PLANET_RESOURCES_PER_RADIUS = 144
+#: Smallest and largest planet radius
+MIN_PLANET_RADIUS = 3.0
+MAX_PLANET_RADIUS = 10.0
+#: Free space kept between planets, and between planets and spawn points
+PLANET_MARGIN = 6.0
+
+
+def generate(num_players, seed, width=None, height=None, planets_per_player=6):
+    """
+    Generate a map that is point-symmetric for 2 players and mirror-symmetric in both axes for 4 players.
+
+    :param int num_players: 2 or 4
+    :param int seed: Seed of the generator
+    :param int width: Map width (default: drawn between 240 and 384)
+    :param int height: Map height (default: two thirds of the width)
+    :param int planets_per_player: Number of planets generated per player, besides the 4 central ones
+    :return: The map size, the initial ships as (owner, x, y) rows and the planets as (x, y, radius) rows
+    :rtype: (int, int, numpy.ndarray, numpy.ndarray)
+    """
+    if num_players not in (2, 4):
+        raise ValueError("Maps are generated for 2 or 4 players, not {}".format(num_players))
+    rng = numpy.random.default_rng(seed)
+    if width is None:
+        width = int(rng.integers(240, 385)) // 8 * 8
+    if height is None:
+        height = width * 2 // 3
+
+    starts = _start_positions(num_players, width, height, rng)
+    ships = []
+    for owner, (x, y) in enumerate(starts):
+        for i in range(INITIAL_SHIPS):
+            ships.append((owner, x, y + 2.0 * (i - (INITIAL_SHIPS - 1) / 2)))
+
+    planets = []
+    centre_radius = float(rng.uniform(MIN_PLANET_RADIUS, MIN_PLANET_RADIUS + 2))
+    offset = centre_radius + PLANET_MARGIN
+    for dx, dy in ((offset, offset), (-offset, offset), (offset, -offset), (-offset, -offset)):
+        planets.append((width / 2 + dx, height / 2 + dy, centre_radius))
+
+    for _ in range(planets_per_player):
+        for _ in range(100):
+            radius = float(rng.uniform(MIN_PLANET_RADIUS, MAX_PLANET_RADIUS))
+            x = float(rng.uniform(radius + 1, width / 2 - 1 if num_players == 4 else width - radius - 1))
+            y = float(rng.uniform(radius + 1, height / 2 - 1))
+            group = [(mx, my, radius) for mx, my in _images(x, y, num_players, width, height)]
+            if _is_free(group, planets, starts):
+                planets.extend(group)
+                break
+
+    return width, height, numpy.array(ships, dtype=numpy.float64), numpy.array(planets, dtype=numpy.float64)
+
+
+def _start_positions(num_players, width, height, rng):
+    if num_players == 2:
+        if rng.random() < 0.5:
+            return [(width / 4, height / 2), (3 * width / 4, height / 2)]
+        return [(width / 2 - width / 12, height / 4), (width / 2 + width / 12, 3 * height / 4)]
+    return [(width / 5, height / 5), (4 * width / 5, height / 5),
+            (width / 5, 4 * height / 5), (4 * width / 5, 4 * height / 5)]
+
+
+def _images(x, y, num_players, width, height):
+    if num_players == 2:
+        return [(x, y), (width - x, height - y)]
+    return [(x, y), (width - x, y), (x, height - y), (width - x, height - y)]
+
+
+def _is_free(group, planets, starts):
+    placed = list(planets)
+    for x, y, radius in group:
+        for other_x, other_y, other_radius in placed:
+            if math.hypot(x - other_x, y - other_y) < radius + other_radius + PLANET_MARGIN:
+                return False
+        for start_x, start_y in starts:
+            if math.hypot(x - start_x, y - start_y) < radius + PLANET_MARGIN + constants.MAX_SPEED:
+                return False
+        placed.append((x, y, radius))
+    return True
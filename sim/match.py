@@ -0,0 +1,205 @@
+"""
+Playing games between bot processes.
+"""
+import os
+import shutil
+import tempfile
+import time
+
+from .engine import MAX_TURNS, BatchSimulator
+from .players import ProcessPlayer, receive_all
+
+#: Seconds a bot may take to initialise, as on the Halite servers
+INIT_TIMEOUT = 60.0
+#: Seconds a bot may take per turn, as on the Halite servers
+TURN_TIMEOUT = 2.0
+
+
+class MatchResult:
+    """
+    The outcome of a game.
+
+    :ivar seed: The map seed
+    :ivar names: The bot names, by player id
+    :ivar paths: The bot scripts, by player id
+    :ivar rankings: Player ids, best first
+    :ivar turns: Number of turns played
+    :ivar latencies: Seconds each player took to answer, per turn (initialisation excluded), by player id
+    :ivar timeouts: The turn each player that timed out or crashed did so, by player id
+    :ivar engine_seconds: Time spent in the simulator itself, excluding waiting for the bots. In a batch, the game's
+        share of the batch's engine time, in proportion to its turns
+    """
+
+    def __init__(self, seed, names, paths, rankings, turns, latencies, timeouts, engine_seconds):
+        self.seed = seed
+        self.names = names
+        self.paths = paths
+        self.rankings = rankings
+        self.turns = turns
+        self.latencies = latencies
+        self.timeouts = timeouts
+        self.engine_seconds = engine_seconds
+
+    @property
+    def winner(self):
+        """
+        :return: The id of the winning player
+        :rtype: int
+        """
+        return self.rankings[0]
+
+    def to_dict(self):
+        """
+        :return: The result as JSON-serialisable data
+        :rtype: dict
+        """
+        return {'seed': self.seed, 'names': self.names, 'paths': self.paths, 'rankings': self.rankings,
+                'turns': self.turns, 'latencies': self.latencies, 'timeouts': self.timeouts,
+                'engine_seconds': self.engine_seconds}
+
+    def __str__(self):
+        return "Seed {}: {} won after {} turns ({:.3f} s of engine time{})".format(
+            self.seed, self.names[self.winner], self.turns, self.engine_seconds,
+            ", timeouts: {}".format(', '.join(self.names[p] for p in self.timeouts)) if self.timeouts else "")
+
+
+class BatchResult:
+    """
+    The outcome of a batch of games played in lockstep.
+
+    :ivar matches: The result of each game, in seed order
+    :ivar engine_seconds: Time spent in the simulator, for all games together
+    :ivar wall_seconds: Time the whole batch took, bots included
+    """
+
+    def __init__(self, matches, engine_seconds, wall_seconds):
+        self.matches = matches
+        self.engine_seconds = engine_seconds
+        self.wall_seconds = wall_seconds
+
+    @property
+    def game_turns(self):
+        """
+        :return: The number of turns played, summed over the games
+        :rtype: int
+        """
+        return sum(match.turns for match in self.matches)
+
+    def __str__(self):
+        return "{} games, {} game-turns: {:.0f} game-turns/s in the engine, {:.0f} game-turns/s overall".format(
+            len(self.matches), self.game_turns, self.game_turns / max(self.engine_seconds, 1e-9),
+            self.game_turns / max(self.wall_seconds, 1e-9))
+
+
+def run_batch(bot_paths, seeds, max_turns=MAX_TURNS, turn_timeout=TURN_TIMEOUT, init_timeout=INIT_TIMEOUT,
+              width=None, height=None, cwd=None, envs=None):
+    """
+    Play one game per seed between the same bot scripts, all games in lockstep in one BatchSimulator, with one
+    process per bot and game. Bots that time out or crash lose all their ships.
+
+    :param list[str] bot_paths: The bot scripts, 2 or 4 of them; player ids follow their order
+    :param list[int] seeds: The map seed of each game
+    :param int max_turns: Turn limit
+    :param float turn_timeout: Seconds a bot may take per turn
+    :param float init_timeout: Seconds a bot may take to initialise
+    :param int width: Map width (default: chosen by the map generator)
+    :param int height: Map height (default: chosen by the map generator)
+    :param str cwd: Where the bots write their logs, one subdirectory per game (default: a temporary directory,
+        removed afterwards)
+    :param list[dict] envs: Extra environment variables for each bot, by player id, e.g. hlt.overrides parameters
+    :return: The results
+    :rtype: BatchResult
+    """
+    wall_start = time.perf_counter()
+    simulator = BatchSimulator(len(bot_paths), seeds, width, height, max_turns)
+    workdir = cwd or tempfile.mkdtemp(prefix='halite-sim-')
+    players = {}
+    for game in range(len(seeds)):
+        game_dir = os.path.join(workdir, 'game-{}'.format(game)) if len(seeds) > 1 else workdir
+        os.makedirs(game_dir, exist_ok=True)
+        for player_id, path in enumerate(bot_paths):
+            players[game, player_id] = ProcessPlayer(path, cwd=game_dir, env=envs[player_id] if envs else None)
+    running = dict(players)
+    latencies = {key: [] for key in players}
+    timeouts = {game: {} for game in range(len(seeds))}
+    engine_seconds = 0.0
+
+    def drop(key):
+        game, player_id = key
+        timeouts[game][player_id] = simulator.turn
+        simulator.eliminate(player_id, game)
+        running.pop(key).close()
+
+    def close_finished():
+        for key in [key for key in running if simulator.finished[key[0]]]:
+            running.pop(key).close()
+
+    try:
+        start = time.perf_counter()
+        lines = simulator.map_lines()
+        engine_seconds += time.perf_counter() - start
+        for (game, player_id), player in players.items():
+            player.send(str(player_id).encode('ascii'))
+            player.send("{} {}".format(simulator.widths[game], simulator.heights[game]).encode('ascii'))
+            player.send(lines[game])
+        answers, late = receive_all(running, init_timeout)
+        for key, (name, _) in answers.items():
+            players[key].name = name.decode('ascii', 'replace')
+        for key in late:
+            drop(key)
+        close_finished()
+
+        while not simulator.is_over():
+            start = time.perf_counter()
+            lines = simulator.map_lines()
+            engine_seconds += time.perf_counter() - start
+            sent = time.perf_counter()
+            for (game, _), player in running.items():
+                player.send(lines[game])
+            answers, late = receive_all(running, turn_timeout)
+            for key in late:
+                drop(key)
+            commands = {game: {} for game in lines}
+            for (game, player_id), (answer, arrival) in answers.items():
+                commands[game][player_id] = answer
+                latencies[game, player_id].append(arrival - sent)
+            start = time.perf_counter()
+            simulator.step(commands)
+            engine_seconds += time.perf_counter() - start
+            close_finished()
+    finally:
+        for player in players.values():
+            player.close()
+        if cwd is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    game_turns = max(1, int(simulator.turns.sum()))
+    matches = []
+    for game, seed in enumerate(seeds):
+        keys = [(game, player_id) for player_id in range(len(bot_paths))]
+        matches.append(MatchResult(seed, [players[key].name for key in keys], [players[key].path for key in keys],
+                                   simulator.rankings(game), int(simulator.turns[game]),
+                                   [latencies[key] for key in keys], timeouts[game],
+                                   engine_seconds * int(simulator.turns[game]) / game_turns))
+    return BatchResult(matches, engine_seconds, time.perf_counter() - wall_start)
+
+
+def run_match(bot_paths, seed=0, max_turns=MAX_TURNS, turn_timeout=TURN_TIMEOUT, init_timeout=INIT_TIMEOUT,
+              width=None, height=None, cwd=None, envs=None):
+    """
+    Play a game between bot scripts, one process per bot. Bots that time out or crash lose all their ships.
+
+    :param list[str] bot_paths: The bot scripts, 2 or 4 of them; player ids follow their order
+    :param int seed: The map seed
+    :param int max_turns: Turn limit
+    :param float turn_timeout: Seconds a bot may take per turn
+    :param float init_timeout: Seconds a bot may take to initialise
+    :param int width: Map width (default: chosen by the map generator)
+    :param int height: Map height (default: chosen by the map generator)
+    :param str cwd: Where the bots write their logs (default: a temporary directory, removed afterwards)
+    :param list[dict] envs: Extra environment variables for each bot, by player id, e.g. hlt.overrides parameters
+    :return: The result
+    :rtype: MatchResult
+    """
+    return run_batch(bot_paths, [seed], max_turns, turn_timeout, init_timeout, width, height, cwd,
+                     envs).matches[0]
@@ -0,0 +1,149 @@
+"""
+Bots playing in the simulator, speaking the engine's line protocol over pipes.
+"""
+import os
+import select
+import subprocess
+import sys
+import time
+
+
+class BotTimeout(Exception):
+    """
+    Raised when a bot does not answer within its time limit, or closes its output.
+    """
+    pass
+
+
+class ProcessPlayer:
+    """
+    A bot script running in its own Python process.
+
+    :ivar path: The bot script
+    :ivar name: The name the bot sent during initialisation, or the script name until then
+    """
+
+    def __init__(self, path, cwd=None, python=sys.executable, env=None):
+        """
+        Start the bot. Its stderr is discarded, and its log files end up in cwd.
+
+        :param str path: The bot script, e.g. MyBot.py
+        :param str cwd: The working directory of the bot (default: the current one)
+        :param str python: The interpreter to run the bot with
+        :param dict env: Extra environment variables for the bot
+        """
+        self.path = os.path.abspath(path)
+        self.name = os.path.splitext(os.path.basename(path))[0]
+        bot_env = dict(os.environ)
+        bot_env['PYTHONPATH'] = os.pathsep.join(filter(None, (os.path.dirname(self.path),
+                                                              bot_env.get('PYTHONPATH'))))
+        bot_env.update(env or {})
+        self._process = subprocess.Popen([python, self.path], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.DEVNULL, cwd=cwd, env=bot_env)
+        self._pending = b''
+
+    def send(self, line):
+        """
+        :param bytes line: A line for the bot, without the newline
+        :return: nothing
+        """
+        try:
+            self._process.stdin.write(line + b'\n')
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            pass
+
+    def fileno(self):
+        return self._process.stdout.fileno()
+
+    def receive(self, timeout):
+        """
+        Wait for the bot's next line.
+
+        :param float timeout: Seconds to wait
+        :return: The line without the newline, and the seconds it took to arrive
+        :rtype: (bytes, float)
+        :raises BotTimeout: If no complete line arrives in time
+        """
+        start = time.perf_counter()
+        answers, late = receive_all({0: self}, timeout)
+        if late:
+            raise BotTimeout("{} did not answer within {:.2f} s".format(self.name, timeout))
+        line, arrival = answers[0]
+        return line, arrival - start
+
+    def _read(self):
+        """
+        Read whatever the bot has written so far.
+
+        :return: The next complete line, if there is one
+        :rtype: bytes|None
+        :raises BotTimeout: If the bot closed its output
+        """
+        if b'\n' not in self._pending:
+            data = os.read(self.fileno(), 1 << 16)
+            if not data:
+                raise BotTimeout("{} closed its output".format(self.name))
+            self._pending += data
+        if b'\n' not in self._pending:
+            return None
+        line, self._pending = self._pending.split(b'\n', 1)
+        return line.rstrip(b'\r')
+
+    def close(self):
+        """
+        Stop the bot.
+
+        :return: nothing
+        """
+        for stream in (self._process.stdin, self._process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        try:
+            self._process.wait(timeout=1.0)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+
+def receive_all(players, timeout):
+    """
+    Wait for one line from each of several bots at once, so each answer is timed when it arrives rather than when
+    it is read.
+
+    :param dict[int, ProcessPlayer] players: The bots to wait for, by player id
+    :param float timeout: Seconds to wait
+    :return: The line and the perf_counter time of its arrival for each bot that answered, and the ids of those
+        that did not answer in time or closed their output
+    :rtype: (dict[int, (bytes, float)], list[int])
+    """
+    deadline = time.perf_counter() + timeout
+    answers = {}
+    late = []
+    waiting = dict(players)
+    for player_id, player in players.items():
+        if b'\n' in player._pending:
+            answers[player_id] = (player._read(), time.perf_counter())
+            del waiting[player_id]
+    while waiting:
+        remaining = deadline - time.perf_counter()
+        ready = select.select(list(waiting.values()), [], [], remaining)[0] if remaining > 0 else []
+        if not ready:
+            break
+        arrival = time.perf_counter()
+        for player_id, player in list(waiting.items()):
+            if player not in ready:
+                continue
+            try:
+                line = player._read()
+            except BotTimeout:
+                late.append(player_id)
+                del waiting[player_id]
+                continue
+            if line is not None:
+                answers[player_id] = (line, arrival)
+                del waiting[player_id]
+    late.extend(waiting)
+    return answers, sorted(late)
@@ -0,0 +1,189 @@
+"""
+Round-robin and gauntlet tournaments between bot scripts, played in the simulator across a process pool.
+
+    python -m sim.tournament [bots ...] [--gauntlet MyBot.py] [--games N] [--players 2|4] [--output results.json]
+
+Without bots, every bot in the repository plays. In a round robin every group of --players bots plays --games
+games; in a gauntlet the challenger plays --games games against every group of the other bots. Seats rotate
+between games. Win rates, per-turn latency distributions and timeout counts end up in a single JSON file.
+"""
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy
+
+from . import engine, match
+
+#: The bots of this repository, played when no bots are given
+REPOSITORY_BOTS = ('MyBot.py', 'AdmiralBot.py', 'CaptainBot.py', 'StandardBot.py', 'CommanderBot.py')
+#: Latency percentiles reported for every bot
+PERCENTILES = (50, 90, 95, 99)
+#: Upper edges, in milliseconds, of the latency histogram buckets (the last bucket is open)
+HISTOGRAM_EDGES = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000)
+
+
+def schedule(bots, games, players=2, challenger=None, seed=0):
+    """
+    List the games of a tournament.
+
+    :param list[str] bots: The bot scripts
+    :param int games: Games per group of bots
+    :param int players: Players per game, 2 or 4
+    :param str challenger: Play a gauntlet of this bot against the others instead of a round robin
+    :param int seed: Seed of the first game; every game gets its own
+    :return: The seats (bot scripts in player order) and map seed of every game
+    :rtype: list[(tuple[str], int)]
+    """
+    if challenger is None:
+        groups = itertools.combinations(bots, players)
+    else:
+        others = [bot for bot in bots if bot != challenger]
+        groups = ((challenger,) + group for group in itertools.combinations(others, players - 1))
+    tasks = []
+    for group in groups:
+        for game in range(games):
+            shift = game % players
+            tasks.append((group[shift:] + group[:shift], seed + len(tasks)))
+    return tasks
+
+
+def _play(task):
+    """
+    Play one scheduled game; runs in a pool worker.
+
+    :return: The result as a dict, see MatchResult.to_dict
+    :rtype: dict
+    """
+    seats, seed, turn_timeout, max_turns = task
+    return match.run_match(list(seats), seed, max_turns, turn_timeout).to_dict()
+
+
+def latency_summary(latencies):
+    """
+    :param list[float] latencies: Per-turn latencies in seconds
+    :return: Count, mean, percentiles and max in milliseconds, and a histogram over HISTOGRAM_EDGES
+    :rtype: dict
+    """
+    milliseconds = numpy.asarray(latencies, dtype=numpy.float64) * 1000
+    if not len(milliseconds):
+        return {'turns': 0}
+    summary = {'turns': len(milliseconds), 'mean_ms': float(milliseconds.mean()),
+               'max_ms': float(milliseconds.max())}
+    for percentile, value in zip(PERCENTILES, numpy.percentile(milliseconds, PERCENTILES)):
+        summary['p{}_ms'.format(percentile)] = float(value)
+    buckets = numpy.searchsorted(HISTOGRAM_EDGES, milliseconds, side='left')
+    summary['histogram'] = {'edges_ms': list(HISTOGRAM_EDGES),
+                            'counts': numpy.bincount(buckets, minlength=len(HISTOGRAM_EDGES) + 1).tolist()}
+    return summary
+
+
+def summarize(matches):
+    """
+    Aggregate match results by bot and by group of bots.
+
+    :param list[dict] matches: Results as returned by MatchResult.to_dict
+    :return: Per-bot and per-group statistics
+    :rtype: dict
+    """
+    bots = {}
+    latencies = {}
+    groups = {}
+    for result in matches:
+        winner = result['paths'][result['rankings'][0]]
+        for player, path in enumerate(result['paths']):
+            bot = bots.setdefault(path, {'name': result['names'][player], 'games': 0, 'wins': 0, 'timeouts': 0})
+            bot['games'] += 1
+            bot['wins'] += path == winner
+            bot['timeouts'] += player in result['timeouts']
+            latencies.setdefault(path, []).extend(result['latencies'][player])
+        key = ' vs '.join(sorted(os.path.relpath(path) for path in result['paths']))
+        group = groups.setdefault(key, {'games': 0, 'wins': {}})
+        group['games'] += 1
+        group['wins'][os.path.relpath(winner)] = group['wins'].get(os.path.relpath(winner), 0) + 1
+    for path, bot in bots.items():
+        bot['win_rate'] = bot['wins'] / bot['games']
+        bot['latency'] = latency_summary(latencies[path])
+    return {'bots': bots, 'groups': groups}
+
+
+def run(bots, games, players=2, challenger=None, seed=0, processes=None, turn_timeout=match.TURN_TIMEOUT,
+        max_turns=match.MAX_TURNS, progress=None):
+    """
+    Play a tournament across a process pool.
+
+    :param list[str] bots: The bot scripts
+    :param int games: Games per group of bots
+    :param int players: Players per game, 2 or 4
+    :param str challenger: Play a gauntlet of this bot against the others instead of a round robin
+    :param int seed: Seed of the first game
+    :param int processes: Games played at the same time (default: one per `players` CPU cores, as every game
+        runs that many bot processes)
+    :param float turn_timeout: Seconds a bot may take per turn
+    :param int max_turns: Turn limit
+    :param progress: Called with every match result as it arrives
+    :return: The configuration, the aggregated statistics and every match result
+    :rtype: dict
+    """
+    tasks = [(seats, game_seed, turn_timeout, max_turns)
+             for seats, game_seed in schedule(bots, games, players, challenger, seed)]
+    processes = processes or max(1, (os.cpu_count() or 1) // players)
+    start = time.perf_counter()
+    matches = []
+    with multiprocessing.Pool(processes) as pool:
+        for result in pool.imap_unordered(_play, tasks):
+            matches.append(result)
+            if progress is not None:
+                progress(result)
+    matches.sort(key=lambda result: result['seed'])
+    return {'config': {'bots': bots, 'games': games, 'players': players, 'challenger': challenger, 'seed': seed,
+                       'processes': processes, 'turn_timeout': turn_timeout, 'max_turns': max_turns,
+                       'rules': engine.RULES_VERSION, 'wall_seconds': time.perf_counter() - start},
+            **summarize(matches), 'matches': matches}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play a tournament between bot scripts in the simulator.")
+    parser.add_argument('bots', nargs='*', help="The bot scripts (default: all bots of the repository)")
+    parser.add_argument('--gauntlet', metavar='BOT', help="Play this bot against the others instead of a round robin")
+    parser.add_argument('--games', type=int, default=10, help="Games per group of bots")
+    parser.add_argument('--players', type=int, choices=(2, 4), default=2, help="Players per game")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the first game")
+    parser.add_argument('--processes', type=int, help="Games played at the same time")
+    parser.add_argument('--timeout', type=float, default=match.TURN_TIMEOUT, help="Seconds per turn")
+    parser.add_argument('--turns', type=int, default=match.MAX_TURNS, help="Turn limit")
+    parser.add_argument('--output', default='tournament.json', help="The result file")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    bots = [os.path.abspath(bot) for bot in args.bots] or [os.path.join(root, bot) for bot in REPOSITORY_BOTS]
+    challenger = os.path.abspath(args.gauntlet) if args.gauntlet else None
+    if challenger and challenger not in bots:
+        bots = [challenger] + bots
+
+    def progress(result):
+        print("seed {}: {} won ({} turns){}".format(
+            result['seed'], result['names'][result['rankings'][0]], result['turns'],
+            ", timeouts: {}".format(', '.join(result['names'][player] for player in result['timeouts']))
+            if result['timeouts'] else ""), file=sys.stderr)
+
+    tournament = run(bots, args.games, args.players, challenger, args.seed, args.processes, args.timeout,
+                     args.turns, progress)
+    with open(args.output, 'w') as output:
+        json.dump(tournament, output, indent=1)
+
+    print("{:<28} {:>6} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+        "bot", "games", "win rate", "timeouts", "p50 ms", "p99 ms", "max ms"))
+    for path, bot in sorted(tournament['bots'].items(), key=lambda item: item[1]['win_rate'], reverse=True):
+        latency = bot['latency']
+        print("{:<28} {:>6} {:>9.1%} {:>9} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+            "{} ({})".format(bot['name'], os.path.relpath(path)), bot['games'], bot['win_rate'], bot['timeouts'], latency.get('p50_ms', 0.0),
+            latency.get('p99_ms', 0.0), latency.get('max_ms', 0.0)))
+
+
+if __name__ == '__main__':
+    main()
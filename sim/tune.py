@@ -0,0 +1,310 @@
+"""
+Parallel hyperparameter search for bot parameters, played in the simulator.
+
+    python -m sim.tune AdmiralBot.py --param PLANET_BONUS=0:30 --param CLOSE_OPPONENT_DIST=6:20 \\
+        --opponent MyBot.py --method halving --candidates 27 --games 4 --store admiral.jsonl
+
+Candidates are parameter sets drawn at random from the given ranges; the first candidate is always the bot's own
+defaults. The tuned bot receives them through hlt.overrides (HLT_OVERRIDES), so any parameter a bot passes to
+hlt.overrides.apply can be tuned: AdmiralBot's module constants, or CaptainBot's Bot attributes. Every candidate
+plays the same seeds, against the opponents in turn; once it has met every opponent, it swaps seats, so that it
+meets each of them from both seats.
+
+Random search plays --games games per candidate. Successive halving plays --games games per candidate, keeps the
+best 1/eta of them, multiplies the games by eta, and repeats until a final round of at most eta candidates. Every
+finished game is appended to the store at once; running the same command again skips the games already in it.
+Games recorded for another tuned bot, other opponents, turn limit or turn timeout, or under other simulator rules
+(engine.RULES_VERSION), are ignored and played again, so one store can be shared by different runs.
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+
+import numpy
+
+from hlt import overrides as hlt_overrides
+from . import engine, match
+
+
+class Parameter:
+    """
+    A parameter to tune, drawn uniformly (or log-uniformly) from a range.
+
+    :ivar name: The parameter name, as the bot knows it
+    :ivar low: Smallest value
+    :ivar high: Largest value
+    :ivar log: Whether to draw on a logarithmic scale
+    :ivar integer: Whether values are whole numbers
+    """
+
+    def __init__(self, name, low, high, log=False, integer=False):
+        self.name = name
+        self.low = low
+        self.high = high
+        self.log = log
+        self.integer = integer
+
+    def sample(self, rng):
+        """
+        :param numpy.random.Generator rng: The random generator
+        :return: A random value from the range
+        :rtype: int|float
+        """
+        if self.log:
+            value = math.exp(rng.uniform(math.log(self.low), math.log(self.high)))
+        else:
+            value = rng.uniform(self.low, self.high)
+        return int(round(value)) if self.integer else round(float(value), 4)
+
+    @staticmethod
+    def _parse(spec):
+        """
+        Parse a parameter given as NAME=LOW:HIGH, optionally followed by :log and/or :int.
+
+        :param str spec: The specification
+        :return: The parameter
+        :rtype: Parameter
+        """
+        name, _, bounds = spec.partition('=')
+        low, high, *flags = bounds.split(':')
+        unknown = set(flags) - {'log', 'int'}
+        if not name or unknown:
+            raise ValueError("Parameters are given as NAME=LOW:HIGH[:log][:int], not {!r}".format(spec))
+        return Parameter(name, float(low), float(high), 'log' in flags, 'int' in flags)
+
+
+def setting(bot, opponents, turn_timeout, max_turns):
+    """
+    :param str bot: The bot to tune
+    :param list[str] opponents: The bots it plays against, in turn
+    :param float turn_timeout: Seconds a bot may take per turn
+    :param int max_turns: Turn limit
+    :return: What, besides the candidate and the seed, decides a game's outcome; recorded with every game
+    :rtype: dict
+    """
+    return {'bot': os.path.basename(bot), 'opponents': [os.path.basename(opponent) for opponent in opponents],
+            'turn_timeout': turn_timeout, 'max_turns': max_turns, 'rules': engine.RULES_VERSION}
+
+
+def candidate_key(overrides):
+    """
+    :param dict overrides: A parameter set
+    :return: A canonical text form of it, identifying the candidate in the store
+    :rtype: str
+    """
+    return json.dumps(overrides, sort_keys=True)
+
+
+class Store:
+    """
+    The games played so far, as an append-only file with one JSON record per line. Records survive interruption
+    up to the last complete line; records played in another setting are skipped.
+    """
+
+    def __init__(self, path, setting):
+        """
+        :param str path: The store file; created if missing
+        :param dict setting: The setting of the games of interest, see setting()
+        """
+        self.path = path
+        self.setting = setting
+        self._records = {}
+        if os.path.exists(path):
+            with open(path) as store:
+                for line in store:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('setting') != setting:
+                        continue
+                    self._records[record['key'], record['seed']] = record
+
+    def __contains__(self, key_and_seed):
+        return key_and_seed in self._records
+
+    def add(self, record):
+        """
+        Save a game's record.
+
+        :param dict record: The record, with at least 'key', 'seed' and 'setting'
+        :return: nothing
+        """
+        self._records[record['key'], record['seed']] = record
+        with open(self.path, 'a') as store:
+            store.write(json.dumps(record) + '\n')
+
+    def records(self, key, seeds):
+        """
+        :param str key: The candidate
+        :param seeds: The seeds of interest
+        :return: The candidate's records on those seeds that have been played
+        :rtype: list[dict]
+        """
+        return [self._records[key, seed] for seed in seeds if (key, seed) in self._records]
+
+
+def _play(task):
+    """
+    Play one game of a candidate; runs in a pool worker.
+
+    :return: The game's record for the store
+    :rtype: dict
+    """
+    bot, opponent, seat, overrides, seed, turn_timeout, max_turns, game_setting = task
+    seats = [opponent, opponent]
+    seats[seat] = bot
+    envs = [{hlt_overrides.OVERRIDES_VARIABLE: ''}, {hlt_overrides.OVERRIDES_VARIABLE: ''}]
+    envs[seat] = {hlt_overrides.OVERRIDES_VARIABLE: json.dumps(overrides)}
+    result = match.run_match(seats, seed, max_turns, turn_timeout, envs=envs)
+    rank = result.rankings.index(seat)
+    return {'key': candidate_key(overrides), 'overrides': overrides, 'seed': seed, 'setting': game_setting,
+            'opponent': os.path.basename(opponent), 'seat': seat, 'won': rank == 0, 'rank': rank, 'turns': result.turns,
+            'timeout': seat in result.timeouts, 'max_latency': max(result.latencies[seat], default=0.0)}
+
+
+class Tuner:
+    """
+    Plays candidates' games across a process pool, through a store.
+    """
+
+    def __init__(self, bot, opponents, store, pool, turn_timeout=match.TURN_TIMEOUT, max_turns=match.MAX_TURNS,
+                 progress=None):
+        """
+        :param str bot: The bot to tune
+        :param list[str] opponents: The bots it plays against, in turn
+        :param Store store: Where games are recorded, for the setting of this bot, opponents, timeout and turns
+        :param multiprocessing.pool.Pool pool: The worker processes
+        :param float turn_timeout: Seconds a bot may take per turn
+        :param int max_turns: Turn limit
+        :param progress: Called with every record as it arrives
+        """
+        self.bot = bot
+        self.opponents = opponents
+        self.store = store
+        self.pool = pool
+        self.turn_timeout = turn_timeout
+        self.max_turns = max_turns
+        self.progress = progress
+
+    def evaluate(self, candidates, games):
+        """
+        Play the first `games` seeds with every candidate, skipping games already in the store. Seed s plays
+        opponent s % len(opponents), from seat s // len(opponents) % 2.
+
+        :param list[dict] candidates: The parameter sets
+        :param int games: Games per candidate
+        :return: The score of every candidate: win rate, then mean rank (lower is better) as a tie-breaker
+        :rtype: list[(float, float)]
+        """
+        opponents = len(self.opponents)
+        tasks = [(self.bot, self.opponents[seed % opponents], seed // opponents % 2, overrides, seed, self.turn_timeout,
+                  self.max_turns, self.store.setting)
+                 for overrides in candidates for seed in range(games)
+                 if (candidate_key(overrides), seed) not in self.store]
+        for record in self.pool.imap_unordered(_play, tasks):
+            self.store.add(record)
+            if self.progress is not None:
+                self.progress(record)
+        return [self.score(overrides, games) for overrides in candidates]
+
+    def score(self, overrides, games):
+        """
+        :return: The win rate and mean rank of a candidate over its first `games` seeds
+        :rtype: (float, float)
+        """
+        records = self.store.records(candidate_key(overrides), range(games))
+        if not records:
+            return 0.0, float('inf')
+        return (sum(record['won'] for record in records) / len(records),
+                sum(record['rank'] for record in records) / len(records))
+
+
+def sample_candidates(parameters, count, seed=0):
+    """
+    :param list[Parameter] parameters: The parameters to tune
+    :param int count: Number of candidates
+    :param int seed: Seed of the draw; the same seed gives the same candidates, which is what lets a run resume
+    :return: The bot's defaults (no overrides) followed by count - 1 random parameter sets
+    :rtype: list[dict]
+    """
+    rng = numpy.random.default_rng(seed)
+    return [{}] + [{parameter.name: parameter.sample(rng) for parameter in parameters} for _ in range(count - 1)]
+
+
+def random_search(tuner, candidates, games):
+    """
+    :return: (score, candidate) pairs, best first
+    :rtype: list[((float, float), dict)]
+    """
+    return _ranked(candidates, tuner.evaluate(candidates, games))
+
+
+def successive_halving(tuner, candidates, games, eta=3):
+    """
+    Evaluate all candidates on `games` games, keep the best 1/eta, give them eta times as many games, and so on
+    until at most eta are left. Games played in earlier rounds count towards later ones.
+
+    :return: (score, candidate) pairs of the last round, best first
+    :rtype: list[((float, float), dict)]
+    """
+    while True:
+        ranked = _ranked(candidates, tuner.evaluate(candidates, games))
+        keep = len(candidates) // eta
+        if keep <= 1:
+            return ranked
+        candidates = [candidate for _, candidate in ranked[:keep]]
+        games *= eta
+
+
+def _ranked(candidates, scores):
+    order = sorted(range(len(candidates)), key=lambda i: (-scores[i][0], scores[i][1], i))
+    return [(scores[i], candidates[i]) for i in order]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune a bot's parameters in the simulator.")
+    parser.add_argument('bot', help="The bot to tune, e.g. AdmiralBot.py")
+    parser.add_argument('--param', action='append', required=True, type=Parameter._parse, metavar='NAME=LOW:HIGH',
+                        help="A parameter range, optionally with :log and/or :int; repeat for every parameter")
+    parser.add_argument('--opponent', action='append', help="A bot to play against; repeat for several "
+                                                            "(default: the untuned bot itself)")
+    parser.add_argument('--method', choices=('random', 'halving'), default='halving')
+    parser.add_argument('--candidates', type=int, default=27, help="Number of candidates, defaults included")
+    parser.add_argument('--games', type=int, default=4, help="Games per candidate (in the first round)")
+    parser.add_argument('--eta', type=int, default=3, help="Successive halving keeps the best 1/eta each round")
+    parser.add_argument('--seed', type=int, default=0, help="Seed of the candidate draw")
+    parser.add_argument('--processes', type=int, help="Games played at the same time (default: CPU cores / 2)")
+    parser.add_argument('--timeout', type=float, default=match.TURN_TIMEOUT, help="Seconds per turn")
+    parser.add_argument('--turns', type=int, default=match.MAX_TURNS, help="Turn limit")
+    parser.add_argument('--store', default='tune.jsonl', help="The resumable result store")
+    args = parser.parse_args()
+
+    bot = os.path.abspath(args.bot)
+    # sorted, so that the same opponents given in another order play (and reuse) the same games
+    opponents = sorted((os.path.abspath(opponent) for opponent in args.opponent or [args.bot]), key=os.path.basename)
+    candidates = sample_candidates(args.param, args.candidates, args.seed)
+    store = Store(args.store, setting(bot, opponents, args.timeout, args.turns))
+
+    def progress(record):
+        print("{} seed {} vs {}: {}".format(record['key'], record['seed'], record['opponent'],
+                                            "won" if record['won'] else "rank {}".format(record['rank'] + 1)),
+              file=sys.stderr)
+
+    with multiprocessing.Pool(args.processes or max(1, (os.cpu_count() or 1) // 2)) as pool:
+        tuner = Tuner(bot, opponents, store, pool, args.timeout, args.turns, progress)
+        if args.method == 'random':
+            ranked = random_search(tuner, candidates, args.games)
+        else:
+            ranked = successive_halving(tuner, candidates, args.games, args.eta)
+
+    print("{:>9} {:>10}  {}".format("win rate", "mean rank", "parameters"))
+    for (win_rate, mean_rank), overrides in ranked[:10]:
+        print("{:>9.1%} {:>10.2f}  {}".format(win_rate, mean_rank + 1, candidate_key(overrides) if overrides else "defaults"))
+
+
+if __name__ == '__main__':
+    main()